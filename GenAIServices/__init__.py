@@ -1,4 +1,31 @@
+from GenAIServices.breaker import CircuitBreaker
+from GenAIServices.cassette import CassetteHandler, CassetteMissError
 from GenAIServices.core import GenAIOperator
+from GenAIServices.errors import (
+    CircuitOpenError,
+    GenAICancelledError,
+    GenAIConnectionError,
+    GenAIError,
+    GenAIResponseError,
+    GenAIServerError,
+    GenAITimeoutError,
+)
+from GenAIServices.hedge import HedgedHandler, HedgePolicy
 from GenAIServices.ollama import OllamaHandler
 
-__all__ = ["OllamaHandler", "GenAIOperator"]
+__all__ = [
+    "CassetteHandler",
+    "CassetteMissError",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "GenAICancelledError",
+    "GenAIConnectionError",
+    "GenAIError",
+    "GenAIOperator",
+    "GenAIResponseError",
+    "GenAIServerError",
+    "GenAITimeoutError",
+    "HedgePolicy",
+    "HedgedHandler",
+    "OllamaHandler",
+]
@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Callable
+
+from GenAIServices.errors import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an endpoint that keeps failing.
+
+    The breaker is closed (requests pass) until `failure_threshold` consecutive requests fail, then opens:
+    requests are rejected with `CircuitOpenError` for `reset_timeout` seconds. After that it is half-open and
+    lets a single trial request through; its success closes the breaker, its failure opens it again.
+    Only failures of the endpoint (timeouts, connection errors, 429/5xx statuses) should be recorded, not
+    invalid answers or undecodable responses.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures opening the breaker. Default: 5.
+            reset_timeout (float): Seconds the breaker stays open before a trial request. Default: 30.0.
+            clock (Callable[[], float]): Monotonic clock, in seconds. Default: `time.monotonic`.
+
+        Raises:
+            ValueError:
+                failure_threshold must be a positive integer.
+        """
+        if not isinstance(failure_threshold, int) or failure_threshold <= 0:
+            raise ValueError("failure_threshold must be a positive integer.")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """
+        Admits a request.
+
+        Raises:
+            CircuitOpenError:
+                If the breaker is open, or half-open with its trial request in flight.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - self.clock()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f"Circuit open after {self.failures} failures, retry in {remaining:.1f}s."
+                    )
+                self.state = HALF_OPEN
+                self._trial = False
+            if self.state == HALF_OPEN:
+                if self._trial:
+                    raise CircuitOpenError(
+                        "Circuit half-open, trial request in flight."
+                    )
+                self._trial = True
+
+    def record_success(self) -> None:
+        """
+        Closes the breaker and resets the failure count.
+        """
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial = False
+
+    def release(self) -> None:
+        """
+        Ends a request that neither succeeded nor failed (e.g. cancelled), letting a new trial through.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self) -> None:
+        """
+        Counts a failure, opening the breaker at the threshold or when the trial request failed.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = self.clock()
+                self._trial = False
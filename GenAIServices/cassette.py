@@ -0,0 +1,186 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections.abc import Generator
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from GenAIServices.core import GenAIOperator
+from GenAIServices.errors import GenAICancelledError, GenAIError
+from models import GenerationStats
+
+# Request fields that do not change the answer and are left out of the cassette key.
+IGNORED_FIELDS = ("stream", "ollama_url")
+MODES = ("record", "replay")
+
+
+class CassetteMissError(GenAIError, LookupError):
+    """
+    Raised in replay mode for a request that is not in the cassette.
+    """
+
+
+def cassette_key(request_data: dict) -> str:
+    """
+    Hashes a chat request, e.g. its model, messages and options, without the transport fields.
+
+    Args:
+        request_data (dict): The request data.
+
+    Returns:
+        str: The SHA-256 hex digest of the canonical JSON of the request.
+    """
+    canonical = json.dumps(
+        {k: v for k, v in request_data.items() if k not in IGNORED_FIELDS},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CassetteHandler(GenAIOperator):
+    """
+    Records the answers of another GenAI service into a cassette file and replays them without a model.
+
+    The cassette is a gzip-compressed JSON lines file of `{"key", "content", "stats"}` records, keyed by
+    `cassette_key`. Recording appends one gzip member per answer, so an interrupted recording keeps every
+    complete answer. A request answered several times (e.g. retries after invalid JSON) is replayed in the
+    recorded order, its last answer being repeated afterwards. Replaying a request missing from the cassette
+    raises `CassetteMissError` instead of falling back to a model.
+
+    Example:
+        gen_ai = CassetteHandler("EMPU_3401.cassette.jsonl.gz", mode="record", inner=OllamaHandler(url))
+        data = Transform(model_name="llama3.2:1b", gen_ai=gen_ai).process(preproc_data)
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        mode: str = "replay",
+        inner: Optional[GenAIOperator] = None,
+    ):
+        """
+        Args:
+            path (Union[Path, str]): The cassette file.
+            mode (str): `record` or `replay`. Default: `replay`.
+            inner (Optional[GenAIOperator]): The service whose answers are recorded, required to record.
+
+        Raises:
+            ValueError:
+                - mode must be one of record, replay.
+                - Recording requires an inner GenAI service.
+            FileNotFoundError:
+                If the cassette to replay does not exist.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}.")
+        if mode == "record" and inner is None:
+            raise ValueError("Recording requires an inner GenAI service.")
+        self.path = Path(path)
+        self.mode = mode
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, int] = {}
+        self.cassette = self._connect(self.path)
+
+    def _connect(self, path: Path) -> Dict[str, List[dict]]:
+        """
+        Loads the cassette.
+
+        Args:
+            path (Path): The cassette file.
+
+        Returns:
+            Dict[str, List[dict]]: The recorded answers of each request key, in recording order. Empty when
+            recording a new cassette.
+
+        Raises:
+            FileNotFoundError:
+                If the cassette to replay does not exist.
+        """
+        cassette: Dict[str, List[dict]] = {}
+        if not path.exists():
+            if self.mode == "replay":
+                raise FileNotFoundError(f"The cassette {path} does not exist.")
+            return cassette
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    cassette.setdefault(record["key"], []).append(record)
+        return cassette
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self.cassette.setdefault(record["key"], []).append(record)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _next(self, key: str) -> dict:
+        with self._lock:
+            records = self.cassette.get(key)
+            if not records:
+                raise CassetteMissError(
+                    f"Request {key} is not in the cassette {self.path}."
+                )
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return records[min(cursor, len(records) - 1)]
+
+    def chat(
+        self,
+        request_data: dict,
+        deadline: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Generator[Union[str, GenerationStats], None, None]:
+        """
+        Answers a chat request from the cassette, or from the inner service while recording.
+
+        Args:
+            request_data (dict): The request data.
+            deadline (Optional[float]): Passed to the inner service while recording.
+            cancel_event (Optional[threading.Event]): Cancels the request if set, passed to the inner service
+                while recording.
+
+        Yields:
+            str: The answer; replayed answers are yielded in one piece.
+            GenerationStats: The stats recorded with the answer, if any.
+
+        Raises:
+            CassetteMissError:
+                If the request is not in the cassette (replay mode).
+            GenAICancelledError:
+                If `cancel_event` is set.
+        """
+        key = cassette_key(request_data)
+        if cancel_event is not None and cancel_event.is_set():
+            raise GenAICancelledError("The request was cancelled.")
+        if self.mode == "replay":
+            record = self._next(key)
+            yield record["content"]
+            if record.get("stats"):
+                yield GenerationStats.model_validate(record["stats"])
+            return
+
+        content = ""
+        stats = None
+        kwargs = {}
+        if deadline is not None:
+            kwargs["deadline"] = deadline
+        if cancel_event is not None:
+            kwargs["cancel_event"] = cancel_event
+        for res in self.inner.chat(request_data=request_data, **kwargs):
+            if isinstance(res, str):
+                content += res
+            elif isinstance(res, GenerationStats):
+                stats = res
+            yield res
+        self._append(
+            {
+                "key": key,
+                "content": content,
+                "stats": stats.model_dump() if stats else None,
+            }
+        )
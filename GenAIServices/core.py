@@ -21,6 +21,9 @@ class GenAIOperator(abc.ABC):
         """
         Abstract method to send a chat request to the GenAI service.
 
+        Implementations accept `request_data`, and optionally `deadline` (seconds) and `cancel_event`
+        (`threading.Event`); failures are raised as `GenAIError`s, never yielded as content.
+
         Args:
             *args: Positional arguments (implementation-defined).
             **kwargs: Keyword arguments (implementation-defined).
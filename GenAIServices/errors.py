@@ -0,0 +1,68 @@
+from typing import Optional
+
+
+class GenAIError(Exception):
+    """
+    Base class of the errors raised by GenAI services.
+
+    `transient` tells whether the same request may succeed when retried (timeouts, connection errors,
+    overloaded or failing servers), as opposed to errors that retrying cannot fix.
+    """
+
+    transient = False
+
+
+class GenAITimeoutError(GenAIError):
+    """
+    The request did not complete before its deadline.
+    """
+
+    transient = True
+
+
+class GenAIConnectionError(GenAIError):
+    """
+    The service could not be reached, or the connection broke during the response.
+    """
+
+    transient = True
+
+
+class GenAIServerError(GenAIError):
+    """
+    The service answered with an error status.
+    """
+
+    def __init__(self, status_code: int, message: Optional[str] = None):
+        """
+        Args:
+            status_code (int): The HTTP status code.
+            message (Optional[str]): The error message of the response, if any.
+        """
+        super().__init__(
+            f"Unexpected error: {status_code}" + (f" {message}" if message else "")
+        )
+        self.status_code = status_code
+        # Overloaded (429/503) or failing (5xx) servers may answer a retry.
+        self.transient = status_code == 429 or status_code >= 500
+
+
+class GenAIResponseError(GenAIError):
+    """
+    The response does not follow the protocol of the service, e.g. an undecodable chunk.
+    """
+
+    transient = True
+
+
+class GenAICancelledError(GenAIError):
+    """
+    The request was cancelled by its caller.
+    """
+
+
+class CircuitOpenError(GenAIError):
+    """
+    The circuit breaker of the service is open: recent requests failed and new ones are rejected without
+    reaching the service until the reset timeout.
+    """
@@ -0,0 +1,363 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Generator
+from typing import Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from GenAIServices.core import GenAIOperator
+from GenAIServices.errors import GenAICancelledError, GenAITimeoutError
+from models import GenerationStats
+from utils import tracer
+
+# Seconds between two checks of the caller's cancel event while waiting for an answer.
+POLL_INTERVAL = 0.05
+
+
+def prompt_size(request_data: dict) -> int:
+    """
+    Args:
+        request_data (dict): The chat request.
+
+    Returns:
+        int: The number of characters of its messages.
+    """
+    return sum(len(str(m.get("content", ""))) for m in request_data.get("messages", []))
+
+
+class HedgePolicy:
+    """
+    Decides when a slow request gets a duplicate, and keeps the latency history and counters of hedging.
+
+    The latency of every answered primary request is kept per prompt size bucket (powers of two of the
+    prompt length), over the last `window` requests. Once a bucket has `min_samples` latencies, a request of
+    that size running longer than their `quantile` (at least `min_delay`) is hedged, as long as hedges stay
+    within `max_extra_load` of all requests. Primary requests cancelled because their hedge won count with
+    their running time at cancellation, so a hedged slow request still raises the quantile.
+
+    `counters` holds the number of requests, hedges sent, hedges won, hedges denied by the budget and losers
+    cancelled.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        max_extra_load: float = 0.05,
+        min_samples: int = 20,
+        window: int = 256,
+        min_delay: float = 0.0,
+    ):
+        """
+        Args:
+            quantile (float): Latency quantile of the prompt size bucket after which a request is hedged.
+                Default: 0.95.
+            max_extra_load (float): Maximum share of requests that are hedged, e.g. 0.05 for 5% extra load.
+                Default: 0.05.
+            min_samples (int): Latencies needed in a bucket before its requests are hedged. Default: 20.
+            window (int): Number of latencies kept per bucket. Default: 256.
+            min_delay (float): Minimum seconds before a request is hedged. Default: 0.0.
+
+        Raises:
+            ValueError:
+                - quantile must be in (0, 1).
+                - max_extra_load must be in [0, 1].
+                - min_samples must be a positive integer.
+        """
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be in (0, 1).")
+        if not 0 <= max_extra_load <= 1:
+            raise ValueError("max_extra_load must be in [0, 1].")
+        if not isinstance(min_samples, int) or min_samples <= 0:
+            raise ValueError("min_samples must be a positive integer.")
+        self.quantile = quantile
+        self.max_extra_load = max_extra_load
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay
+        self.latencies: Dict[int, Deque[float]] = {}
+        self.counters = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_denied": 0,
+            "cancelled": 0,
+        }
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def bucket(size: int) -> int:
+        """
+        Args:
+            size (int): The prompt size, see `prompt_size`.
+
+        Returns:
+            int: The bucket of prompts with the same power of two of the size.
+        """
+        return size.bit_length()
+
+    def threshold(self, size: int) -> Optional[float]:
+        """
+        Args:
+            size (int): The prompt size.
+
+        Returns:
+            Optional[float]: Seconds after which a request of this size is hedged, or None while its bucket
+            has fewer than `min_samples` latencies.
+        """
+        with self._lock:
+            latencies = sorted(self.latencies.get(self.bucket(size), ()))
+        if len(latencies) < self.min_samples:
+            return None
+        rank = max(math.ceil(self.quantile * len(latencies)) - 1, 0)
+        return max(latencies[rank], self.min_delay)
+
+    def record(self, size: int, latency: float) -> None:
+        """
+        Adds the latency of a primary request.
+
+        Args:
+            size (int): The prompt size.
+            latency (float): Seconds from sending the request to its answer, or to its cancellation.
+        """
+        with self._lock:
+            bucket = self.latencies.setdefault(
+                self.bucket(size), deque(maxlen=self.window)
+            )
+            bucket.append(latency)
+
+    def count(self, name: str) -> None:
+        """
+        Increments one of the `counters`.
+        """
+        with self._lock:
+            self.counters[name] += 1
+
+    def allow_hedge(self) -> bool:
+        """
+        Takes a hedge from the budget.
+
+        Returns:
+            bool: Whether hedging one more request keeps hedges within `max_extra_load` of all requests.
+        """
+        with self._lock:
+            if (
+                self.counters["hedged"] + 1
+                > self.max_extra_load * self.counters["requests"]
+            ):
+                self.counters["budget_denied"] += 1
+                return False
+            self.counters["hedged"] += 1
+            return True
+
+    @property
+    def extra_load(self) -> float:
+        """
+        float: Share of requests that were hedged.
+        """
+        with self._lock:
+            requests = self.counters["requests"]
+            return self.counters["hedged"] / requests if requests else 0.0
+
+
+class HedgedHandler(GenAIOperator):
+    """
+    Sends a duplicate of a slow request to another endpoint (or another slot of the same one) and answers
+    with whichever request finishes first, cancelling the other.
+
+    Requests whose prompt size has no latency history yet pass through to `primary` and feed the history.
+    Later requests run in a background thread; if one exceeds the `HedgePolicy` threshold of its size and
+    the budget allows it, a duplicate is sent to the next of `backups` (round robin), or to `primary` again
+    if there is none. Every request is sent streamed, passed through or not, so the latencies in the
+    history are comparable and a loser is cancelled at its next token and its connection closed, which
+    stops its generation on Ollama. The winner's answer, including its `GenerationStats`, is yielded once
+    complete. A primary request failing before the threshold is not hedged: its error is raised for the
+    caller to retry. Cancellation and the deadline are raised as soon as they happen, without waiting for
+    the requests to stop.
+
+    Example:
+        gen_ai = HedgedHandler(OllamaHandler(url_a), backups=[OllamaHandler(url_b)], policy=HedgePolicy())
+        data = Transform(model_name="llama3.2:1b", gen_ai=gen_ai).process(preproc_data)
+    """
+
+    def __init__(
+        self,
+        primary: GenAIOperator,
+        backups: Optional[Sequence[GenAIOperator]] = None,
+        policy: Optional[HedgePolicy] = None,
+    ):
+        """
+        Args:
+            primary (GenAIOperator): The service answering requests.
+            backups (Optional[Sequence[GenAIOperator]]): Services receiving the duplicates. Default: None
+                (duplicates are sent to `primary`).
+            policy (Optional[HedgePolicy]): When to hedge. Default: `HedgePolicy()`.
+        """
+        self.primary = primary
+        self.backups: List[GenAIOperator] = list(backups or [])
+        self.policy = policy if policy is not None else HedgePolicy()
+        self._next_backup = 0
+        self._lock = threading.Lock()
+
+    def _connect(self, *args, **kwargs) -> None:
+        return None
+
+    def _backup(self) -> GenAIOperator:
+        if not self.backups:
+            return self.primary
+        with self._lock:
+            backup = self.backups[self._next_backup % len(self.backups)]
+            self._next_backup += 1
+        return backup
+
+    def chat(
+        self,
+        request_data: dict,
+        deadline: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Generator[Union[str, GenerationStats], None, None]:
+        """
+        Answers a chat request, hedging it if it is slow.
+
+        Args:
+            request_data (dict): The request data.
+            deadline (Optional[float]): Seconds the request may take, duplicate included.
+            cancel_event (Optional[threading.Event]): Setting it cancels both requests.
+
+        Yields:
+            str: The answer of the first request to finish.
+            GenerationStats: Its stats, if the service reports them.
+
+        Raises:
+            GenAIError:
+                The error of the primary request if it fails before being hedged, or of the last request to
+                fail if both do.
+            GenAICancelledError: If `cancel_event` is set.
+            GenAITimeoutError: If the request exceeds its deadline.
+        """
+        size = prompt_size(request_data)
+        streamed = {**request_data, "stream": True}
+        self.policy.count("requests")
+        threshold = self.policy.threshold(size)
+        if threshold is None:
+            start = time.monotonic()
+            yield from self.primary.chat(
+                request_data=streamed,
+                **self._kwargs(deadline, cancel_event),
+            )
+            self.policy.record(size, time.monotonic() - start)
+            return
+
+        with tracer.span(
+            "genai", "hedge", threshold=threshold, prompt_size=size
+        ) as span:
+            winner, answer = self._race(
+                streamed, size, threshold, deadline, cancel_event
+            )
+            span.set(hedged=winner is not None, winner=winner)
+        yield from answer
+
+    @staticmethod
+    def _kwargs(
+        deadline: Optional[float], cancel_event: Optional[threading.Event]
+    ) -> dict:
+        # Only passed when set, so services without deadlines or cancellation keep working.
+        kwargs = {}
+        if deadline is not None:
+            kwargs["deadline"] = deadline
+        if cancel_event is not None:
+            kwargs["cancel_event"] = cancel_event
+        return kwargs
+
+    def _race(
+        self,
+        request_data: dict,
+        size: int,
+        threshold: float,
+        deadline: Optional[float],
+        cancel_event: Optional[threading.Event],
+    ) -> Tuple[Optional[str], List[Union[str, GenerationStats]]]:
+        """
+        Runs the primary request, hedges it after `threshold` and waits for the first answer.
+
+        Raises:
+            GenAICancelledError: As soon as `cancel_event` is set, after cancelling the requests.
+            GenAITimeoutError: As soon as the deadline passes, after cancelling the requests.
+
+        Returns:
+            Tuple[Optional[str], List[Union[str, GenerationStats]]]: Who won (`primary`, `hedge`, or None if the request was not hedged) and the answer.
+        """
+        start = time.monotonic()
+        expires = None if deadline is None else start + deadline
+        outcomes: queue.Queue = queue.Queue()
+        events: Dict[str, threading.Event] = {}
+
+        def launch(name: str, service: GenAIOperator) -> None:
+            event = threading.Event()
+            events[name] = event
+            remaining = None if expires is None else expires - time.monotonic()
+            kwargs = {"cancel_event": event}
+            if remaining is not None:
+                kwargs["deadline"] = remaining
+            launched = time.monotonic()
+
+            def run() -> None:
+                try:
+                    answer = list(service.chat(request_data=request_data, **kwargs))
+                    outcomes.put((name, answer, None, time.monotonic() - launched))
+                except BaseException as e:
+                    outcomes.put((name, None, e, time.monotonic() - launched))
+
+            threading.Thread(target=run, daemon=True, name=f"hedge-{name}").start()
+
+        def cancel(names) -> None:
+            for name in names:
+                events[name].set()
+
+        launch("primary", self.primary)
+        running = {"primary"}
+        hedge_at = start + threshold
+        error = None
+        while running:
+            # Raised without waiting for the requests, which stop on their own once cancelled.
+            if cancel_event is not None and cancel_event.is_set():
+                cancel(running)
+                raise GenAICancelledError("The request was cancelled.")
+            if expires is not None and time.monotonic() >= expires:
+                cancel(running)
+                raise GenAITimeoutError("The request exceeded its deadline.")
+            timeout = POLL_INTERVAL
+            if "hedge" not in events:
+                timeout = min(timeout, max(hedge_at - time.monotonic(), 0.0))
+            if expires is not None:
+                timeout = min(timeout, max(expires - time.monotonic(), 0.0))
+            try:
+                name, answer, e, elapsed = outcomes.get(timeout=timeout)
+            except queue.Empty:
+                if "hedge" not in events and time.monotonic() >= hedge_at:
+                    if self.policy.allow_hedge():
+                        launch("hedge", self._backup())
+                        running.add("hedge")
+                    else:
+                        # Never hedge this request, and wait without a hedge timeout.
+                        events["hedge"] = None
+                continue
+            running.discard(name)
+            if e is None:
+                if name == "primary":
+                    self.policy.record(size, elapsed)
+                else:
+                    self.policy.count("hedge_wins")
+                    self.policy.record(size, time.monotonic() - start)
+                if running:
+                    self.policy.count("cancelled")
+                    cancel(running)
+                hedged = events.get("hedge") is not None
+                return (name if hedged else None), answer
+            if cancel_event is not None and cancel_event.is_set():
+                e = GenAICancelledError("The request was cancelled.")
+            error = e
+            if name == "primary" and "hedge" not in events:
+                # Failed before being hedged: no duplicate for errors.
+                break
+        raise error
@@ -1,17 +1,116 @@
+import contextlib
 import json
+import socket
+import threading
 import time
 from collections.abc import Generator
+from typing import Optional, Union
 
 import httpx
 
+from GenAIServices.breaker import CircuitBreaker
 from GenAIServices.core import GenAIOperator
+from GenAIServices.errors import (
+    GenAICancelledError,
+    GenAIConnectionError,
+    GenAIError,
+    GenAIResponseError,
+    GenAIServerError,
+    GenAITimeoutError,
+)
+from models import GenerationStats
+from utils import tracer
+
+# Seconds between two checks of the cancel event of a request by its watcher.
+POLL_INTERVAL = 0.05
+
+
+class _RequestWatcher:
+    """
+    Aborts a request from a background thread once its cancel event is set or its deadline passes, by
+    shutting down its socket. This wakes up a read blocked on a server that stopped sending, which neither
+    the per-read timeouts of httpx nor checks between received chunks can do.
+    """
+
+    def __init__(
+        self, expires: Optional[float], cancel_event: Optional[threading.Event]
+    ):
+        """
+        Args:
+            expires (Optional[float]): `time.monotonic()` deadline of the request.
+            cancel_event (Optional[threading.Event]): Cancels the request when set.
+        """
+        self.expires = expires
+        self.cancel_event = cancel_event
+        # The error to raise once the watcher aborted the request, else None.
+        self.error: Optional[GenAIError] = None
+        self._socket: Optional[socket.socket] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="ollama-watcher"
+        )
+
+    def __enter__(self) -> "_RequestWatcher":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._done.set()
+        self._thread.join()
+
+    def trace(self, event_name: str, info: dict) -> None:
+        """
+        httpcore trace callback, keeping the socket of the request once connected.
+        """
+        if event_name != "connection.connect_tcp.complete":
+            return
+        with self._lock:
+            self._socket = info["return_value"].get_extra_info("socket")
+            if self.error is not None:
+                self._shutdown()
+
+    def _run(self) -> None:
+        while True:
+            timeout = POLL_INTERVAL
+            if self.expires is not None:
+                timeout = min(timeout, max(self.expires - time.monotonic(), 0.0))
+            if self._done.wait(timeout):
+                return
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                error = GenAICancelledError("The request was cancelled.")
+            elif self.expires is not None and time.monotonic() >= self.expires:
+                error = GenAITimeoutError("The request exceeded its deadline.")
+            else:
+                continue
+            with self._lock:
+                self.error = error
+                self._shutdown()
+            return
+
+    def _shutdown(self) -> None:
+        if self._socket is None:
+            return
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
 
 
 class OllamaHandler(GenAIOperator):
-    def __init__(self, url: str):
+    def __init__(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
         """Initializes the Ollama API client.
         Args:
             url (str): The base URL of the Ollama API.
+            timeout (Optional[float]): Default deadline of a chat request, in seconds. Default: None (no
+                deadline).
+            breaker (Optional[CircuitBreaker]): Rejects requests while the API keeps failing, see
+                `CircuitBreaker`. Default: None.
         Raises:
             RuntimeError: If the connection to the Ollama API fails.
 
@@ -20,6 +119,8 @@ class OllamaHandler(GenAIOperator):
             url += "/"
         if not url.startswith("http://") and not url.startswith("https://"):
             raise ValueError("URL must start with 'http://' or 'https://'")
+        self.timeout = timeout
+        self.breaker = breaker
         self.url = self._connect(url=url)
 
     def _connect(self, url: str) -> None:
@@ -41,12 +142,25 @@ class OllamaHandler(GenAIOperator):
         except httpx.RequestError as e:
             raise RuntimeError(f"Connection error: {str(e)}")
 
-    def chat(self, request_data: dict) -> Generator[str, None, None]:
+    def chat(
+        self,
+        request_data: dict,
+        deadline: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Generator[Union[str, GenerationStats], None, None]:
         """Generates a chat stream from the Ollama API.
         Args:
             request_data (dict): The request data to send to the API.
+            deadline (Optional[float]): Seconds the whole request may take, overriding the `timeout` of the
+                handler. A request still running at its deadline is aborted, even while waiting for data.
+            cancel_event (Optional[threading.Event]): Setting it from another thread cancels the request,
+                closing its connection, even while waiting for data.
         Yields:
             str: The generated text from the API.
+            GenerationStats: Last, the token counts and durations reported in the final response, with the
+                time to first token measured by the client for a streamed (chunked) response; a complete
+                response arrives at once, so its time to first token is left unset. Not yielded if the server
+                reports no counters.
         Example:
             request_data = {
                 "model": "llama3.2:1b",
@@ -54,41 +168,182 @@ class OllamaHandler(GenAIOperator):
             }
 
         Raises:
-            RuntimeError: If the response status code is not 200.
-            json.JSONDecodeError: If the response cannot be decoded as JSON.
-            BaseException: For any other exceptions that occur during the request.
+            CircuitOpenError: If the circuit breaker of the handler rejects the request.
+            GenAITimeoutError: If the request exceeds its deadline.
+            GenAICancelledError: If `cancel_event` is set.
+            GenAIConnectionError: If the API cannot be reached or the connection breaks.
+            GenAIServerError: If the response status code is not 200.
+            GenAIResponseError: If the response cannot be decoded or reports an error.
         """
+        timeout = deadline if deadline is not None else self.timeout
+        expires = None if timeout is None else time.monotonic() + timeout
+        if self.breaker is not None:
+            self.breaker.before_request()
+        # True once answered, False on a failure of the endpoint, None if neither (cancelled, closed early,
+        # or an undecodable response: the endpoint answered, so it does not count toward the breaker).
+        healthy = None
+        try:
+            yield from self._chat(request_data, expires, cancel_event)
+            healthy = True
+        except GenAIError as e:
+            if e.transient and not isinstance(e, GenAIResponseError):
+                healthy = False
+            raise
+        finally:
+            if self.breaker is not None:
+                if healthy:
+                    self.breaker.record_success()
+                elif healthy is False:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release()
+
+    def _chat(
+        self,
+        request_data: dict,
+        expires: Optional[float],
+        cancel_event: Optional[threading.Event],
+    ) -> Generator[Union[str, GenerationStats], None, None]:
+        def check() -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                raise GenAICancelledError("The request was cancelled.")
+            if expires is not None and time.monotonic() >= expires:
+                raise GenAITimeoutError("The request exceeded its deadline.")
+
+        check()
         headers = {"Content-Type": "application/json"}
+        start = time.perf_counter()
+        first_token = None
+        final = None
+        watcher = None
+        if expires is not None or cancel_event is not None:
+            watcher = _RequestWatcher(expires, cancel_event)
         try:
-            with httpx.stream(
-                "POST",
-                url=self.url + "api/chat",
-                json=request_data,
-                headers=headers,
-                timeout=None,
-            ) as response:
+            with (
+                watcher if watcher is not None else contextlib.nullcontext(),
+                tracer.span("genai", "chat", model=request_data.get("model")) as span,
+                httpx.Client(
+                    timeout=None if expires is None else expires - time.monotonic()
+                ) as client,
+                client.stream(
+                    "POST",
+                    url=self.url + "api/chat",
+                    json=request_data,
+                    headers=headers,
+                    extensions={"trace": watcher.trace} if watcher else {},
+                ) as response,
+            ):
                 response.encoding = "utf-8"
                 if response.status_code != 200:
-                    raise RuntimeError(f"Unexpected error: {response.status_code}")
-                else:
-                    if response.headers.get("Transfer-Encoding") == "chunked":
-                        for chunk in response.iter_lines():
-                            if chunk:
-                                try:
-                                    yield json.loads(chunk)["message"]["content"]
-                                except json.JSONDecodeError:
-                                    yield "Error: Failed to decode JSON response."
-                    else:
-                        # If the response is not chunked, read the entire conten
-                        content = response.read().decode("utf-8")
-                        try:
-                            data = json.loads(content)
+                    raise GenAIServerError(
+                        response.status_code, self._error_message(response)
+                    )
+                bytes_out = 0
+                if response.headers.get("Transfer-Encoding") == "chunked":
+                    for chunk in response.iter_lines():
+                        check()
+                        if chunk:
+                            bytes_out += len(chunk)
+                            data = self._decode(chunk)
+                            if first_token is None and data["message"]["content"]:
+                                first_token = time.perf_counter() - start
+                            if data.get("done"):
+                                final = data
                             yield data["message"]["content"]
-                        except (json.JSONDecodeError, KeyError):
-                            yield f"Error: Invalid full JSON response\n{content}"
+                else:
+                    content = b""
+                    for part in response.iter_bytes():
+                        check()
+                        content += part
+                    bytes_out = len(content)
+                    final = self._decode(content)
+                    yield final["message"]["content"]
+                span.set(bytes_in=len(response.request.content), bytes_out=bytes_out)
+                stats = self._stats(final, first_token)
+                if stats is not None:
+                    span.set(
+                        tokens_in=stats.prompt_tokens,
+                        tokens_out=stats.completion_tokens,
+                    )
+                    yield stats
+        except (httpx.TransportError, GenAIResponseError) as e:
+            # An aborted request fails on its shut down socket; report why it was aborted.
+            if watcher is not None and watcher.error is not None:
+                raise watcher.error from e
+            if isinstance(e, GenAIResponseError):
+                raise
+            if isinstance(e, httpx.TimeoutException):
+                raise GenAITimeoutError(
+                    f"The request exceeded its deadline: {e}"
+                ) from e
+            raise GenAIConnectionError(f"Connection error: {e}") from e
+
+    @staticmethod
+    def _decode(raw: Union[str, bytes]) -> dict:
+        """Decodes one response object of the Ollama API.
+        Args:
+            raw (Union[str, bytes]): A line of a streamed response, or a complete response.
+        Returns:
+            dict: The response object, with a `message.content`.
+        Raises:
+            GenAIResponseError: If it is not JSON, reports an error or has no message content.
+        """
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise GenAIResponseError(f"Failed to decode JSON response: {e}") from e
+        if not isinstance(data, dict):
+            raise GenAIResponseError("Invalid JSON response: not an object.")
+        if "error" in data:
+            raise GenAIResponseError(f"Ollama error: {data['error']}")
+        if not isinstance(data.get("message"), dict) or not isinstance(
+            data["message"].get("content"), str
+        ):
+            raise GenAIResponseError("Invalid JSON response: no message content.")
+        return data
 
-        except BaseException as e:
-            yield f"Error occurred: {str(e)}\n\n"
+    @staticmethod
+    def _error_message(response: httpx.Response) -> Optional[str]:
+        """Reads the error message of a failed response, e.g. `{"error": "..."}`.
+        Args:
+            response (httpx.Response): The streamed response.
+        Returns:
+            Optional[str]: The message, or None if the body cannot be read.
+        """
+        try:
+            body = response.read().decode("utf-8", errors="replace")
+        except httpx.HTTPError:
+            return None
+        try:
+            return str(json.loads(body)["error"])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return body[:200] or None
+
+    @staticmethod
+    def _stats(
+        data: Optional[dict], first_token: Optional[float]
+    ) -> Optional[GenerationStats]:
+        """Builds the stats of one request from the final Ollama response.
+        Args:
+            data (Optional[dict]): The final (`done`) response object.
+            first_token (Optional[float]): Seconds from sending the request to the first token, None if it was
+                not measured (not streamed).
+        Returns:
+            Optional[GenerationStats]: The stats, or None if the response has no counters.
+        """
+        if not data or ("eval_count" not in data and "prompt_eval_count" not in data):
+            return None
+        return GenerationStats(
+            requests=1,
+            prompt_tokens=data.get("prompt_eval_count", 0),
+            completion_tokens=data.get("eval_count", 0),
+            prompt_eval_duration=data.get("prompt_eval_duration", 0) / 1e9,
+            eval_duration=data.get("eval_duration", 0) / 1e9,
+            load_duration=data.get("load_duration", 0) / 1e9,
+            total_duration=data.get("total_duration", 0) / 1e9,
+            streamed_requests=0 if first_token is None else 1,
+            time_to_first_token=first_token,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+from benchmarks.runner import (
+    BenchmarkResult,
+    compare,
+    measure,
+    run_benchmarks,
+    run_size,
+)
+from benchmarks.standin import OllamaStandIn
+from benchmarks.synthetic import generate_document
+
+__all__ = [
+    "BenchmarkResult",
+    "OllamaStandIn",
+    "compare",
+    "generate_document",
+    "measure",
+    "run_benchmarks",
+    "run_size",
+]
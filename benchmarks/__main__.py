@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.runner import BenchmarkResult, compare, run_benchmarks
+
+
+def parse_size(value: str):
+    pages, elements = value.lower().split("x")
+    return int(pages), int(elements)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark every stage on synthetic documents against a local fake Ollama."
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_size,
+        default=[(2, 50), (10, 100), (20, 200)],
+        help="Documents as <pages>x<elements per page>.",
+    )
+    parser.add_argument("--metric", default="str_similarity")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds before the first token."
+    )
+    parser.add_argument(
+        "--token-latency", type=float, default=0.0, help="Seconds per token."
+    )
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--workdir", default=None, help="Where to keep the documents.")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_benchmarks(
+            args.sizes,
+            args.workdir or tmp,
+            metric=args.metric,
+            repeat=args.repeat,
+            latency=args.latency,
+            token_latency=args.token_latency,
+            memory=not args.no_memory,
+        )
+    Path(args.output).write_text(result.model_dump_json(indent=2), encoding="utf-8")
+
+    print(
+        f"{'size':>10} {'stage':>12} {'pages/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'peak MiB':>9}"
+    )
+    for size in result.sizes:
+        for stage, stats in size.stages.items():
+            peak = (
+                f"{stats.peak_memory / (1 << 20):9.2f}"
+                if stats.peak_memory is not None
+                else f"{'-':>9}"
+            )
+            print(
+                f"{size.pages}x{size.elements:<6} {stage:>12} {stats.pages_per_second:10.1f} "
+                f"{stats.p50 * 1e3:9.2f} {stats.p95 * 1e3:9.2f} {peak}"
+            )
+
+    if args.baseline:
+        baseline = BenchmarkResult.model_validate_json(
+            Path(args.baseline).read_text(encoding="utf-8")
+        )
+        changes = compare(result, baseline, tolerance=args.tolerance)
+        for change in changes:
+            print(
+                f"REGRESSION {change.size} {change.stage} {change.field}: "
+                f"{change.baseline:.6g} -> {change.current:.6g} (x{change.ratio:.2f})"
+            )
+        sys.exit(1 if changes else 0)
@@ -0,0 +1,312 @@
+import contextlib
+import math
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from benchmarks.standin import OllamaStandIn
+from benchmarks.synthetic import generate_document
+from converter import Transform
+from evaluator import Validate
+from metrics import SimilarityMetrics
+from preprocessor import XMLPreProcessor
+from readers import XMLParser
+from utils import commandline_executor
+
+
+class StageResult(BaseModel):
+    # Latencies in seconds, per call of the stage (a document for the reader, a page otherwise).
+    calls: int
+    pages: int
+    total: float
+    pages_per_second: float
+    p50: float
+    p95: float
+    peak_memory: Optional[int] = None
+
+
+class SizeResult(BaseModel):
+    pages: int
+    elements: int
+    stages: Dict[str, StageResult]
+
+
+class BenchmarkResult(BaseModel):
+    created: str
+    commit: Optional[str] = None
+    python: str
+    settings: Dict[str, Any]
+    sizes: List[SizeResult]
+
+
+class StageChange(BaseModel):
+    size: str
+    stage: str
+    field: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values (List[float]): The samples.
+        q (float): The percentile, between 0 and 1.
+
+    Returns:
+        float: The smallest sample with at least `q` of the samples at or below it; 0.0 without samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _commit() -> Optional[str]:
+    try:
+        return commandline_executor.run("git rev-parse HEAD").strip() or None
+    except Exception:
+        return None
+
+
+def measure(
+    calls: List[Callable[[], Any]],
+    pages: int,
+    repeat: int = 1,
+    memory: bool = True,
+) -> Tuple[StageResult, List[Any]]:
+    """
+    Times every call `repeat` times, then runs them once more under `tracemalloc` for the peak memory.
+
+    Timing and memory are measured in separate passes because tracing allocations slows Python code down
+    several times. The peak covers every thread of the process, the stand-in server included. Output of the
+    stages (`print`) is discarded.
+
+    Args:
+        calls (List[Callable[[], Any]]): One call per unit of work, e.g. per page.
+        pages (int): Number of pages covered by one pass over `calls`.
+        repeat (int): Number of timed passes. Default: 1.
+        memory (bool): Measure the peak memory. Default: True.
+
+    Returns:
+        Tuple[StageResult, List[Any]]: The measurements and the results of the last timed pass.
+    """
+    latencies = []
+    results = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            results = []
+            for call in calls:
+                start = time.perf_counter()
+                results.append(call())
+                latencies.append(time.perf_counter() - start)
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                for call in calls:
+                    call()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    total = sum(latencies)
+    return (
+        StageResult(
+            calls=len(latencies),
+            pages=pages * repeat,
+            total=total,
+            pages_per_second=pages * repeat / total if total else 0.0,
+            p50=percentile(latencies, 0.5),
+            p95=percentile(latencies, 0.95),
+            peak_memory=peak,
+        ),
+        results,
+    )
+
+
+def run_size(
+    path: Union[Path, str],
+    standin: OllamaStandIn,
+    metric: str = "str_similarity",
+    repeat: int = 1,
+    memory: bool = True,
+) -> Dict[str, StageResult]:
+    """
+    Runs every stage on one document.
+
+    Args:
+        path (Union[Path, str]): A pdftohtml XML document.
+        standin (OllamaStandIn): The running fake Ollama server used by the converter.
+        metric (str): Name of the evaluator metric, see `SimilarityMetrics`. Default: `str_similarity`.
+        repeat (int): Number of timed passes of each stage. Default: 1.
+        memory (bool): Measure the peak memory of each stage. Default: True.
+
+    Returns:
+        Dict[str, StageResult]: The measurements of `reader`, `preprocessor`, `converter` and `evaluator`.
+    """
+    parser = XMLParser()
+    preprocessor = XMLPreProcessor()
+    transform = Transform(model_name="standin", model_url=standin.url)
+    metric_class, setting = SimilarityMetrics.get(metric)
+    validate = Validate(metrics=metric_class, setting=setting)
+
+    # Untimed warm-up parse, which also warms the file cache.
+    page_nums = list(parser.process(path).pages)
+    n_pages = len(page_nums)
+
+    stages = {}
+    stages["reader"], (gt_data,) = measure(
+        [lambda: parser.process(path, with_fragments=True)], n_pages, repeat, memory
+    )
+
+    stages["preprocessor"], contents = measure(
+        [
+            lambda page_num=page_num: preprocessor.process_page(
+                gt_data.pages[page_num], page_num
+            )
+            for page_num in page_nums
+        ],
+        n_pages,
+        repeat,
+        memory,
+    )
+    stages["converter"], generated = measure(
+        [
+            lambda content=content, page_num=page_num: transform.process_page(
+                content, page_num=page_num
+            )
+            for page_num, content in zip(page_nums, contents)
+        ],
+        n_pages,
+        repeat,
+        memory,
+    )
+    stages["evaluator"], _ = measure(
+        [
+            lambda page_num=page_num, page=page: validate.score_page(
+                gt_data.pages[page_num], page.data, page_num
+            )
+            for page_num, page in zip(page_nums, generated)
+        ],
+        n_pages,
+        repeat,
+        memory,
+    )
+    return stages
+
+
+def run_benchmarks(
+    sizes: List[Tuple[int, int]],
+    workdir: Union[Path, str],
+    metric: str = "str_similarity",
+    repeat: int = 1,
+    latency: float = 0.0,
+    token_latency: float = 0.0,
+    memory: bool = True,
+    seed: int = 0,
+) -> BenchmarkResult:
+    """
+    Generates one synthetic document per size and runs every stage on it against a local fake Ollama.
+
+    Args:
+        sizes (List[Tuple[int, int]]): (pages, elements per page) of each document.
+        workdir (Union[Path, str]): Where the documents are written; existing ones are reused.
+        metric (str): Name of the evaluator metric. Default: `str_similarity`.
+        repeat (int): Number of timed passes of each stage. Default: 1.
+        latency (float): Seconds before the first token of every fake response. Default: 0.0.
+        token_latency (float): Seconds per generated token of the fake responses. Default: 0.0.
+        memory (bool): Measure the peak memory of each stage. Default: True.
+        seed (int): Seed of the document generator. Default: 0.
+
+    Returns:
+        BenchmarkResult: The measurements with the settings, commit and Python version of the run.
+    """
+    workdir = Path(workdir)
+    results = []
+    with OllamaStandIn(latency=latency, token_latency=token_latency) as standin:
+        for pages, elements in sizes:
+            path = workdir / f"synthetic_{pages}x{elements}_{seed}.xml"
+            if not path.exists():
+                generate_document(path, pages, elements, seed)
+            results.append(
+                SizeResult(
+                    pages=pages,
+                    elements=elements,
+                    stages=run_size(path, standin, metric, repeat, memory),
+                )
+            )
+
+    return BenchmarkResult(
+        created=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        commit=_commit(),
+        python=platform.python_version(),
+        settings={
+            "metric": metric,
+            "repeat": repeat,
+            "latency": latency,
+            "token_latency": token_latency,
+            "seed": seed,
+        },
+        sizes=results,
+    )
+
+
+def compare(
+    current: BenchmarkResult,
+    baseline: BenchmarkResult,
+    tolerance: float = 0.1,
+    fields: Tuple[str, ...] = ("p50", "p95", "peak_memory"),
+) -> List[StageChange]:
+    """
+    Flags the measurements that got worse than the baseline by more than `tolerance`.
+
+    Sizes and stages missing from either result are ignored, so suites of different sizes can be compared.
+
+    Args:
+        current (BenchmarkResult): The new run.
+        baseline (BenchmarkResult): The run to compare against.
+        tolerance (float): Allowed relative increase, e.g. 0.1 for +10%. Default: 0.1.
+        fields (Tuple[str, ...]): `StageResult` fields to compare. Default: p50, p95 and peak memory.
+
+    Returns:
+        List[StageChange]: The regressions.
+    """
+    baseline_sizes = {(size.pages, size.elements): size for size in baseline.sizes}
+    changes = []
+    for size in current.sizes:
+        old = baseline_sizes.get((size.pages, size.elements))
+        if old is None:
+            continue
+        for stage, result in size.stages.items():
+            old_result = old.stages.get(stage)
+            if old_result is None:
+                continue
+            for field in fields:
+                value, old_value = getattr(result, field), getattr(old_result, field)
+                if value is None or old_value is None:
+                    continue
+                if value > old_value * (1 + tolerance):
+                    changes.append(
+                        StageChange(
+                            size=f"{size.pages}x{size.elements}",
+                            stage=stage,
+                            field=field,
+                            baseline=old_value,
+                            current=value,
+                        )
+                    )
+    return changes
@@ -0,0 +1,403 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from GenAIServices.cassette import CassetteHandler, CassetteMissError
+
+# Text content of the pdf2xml `<text>` elements of a prompt; they always have attributes, unlike the
+# `<text>` mentioned in the instructions of `DEFAULT_PROMPT`.
+_TEXT_PATTERN = re.compile(r"<text\s[^>]*>(.*?)</text>", flags=re.DOTALL)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+# Splits a response into the chunks streamed as tokens.
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def echo_texts(prompt: str) -> str:
+    """
+    Default answer of `OllamaStandIn`: a JSON object with the text of every `<text>` element of the prompt,
+    so the evaluator has realistic work to do.
+
+    Args:
+        prompt (str): Content of the last message.
+
+    Returns:
+        str: The JSON answer.
+    """
+    texts = [
+        _TAG_PATTERN.sub("", text).strip() for text in _TEXT_PATTERN.findall(prompt)
+    ]
+    return json.dumps(
+        {"content": {f"line_{idx}": text for idx, text in enumerate(texts) if text}},
+        ensure_ascii=False,
+    )
+
+
+def request_key(request_data: dict) -> str:
+    """
+    Identifies a chat request by its model and messages, ignoring options such as `stream`.
+
+    Args:
+        request_data (dict): The request body.
+
+    Returns:
+        str: The SHA-256 hex digest of the canonical JSON of the model and messages.
+    """
+    canonical = json.dumps(
+        {"model": request_data.get("model"), "messages": request_data.get("messages")},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle's algorithm the body waits for a delayed ACK.
+    disable_nagle_algorithm = True
+    server: "ThreadingHTTPServer"
+
+    def log_message(self, format, *args) -> None:
+        return None
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, stall: float = 0.0
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if stall:
+            self.wfile.flush()
+            time.sleep(stall)
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send(
+            status,
+            json.dumps({"error": message}).encode("utf-8"),
+            "application/json; charset=utf-8",
+        )
+
+    def do_GET(self) -> None:
+        self._send(200, b"Ollama is running", "text/plain; charset=utf-8")
+
+    def do_POST(self) -> None:
+        standin: OllamaStandIn = self.server.standin
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("api/chat"):
+            self._send(404, b"404 page not found", "text/plain; charset=utf-8")
+            return
+        try:
+            request_data = json.loads(body)
+        except json.JSONDecodeError:
+            self._send_error(400, "invalid request body")
+            return
+
+        fault = standin._admit(request_data)
+        if fault == "busy":
+            self._send_error(
+                503, "server busy, please try again.  maximum pending requests exceeded"
+            )
+            return
+        try:
+            if fault == "error":
+                self._send_error(500, "injected error")
+            else:
+                self._answer(standin, request_data, fault)
+        finally:
+            standin._release()
+
+    def _answer(
+        self, standin: "OllamaStandIn", request_data: dict, fault: Optional[str]
+    ) -> None:
+        messages = request_data.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+
+        start = time.perf_counter_ns()
+        time.sleep(standin.latency)
+        content = standin._content(request_data, prompt)
+        if fault == "truncated":
+            # A truncated answer, as when the model stops early: valid NDJSON, but not a JSON answer.
+            content = content[: len(content) // 2]
+        tokens = _TOKEN_PATTERN.findall(content)
+        final = {
+            "model": request_data.get("model"),
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": max(1, len(prompt) // 4),
+            "eval_count": len(tokens),
+            "load_duration": 0,
+        }
+
+        stream = standin.stream
+        if stream is None:
+            stream = request_data.get("stream", True)
+        if stream:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            first = time.perf_counter_ns()
+            for idx, token in enumerate(tokens):
+                if idx == len(tokens) // 2:
+                    if fault == "malformed":
+                        break
+                    time.sleep(standin.stall)
+                time.sleep(standin.token_latency)
+                self._write_chunk(
+                    self._line(
+                        {
+                            "model": request_data.get("model"),
+                            "message": {"role": "assistant", "content": token},
+                            "done": False,
+                        }
+                    )
+                )
+            end = time.perf_counter_ns()
+            final["message"] = {"role": "assistant", "content": ""}
+            line = self._line(self._durations(final, start, first, end))
+            if fault == "malformed":
+                # A cut protocol line, e.g. a proxy dropping the end of the stream: not valid NDJSON.
+                line = line[: len(line) // 2] + b"\n"
+            self._write_chunk(line)
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            first = time.perf_counter_ns()
+            time.sleep(standin.token_latency * len(tokens))
+            end = time.perf_counter_ns()
+            final["message"] = {"role": "assistant", "content": content}
+            body = json.dumps(self._durations(final, start, first, end)).encode("utf-8")
+            if fault == "malformed":
+                # A cut response body: not valid JSON.
+                body = body[: len(body) // 2]
+            self._send(200, body, "application/json; charset=utf-8", standin.stall)
+
+    @staticmethod
+    def _durations(final: dict, start: int, first: int, end: int) -> dict:
+        final["prompt_eval_duration"] = first - start
+        final["eval_duration"] = end - first
+        final["total_duration"] = end - start
+        return final
+
+    @staticmethod
+    def _line(data: dict) -> bytes:
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _write_chunk(self, line: bytes) -> None:
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+class OllamaStandIn:
+    """
+    A local fake of the Ollama chat API, for benchmarks, load tests and tests that must not depend on a
+    live model or a GPU.
+
+    It serves `GET /` and `POST /api/chat` on a loopback port from a background thread, waits `latency`
+    seconds before the first token, `token_latency` seconds per token and `stall` seconds halfway through the
+    answer, and answers streamed (`"stream": true`, chunked NDJSON) or complete (`"stream": false`)
+    responses in the Ollama format, including the token counters and durations of the final response.
+
+    Like Ollama, it answers at most `max_concurrency` requests at once and queues the others, and rejects
+    new requests with 503 while `max_queue` requests are waiting. Faults are drawn deterministically: whether
+    a request fails with 500 (`error_rate`), gets a response that is not valid (ND)JSON (`malformed_rate`) or
+    a truncated answer that is not a JSON object (`truncated_rate`) only depends on `seed`, the request and
+    how many times the same request was seen before, so retries draw again and runs are reproducible under
+    any concurrency. With `replay`, recorded answers of a `CassetteHandler` cassette are served instead of
+    `respond`'s, in the recorded order.
+
+    Not packaged: it lives in `benchmarks` and is only meant for benchmarks and tests.
+
+    Example:
+        with OllamaStandIn(latency=0.05, max_concurrency=2, error_rate=0.1) as standin:
+            transform = Transform(model_name="fake", model_url=standin.url)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        token_latency: float = 0.0,
+        stall: float = 0.0,
+        respond: Callable[[str], str] = echo_texts,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        truncated_rate: float = 0.0,
+        replay: Optional[Union[Path, str]] = None,
+        stream: Optional[bool] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Args:
+            latency (float): Seconds before the first token of every response. Default: 0.0.
+            token_latency (float): Seconds per generated token. Default: 0.0.
+            stall (float): Seconds the response stops halfway through, as a stuck generation or connection:
+                after half the tokens of a streamed response, after the headers of a complete one.
+                Default: 0.0.
+            respond (Callable[[str], str]): Builds the answer from the content of the last message.
+                Default: `echo_texts`.
+            max_concurrency (Optional[int]): Number of requests answered at once; the others wait.
+                Default: None (unlimited).
+            max_queue (Optional[int]): Number of waiting requests before new ones get a 503, only used with
+                `max_concurrency`. Default: None (unlimited).
+            error_rate (float): Share of requests failing with HTTP 500. Default: 0.0.
+            malformed_rate (float): Share of requests answered with a cut response: a streamed response ends
+                with an invalid NDJSON line, a complete one has an invalid JSON body. Default: 0.0.
+            truncated_rate (float): Share of requests whose answer is cut in half, as when the model stops
+                early; the response itself is valid. Default: 0.0.
+            replay (Optional[Union[Path, str]]): Cassette recorded by `CassetteHandler`. A recorded request
+                gets its recorded answers instead of `respond`'s. Default: None.
+            stream (Optional[bool]): Force chunked (True) or complete (False) responses. Default: None (as
+                requested by the client).
+            seed (int): Seed of the fault injection. Default: 0.
+            host (str): Address to bind. Default: loopback.
+            port (int): Port to bind; 0 picks a free one. Default: 0.
+
+        Raises:
+            ValueError:
+                max_concurrency must be a positive integer.
+        """
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError("max_concurrency must be a positive integer.")
+        self.latency = latency
+        self.token_latency = token_latency
+        self.stall = stall
+        self.respond = respond
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.truncated_rate = truncated_rate
+        self.replay = CassetteHandler(replay) if replay else None
+        self.stream = stream
+        self.seed = seed
+        self.host = host
+        self.port = port
+
+        self.requests: List[dict] = []
+        # Requests answered normally, rejected as busy, failed, answered with a cut response or a cut answer.
+        self.counters = {
+            "answered": 0,
+            "busy": 0,
+            "error": 0,
+            "malformed": 0,
+            "truncated": 0,
+        }
+        self.active = 0
+        self.peak_active = 0
+        self.waiting = 0
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_concurrency) if max_concurrency else None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        str: Base URL to pass to `OllamaHandler` / `Transform(model_url=...)`.
+        """
+        return f"http://{self.host}:{self.port}/"
+
+    def _content(self, request_data: dict, prompt: str) -> str:
+        if self.replay is not None:
+            try:
+                return "".join(
+                    res
+                    for res in self.replay.chat(request_data)
+                    if isinstance(res, str)
+                )
+            except CassetteMissError:
+                pass
+        return self.respond(prompt)
+
+    def _admit(self, request_data: dict) -> Optional[str]:
+        """
+        Records a request, waits for a free slot and draws its fault.
+
+        Args:
+            request_data (dict): The request body.
+
+        Returns:
+            Optional[str]: `busy` if the request is rejected, else the fault (None, `error`, `malformed` or
+                `truncated`);
+            the request then holds a slot until `_release`.
+        """
+        key = request_key(request_data)
+        with self._lock:
+            self.requests.append(request_data)
+            attempt = self._seen.get(key, 0)
+            self._seen[key] = attempt + 1
+            queued = self._slots is not None and not self._slots.acquire(blocking=False)
+            if queued:
+                if self.max_queue is not None and self.waiting >= self.max_queue:
+                    self.counters["busy"] += 1
+                    return "busy"
+                self.waiting += 1
+
+        if queued:
+            self._slots.acquire()
+            with self._lock:
+                self.waiting -= 1
+
+        draw = random.Random(f"{self.seed}:{key}:{attempt}").random()
+        if draw < self.error_rate:
+            fault = "error"
+        elif draw < self.error_rate + self.malformed_rate:
+            fault = "malformed"
+        elif draw < self.error_rate + self.malformed_rate + self.truncated_rate:
+            fault = "truncated"
+        else:
+            fault = None
+        with self._lock:
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            self.counters[fault or "answered"] += 1
+        return fault
+
+    def _release(self) -> None:
+        with self._lock:
+            self.active -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def start(self) -> "OllamaStandIn":
+        """
+        Starts serving in a daemon thread.
+
+        Returns:
+            OllamaStandIn: self.
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving and releases the port.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "OllamaStandIn":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
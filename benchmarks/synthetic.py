@@ -0,0 +1,79 @@
+import random
+from pathlib import Path
+from typing import Union
+from xml.sax.saxutils import escape
+
+PAGE_HEIGHT = 1170
+PAGE_WIDTH = 810
+# Vocabulary of the generated fragments, close to the sample datasheets.
+WORDS = (
+    "USB PCIe module port power input output signal GND Vbus pin temperature "
+    "operation storage support controller interface bandwidth voltage current "
+    "connector header cable driver kernel windows linux specification revision "
+    "industrial standard wide temp order information dimension vibration shock"
+).split()
+
+
+def _fragment(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(1, 8))
+    if rng.random() < 0.3:
+        words.append(f"{rng.randint(1, 9999)}{rng.choice(['V', 'mA', 'mm', 'Hz', ''])}")
+    return " ".join(words)
+
+
+def generate_document(
+    path: Union[Path, str], pages: int, elements: int, seed: int = 0
+) -> Path:
+    """
+    Writes a synthetic pdftohtml `-xml` document: `pages` pages of `elements` `<text>` elements each, with
+    random positions, fonts, bold titles and repeated fragments, as read by `XMLParser`.
+
+    The same arguments always produce the same file.
+
+    Args:
+        path (Union[Path, str]): The output XML file.
+        pages (int): Number of pages.
+        elements (int): Number of `<text>` elements per page.
+        seed (int): Seed of the random generator. Default: 0.
+
+    Returns:
+        Path: The output path.
+    """
+    rng = random.Random(f"{seed}:{pages}:{elements}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<!DOCTYPE pdf2xml SYSTEM "pdf2xml.dtd">\n\n')
+        f.write('<pdf2xml producer="poppler" version="0.86.1">\n')
+        for page_num in range(1, pages + 1):
+            f.write(
+                f'<page number="{page_num}" position="absolute" top="0" left="0" '
+                f'height="{PAGE_HEIGHT}" width="{PAGE_WIDTH}">\n'
+            )
+            for font in range(4):
+                f.write(
+                    f'\t<fontspec id="{font}" size="{10 + 2 * font}" '
+                    'family="ABCDEE+Tahoma" color="#404040"/>\n'
+                )
+            previous = []
+            for _ in range(elements):
+                # Datasheets repeat labels such as "GND" or "Pin" many times per page.
+                if previous and rng.random() < 0.1:
+                    text = rng.choice(previous)
+                else:
+                    text = _fragment(rng)
+                    previous.append(text)
+                text = escape(text)
+                if rng.random() < 0.1:
+                    text = f"<b>{text}</b>"
+                top = rng.randint(10, PAGE_HEIGHT - 30)
+                left = rng.randint(10, PAGE_WIDTH - 100)
+                f.write(
+                    f'<text top="{top}" left="{left}" width="{8 * len(text)}" '
+                    f'height="15" font="{rng.randint(0, 3)}">{text}</text>\n'
+                )
+            f.write("</page>\n")
+        f.write("</pdf2xml>\n")
+    return path
@@ -1,3 +1,5 @@
+from converter.journal import ConversionJournal
 from converter.main import Transform
+from converter.stats import merge_stats, to_prometheus
 
-__all__ = ["Transform"]
+__all__ = ["ConversionJournal", "Transform", "merge_stats", "to_prometheus"]
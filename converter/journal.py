@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from models import GenerationStats, PreProcData
+
+SUFFIX = ".journal.jsonl"
+
+
+def document_hash(data: PreProcData) -> str:
+    """
+    Hashes the converter input of a document.
+
+    Args:
+        data (PreProcData): The preprocessed document.
+
+    Returns:
+        str: The SHA-256 hex digest of its JSON serialization.
+    """
+    return hashlib.sha256(data.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def config_hash(model_name: str, prompt: str) -> str:
+    """
+    Hashes the converter settings that change the generated JSON.
+
+    Args:
+        model_name (str): The model.
+        prompt (str): The prompt template.
+
+    Returns:
+        str: The SHA-256 hex digest of the settings.
+    """
+    config = json.dumps({"model": model_name, "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+class ConversionJournal:
+    """
+    Append-only journal of the sections generated for one document with one converter configuration.
+
+    Each generated section is appended as one JSON line and the file is fsynced every `sync_every` records
+    or `sync_interval` seconds, and on `close`, so a crash loses at most the last unsynced sections. The
+    journal file is named after the document hash and the config hash: a rerun of the same document with
+    the same model and prompt finds it and only generates the missing sections, while any change of input or
+    configuration starts a new journal. A truncated last line (a crash during a write) is ignored.
+    """
+
+    def __init__(
+        self,
+        directory: Union[Path, str],
+        document: str,
+        config: str,
+        sync_every: int = 16,
+        sync_interval: float = 1.0,
+    ):
+        """
+        Args:
+            directory (Union[Path, str]): Where the journals are kept; created if missing.
+            document (str): The document hash, see `document_hash`.
+            config (str): The config hash, see `config_hash`.
+            sync_every (int): Number of records between two fsyncs. Default: 16.
+            sync_interval (float): Maximum number of seconds between two fsyncs. Default: 1.0.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / f"{document[:32]}-{config[:16]}{SUFFIX}"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.sections: Dict[Tuple[int, int], Tuple[dict, Optional[GenerationStats]]] = (
+            self._load(self.path)
+        )
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self._file.tell() and not self._ends_with_newline(self.path):
+            # Start after the truncated line of a crashed run.
+            self._file.write("\n")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def _ends_with_newline(path: Path) -> bool:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _load(
+        path: Path,
+    ) -> Dict[Tuple[int, int], Tuple[dict, Optional[GenerationStats]]]:
+        sections = {}
+        if not path.exists():
+            return sections
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                stats = record.get("stats")
+                sections[(record["page"], record["section"])] = (
+                    record["data"],
+                    GenerationStats.model_validate(stats) if stats else None,
+                )
+        return sections
+
+    @staticmethod
+    def for_document(
+        directory: Union[Path, str],
+        data: PreProcData,
+        model_name: str,
+        prompt: str,
+        **kwargs,
+    ) -> "ConversionJournal":
+        """
+        Opens the journal of a document and converter configuration.
+
+        Args:
+            directory (Union[Path, str]): Where the journals are kept.
+            data (PreProcData): The preprocessed document.
+            model_name (str): The model.
+            prompt (str): The prompt template.
+            kwargs (dict): `sync_every` / `sync_interval`.
+
+        Returns:
+            ConversionJournal: The journal, with the sections of previous runs.
+        """
+        return ConversionJournal(
+            directory, document_hash(data), config_hash(model_name, prompt), **kwargs
+        )
+
+    def __contains__(self, key: Tuple[int, int]) -> bool:
+        return key in self.sections
+
+    def get(
+        self, page_num: int, section: int
+    ) -> Optional[Tuple[dict, Optional[GenerationStats]]]:
+        """
+        Args:
+            page_num (int): The page number.
+            section (int): The section of the page.
+
+        Returns:
+            Optional[Tuple[dict, Optional[GenerationStats]]]: The journaled JSON and generation stats of the
+            section, or None if it was not generated yet.
+        """
+        return self.sections.get((page_num, section))
+
+    def record(
+        self,
+        page_num: int,
+        section: int,
+        data: dict,
+        stats: Optional[GenerationStats] = None,
+    ) -> None:
+        """
+        Appends a generated section.
+
+        Args:
+            page_num (int): The page number.
+            section (int): The section of the page.
+            data (dict): The generated JSON.
+            stats (Optional[GenerationStats]): The generation stats of the section.
+        """
+        line = json.dumps(
+            {
+                "page": page_num,
+                "section": section,
+                "data": data,
+                "stats": stats.model_dump() if stats else None,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self.sections[(page_num, section)] = (data, stats)
+            self._file.write(line + "\n")
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            ):
+                self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Syncs and closes the journal file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def __enter__(self) -> "ConversionJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
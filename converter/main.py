@@ -1,10 +1,38 @@
 import json
 import re
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
 from jinja2 import StrictUndefined, Template, UndefinedError
 
-from GenAIServices import GenAIOperator, OllamaHandler
-from models import PageGenerate, PreProcData, TransformData
+from converter.journal import ConversionJournal
+from converter.stats import merge_stats
+from GenAIServices import (
+    GenAIError,
+    GenAIOperator,
+    HedgedHandler,
+    HedgePolicy,
+    OllamaHandler,
+)
+from models import (
+    GenerationStats,
+    PageContent,
+    PageGenerate,
+    PreProcData,
+    TransformData,
+)
+from utils import tracer
+
+DEFAULT_PROMPT = """The following XML content was converted from a PDF using `pdf2xml`. Your task is to extract structured information from this XML based on the `<text>` tags, focusing on the actual text content and its positions (`top`, `left`).
+            ### XML Content:
+            ```xml
+            {{xml_content}}
+            ```
+            Please convert the extracted information into a well-structured JSON format, organized by section headers and their corresponding key-value pairs. Do not include any attribute metadata in the JSON. Ensure that the JSON syntax is valid, with proper indentation, brackets, and quotation marks.
+            Output only the JSON."""
 
 
 class Transform:
@@ -12,12 +40,40 @@ class Transform:
         self,
         model_name: str,
         model_url: str = "http://127.0.0.1:6589/model_server/",
+        gen_ai: Optional[GenAIOperator] = None,
+        request_timeout: Optional[float] = None,
+        hedge: Optional[HedgePolicy] = None,
+        hedge_backups: Optional[Sequence[Union[str, GenAIOperator]]] = None,
         **kwargs,
     ):
+        """
+        Args:
+            model_name (str): The model generating the JSON.
+            model_url (str): The base URL of the Ollama API.
+            gen_ai (Optional[GenAIOperator]): The GenAI service to use instead of an `OllamaHandler` on
+                `model_url`, e.g. a `CassetteHandler` replaying recorded answers. Default: None.
+            request_timeout (Optional[float]): Deadline of each request to the GenAI service, in seconds. A
+                request exceeding it is retried like an invalid answer. Default: None (no deadline).
+            hedge (Optional[HedgePolicy]): Hedges slow requests: a request running longer than the observed
+                latency quantile of its prompt size gets a duplicate, the first answer wins and the other
+                request is cancelled, see `HedgedHandler`. Its `counters` report the hedging. Default: None.
+            hedge_backups (Optional[Sequence[Union[str, GenAIOperator]]]): Services, or Ollama base URLs,
+                receiving the duplicates in turn. Default: None (the duplicates go to the same service).
+        """
         self.model_name = model_name
         self.model_url = model_url
-
-        self.gen_ai = OllamaHandler(url=self.model_url)
+        self.request_timeout = request_timeout
+
+        self.gen_ai = (
+            gen_ai if gen_ai is not None else OllamaHandler(url=self.model_url)
+        )
+        self.hedge = hedge
+        if hedge is not None:
+            backups = [
+                OllamaHandler(url=backup) if isinstance(backup, str) else backup
+                for backup in hedge_backups or []
+            ]
+            self.gen_ai = HedgedHandler(self.gen_ai, backups=backups, policy=hedge)
 
     def extract_json_blocks(self, text_blocks: str) -> dict:
         """
@@ -44,6 +100,8 @@ class Transform:
         gen_ai_service: GenAIOperator,
         request_data: dict,
         max_retries: int,
+        stats: Optional[List[GenerationStats]] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> dict:
         """
         Generates a result with json type of the given data using a language model.
@@ -52,6 +110,10 @@ class Transform:
             gen_ai_service (GenAIOperator): The language model service to use.
             request_data (dict): The request data for the language model.
             max_retries (int): Maximum number of retries for generating a valid JSON.
+            stats (Optional[List[GenerationStats]]): If given, the `GenerationStats` yielded by the service for
+                every request, retries included, are appended to it.
+            cancel_event (Optional[threading.Event]): Passed to the service; setting it cancels the request in
+                flight. Default: None.
 
         Returns:
             str: The generated result in JSON format.
@@ -63,6 +125,9 @@ class Transform:
                 - Request data must contain 'messages'.
             RuntimeError:
                 Invalid JSON format after max_retries times.
+            GenAIError:
+                The error of the service if the last try failed with a transient error (e.g. a timeout), or as
+                soon as it fails with an error retrying cannot fix (e.g. cancelled, circuit open).
             Exception:
                 An error occurred while get generated result.
 
@@ -86,14 +151,34 @@ class Transform:
         if not request_data.get("ollama_url"):
             request_data["ollama_url"] = self.model_url
 
+        # Only passed when set, so services without deadlines or cancellation keep working.
+        chat_kwargs = {}
+        if self.request_timeout is not None:
+            chat_kwargs["deadline"] = self.request_timeout
+        if cancel_event is not None:
+            chat_kwargs["cancel_event"] = cancel_event
+
         try:
             copy_max_retries = max_retries
+            last_error = None
             while max_retries > 0:
                 print(f"current retry : {max_retries}")
                 gen_text = ""
-                for res in gen_ai_service.chat(request_data=request_data):
-                    if isinstance(res, str):
-                        gen_text += res
+                try:
+                    for res in gen_ai_service.chat(
+                        request_data=request_data, **chat_kwargs
+                    ):
+                        if isinstance(res, str):
+                            gen_text += res
+                        elif isinstance(res, GenerationStats) and stats is not None:
+                            stats.append(res)
+                except GenAIError as e:
+                    if not e.transient:
+                        raise
+                    last_error = e
+                    max_retries -= 1
+                    continue
+                last_error = None
                 # cleaned = gen_text.strip().strip("```").replace("json\n", "", 1).strip()
                 match = re.search(r"\{.*\}", gen_text, flags=re.DOTALL)
                 cleaned = None
@@ -111,21 +196,204 @@ class Transform:
                     print(f"type(cleaned): {type(cleaned)}")
                     max_retries -= 1
 
+            if last_error is not None:
+                raise last_error
             raise RuntimeError(f"Invalid JSON format after {copy_max_retries} retries.")
         except Exception as e:
             raise e
 
+    def process_page(
+        self,
+        page: PageContent,
+        template: Union[Template, str] = DEFAULT_PROMPT,
+        max_retries: int = 5,
+        page_num: Optional[int] = None,
+        journal: Optional[ConversionJournal] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> PageGenerate:
+        """
+        Generates the JSON of every section of one page.
+
+        Args:
+            page (PageContent): The sections of one page.
+            template (Union[Template, str]): The prompt, as a compiled template or a template string. See `process`.
+                Default: `DEFAULT_PROMPT`.
+            max_retries (int): Maximum number of retries for generating a valid JSON.
+            page_num (Optional[int]): The page number, labels the tracing spans and the journal records.
+            journal (Optional[ConversionJournal]): Sections found in the journal are not generated again, and
+                generated sections are added to it. Requires `page_num`. Default: None.
+            cancel_event (Optional[threading.Event]): Setting it cancels the request in flight, see
+                `generate_json`. Default: None.
+
+        Returns:
+            PageGenerate: The generated JSON of each section, with the summed `GenerationStats` of its requests
+            if the service reports them.
+
+        Raises:
+            ValueError:
+                - max_retries must be a positive integer
+                - Prompt missing required template variable.
+                - A journal requires the page number.
+        """
+        if not isinstance(max_retries, int) or max_retries <= 0:
+            raise ValueError("max_retries must be a positive integer.")
+        if journal is not None and page_num is None:
+            raise ValueError("A journal requires the page number.")
+        if isinstance(template, str):
+            template = Template(template, undefined=StrictUndefined)
+
+        gen_data = PageGenerate(data={})
+        request_stats: List[GenerationStats] = []
+        for part, section_data in page.data.items():
+            journaled = journal.get(page_num, part) if journal is not None else None
+            if journaled is not None:
+                gen_data.data[part], section_stats = journaled
+                if section_stats is not None:
+                    request_stats.append(section_stats)
+                continue
+            try:
+                rendered1 = template.render(xml_content=str(section_data))
+            except UndefinedError as e:
+                raise ValueError(f"Prompt missing required template variable: {e}")
+            request_data = {
+                "model": self.model_name,
+                "messages": [{"role": "user", "content": rendered1}],
+                "stream": False,
+            }
+            section_stats: List[GenerationStats] = []
+            with tracer.span(
+                "converter", "section", page=page_num, section=part
+            ) as span:
+                _ = self.generate_json(
+                    gen_ai_service=self.gen_ai,
+                    request_data=request_data,
+                    max_retries=max_retries,
+                    stats=section_stats,
+                    cancel_event=cancel_event,
+                )
+                if tracer.enabled:
+                    span.set(
+                        bytes_in=len(rendered1.encode("utf-8")),
+                        bytes_out=len(
+                            json.dumps(_, ensure_ascii=False).encode("utf-8")
+                        ),
+                    )
+
+            gen_data.data[part] = _
+            request_stats.extend(section_stats)
+            if journal is not None:
+                journal.record(page_num, part, _, merge_stats(section_stats))
+        gen_data.stats = merge_stats(request_stats)
+        return gen_data
+
+    def iter_process(
+        self,
+        data: PreProcData,
+        prompt: str = DEFAULT_PROMPT,
+        max_retries: int = 5,
+        journal_dir: Optional[Union[Path, str]] = None,
+        max_workers: int = 1,
+        ordered: bool = True,
+    ) -> Iterator[Union[Tuple[int, PageGenerate], Tuple[int, int, PageGenerate]]]:
+        """
+        Generates the JSON of every page and yields each page as soon as it is done, see `process`.
+
+        With `max_workers > 1`, pages are generated in a thread pool with at most `2 * max_workers` pages in
+        flight (generated but not yet yielded), so memory stays bounded whatever the document size. Closing the
+        generator early cancels the pages that were not started and the requests in flight.
+
+        Args:
+            data (PreProcData): The preprocessed document.
+            prompt (str): The Jinja2 template string, see `process`. Default: `DEFAULT_PROMPT`.
+            max_retries (int): Maximum number of retries for generating a valid JSON.
+            journal_dir (Optional[Union[Path, str]]): Directory of the `ConversionJournal`s, see `process`.
+            max_workers (int): Number of pages generated concurrently. Default: 1.
+            ordered (bool): Yield pages in document order. Otherwise pages are yielded in completion order,
+                with their completion sequence number. Default: True.
+
+        Yields:
+            Union[Tuple[int, PageGenerate], Tuple[int, int, PageGenerate]]: (page number, page) in document
+            order, or (sequence number, page number, page) when not `ordered`.
+
+        Raises:
+            ValueError:
+                - max_retries must be a positive integer
+                - max_workers must be a positive integer
+                - Prompt missing required template variable.
+        """
+        if not isinstance(max_retries, int) or max_retries <= 0:
+            raise ValueError("max_retries must be a positive integer.")
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError("max_workers must be a positive integer.")
+        template = Template(prompt, undefined=StrictUndefined)
+        journal = (
+            ConversionJournal.for_document(journal_dir, data, self.model_name, prompt)
+            if journal_dir
+            else None
+        )
+
+        cancel_event = threading.Event() if max_workers > 1 else None
+
+        def generate(page_num: int, page: PageContent) -> PageGenerate:
+            return self.process_page(
+                page,
+                template=template,
+                max_retries=max_retries,
+                page_num=page_num,
+                journal=journal,
+                cancel_event=cancel_event,
+            )
+
+        try:
+            if max_workers == 1:
+                for seq, (page_num, page) in enumerate(data.pages.items()):
+                    result = generate(page_num, page)
+                    yield (page_num, result) if ordered else (seq, page_num, result)
+                return
+
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                pages = iter(data.pages.items())
+                order = deque()
+                pending = {}
+                done_pages = {}
+                seq = 0
+                while True:
+                    while len(pending) + len(done_pages) < 2 * max_workers:
+                        item = next(pages, None)
+                        if item is None:
+                            break
+                        pending[executor.submit(generate, *item)] = item[0]
+                        if ordered:
+                            order.append(item[0])
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        page_num = pending.pop(future)
+                        result = future.result()
+                        if ordered:
+                            done_pages[page_num] = result
+                        else:
+                            yield seq, page_num, result
+                            seq += 1
+                    while order and order[0] in done_pages:
+                        page_num = order.popleft()
+                        yield page_num, done_pages.pop(page_num)
+            finally:
+                cancel_event.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            if journal is not None:
+                journal.close()
+
     def process(
         self,
         data: PreProcData,
-        prompt: str = """The following XML content was converted from a PDF using `pdf2xml`. Your task is to extract structured information from this XML based on the `<text>` tags, focusing on the actual text content and its positions (`top`, `left`).
-            ### XML Content:
-            ```xml
-            {{xml_content}}
-            ```
-            Please convert the extracted information into a well-structured JSON format, organized by section headers and their corresponding key-value pairs. Do not include any attribute metadata in the JSON. Ensure that the JSON syntax is valid, with proper indentation, brackets, and quotation marks.
-            Output only the JSON.""",
+        prompt: str = DEFAULT_PROMPT,
         max_retries: int = 5,
+        journal_dir: Optional[Union[Path, str]] = None,
         **kwargs,
     ) -> TransformData:
         """
@@ -135,19 +403,17 @@ class Transform:
 
         Args:
             data (PreProcData): A dictionary where keys are page identifiers and values are containing upper and lower section data.
-            prompt (str): The Jinja2 template string. It must include the variable `{{ xml_content }}` for rendering. Default: '"The following XML content was converted from a PDF using `pdf2xml`. Your task is to extract structured information from this XML based on the `<text>` tags, focusing on the actual text content and its positions (`top`, `left`).
-            ### XML Content:
-            ```xml
-            {{xml_content}}
-            ```
-            Please convert the extracted information into a well-structured JSON format, organized by section headers and their corresponding key-value pairs. Do not include any attribute metadata in the JSON. Ensure that the JSON syntax is valid, with proper indentation, brackets, and quotation marks.
-            Output only the JSON."'
+            prompt (str): The Jinja2 template string. It must include the variable `{{ xml_content }}` for rendering. Default: `DEFAULT_PROMPT`.
             max_retries (int): Maximum number of retries for generating a valid JSON.
+            journal_dir (Optional[Union[Path, str]]): Directory of the `ConversionJournal`s. Every generated
+                section is journaled, and a rerun of the same document with the same model and prompt only
+                generates the sections missing from its journal. Default: None (no journal).
             kwargs (dict): Additional keyword arguments for processing.
 
 
         Returns:
             TransformData: A dictionary containing the processed data, where each key is a page identifier and the value is the structured json result of the XML content.
+                `stats` sums the `GenerationStats` of all pages, see `converter.stats.to_prometheus`.
         Raises:
             ValueError:
                 - max_retries must be a positive integer
@@ -157,35 +423,13 @@ class Transform:
         """
         try:
             page_data = TransformData(pages={})
-            if not isinstance(max_retries, int) or max_retries <= 0:
-                raise ValueError("max_retries must be a positive integer.")
-            template = Template(prompt, undefined=StrictUndefined)
-            for page_num, page in data.pages.items():
-                gen_data = PageGenerate(data={})
-                for part, section_data in page.data.items():
-                    try:
-                        rendered1 = template.render(xml_content=str(section_data))
-                    except UndefinedError as e:
-                        raise ValueError(
-                            f"Prompt missing required template variable: {e}"
-                        )
-                    request_data = {
-                        "model": self.model_name,
-                        "messages": [{"role": "user", "content": rendered1}],
-                        "stream": False,
-                    }
-                    _ = self.generate_json(
-                        gen_ai_service=self.gen_ai,
-                        request_data=request_data,
-                        max_retries=max_retries,
-                    )
-
-                    gen_data.data[part] = _
-
-                    # print(gen_text, "\n*******************\n")
-                    # if format == "dict":
-                    #     gen_text = self.extract_json_blocks(gen_text)
-                page_data.pages[page_num] = gen_data
+            for page_num, page in self.iter_process(
+                data, prompt=prompt, max_retries=max_retries, journal_dir=journal_dir
+            ):
+                page_data.pages[page_num] = page
+            page_data.stats = merge_stats(
+                page.stats for page in page_data.pages.values()
+            )
 
             return page_data
         except Exception as e:
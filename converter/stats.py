@@ -0,0 +1,171 @@
+from typing import Dict, Iterable, List, Optional
+
+from models import GenerationStats, TransformData
+
+# (name, type, help, GenerationStats field) of the exported counters.
+_COUNTERS = [
+    ("requests_total", "counter", "Chat requests, retries included.", "requests"),
+    ("prompt_tokens_total", "counter", "Prompt tokens evaluated.", "prompt_tokens"),
+    (
+        "completion_tokens_total",
+        "counter",
+        "Tokens generated.",
+        "completion_tokens",
+    ),
+    (
+        "prompt_eval_seconds_total",
+        "counter",
+        "Time spent evaluating prompts.",
+        "prompt_eval_duration",
+    ),
+    (
+        "eval_seconds_total",
+        "counter",
+        "Time spent generating tokens.",
+        "eval_duration",
+    ),
+    (
+        "load_seconds_total",
+        "counter",
+        "Time spent loading the model.",
+        "load_duration",
+    ),
+    (
+        "request_seconds_total",
+        "counter",
+        "Request time reported by the server.",
+        "total_duration",
+    ),
+]
+
+
+def merge_stats(
+    stats: Iterable[Optional[GenerationStats]],
+) -> Optional[GenerationStats]:
+    """
+    Sums generation stats, e.g. the requests of a page or the pages of a document.
+
+    Unset fields (the time to first token of non-streamed requests) are skipped, so they stay None only if
+    every item left them unset.
+
+    Args:
+        stats (Iterable[Optional[GenerationStats]]): The stats to sum; None items are skipped.
+
+    Returns:
+        Optional[GenerationStats]: The sum, or None if there was nothing to sum.
+    """
+    total = None
+    for item in stats:
+        if item is None:
+            continue
+        if total is None:
+            total = GenerationStats()
+        for field in GenerationStats.model_fields:
+            value = getattr(item, field)
+            if value is None:
+                continue
+            current = getattr(total, field)
+            setattr(total, field, value if current is None else current + value)
+    return total
+
+
+def tokens_per_second(stats: GenerationStats) -> float:
+    """
+    Args:
+        stats (GenerationStats): The stats.
+
+    Returns:
+        float: Generated tokens per second of generation time, 0.0 without generation time.
+    """
+    if not stats.eval_duration:
+        return 0.0
+    return stats.completion_tokens / stats.eval_duration
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+        + "}"
+    )
+
+
+def to_prometheus(
+    data: TransformData,
+    labels: Optional[Dict[str, str]] = None,
+    per_page: bool = False,
+    prefix: str = "aixtract_generation",
+) -> str:
+    """
+    Exports the generation stats of a converted document in the Prometheus text exposition format.
+
+    Counters are the sums of `GenerationStats`; `tokens_per_second` and `time_to_first_token_seconds` (mean
+    per streamed request, the only ones whose first token is timed) are derived gauges. Samples without
+    streamed requests have no `time_to_first_token_seconds`.
+
+    Args:
+        data (TransformData): The output of `Transform.process`.
+        labels (Optional[Dict[str, str]]): Labels added to every sample, e.g. `{"document": name}`.
+        per_page (bool): Export one sample per page, labelled `page`, instead of the document totals.
+            Default: False.
+        prefix (str): Prefix of the metric names. Default: `aixtract_generation`.
+
+    Returns:
+        str: The exposition text; empty if the document has no stats.
+    """
+    labels = labels or {}
+    if per_page:
+        samples = [
+            ({**labels, "page": str(page_num)}, page.stats)
+            for page_num, page in data.pages.items()
+            if page.stats is not None
+        ]
+    else:
+        total = data.stats or merge_stats(page.stats for page in data.pages.values())
+        samples = [(labels, total)] if total is not None else []
+    if not samples:
+        return ""
+
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str, values) -> None:
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for sample_labels, value in values:
+            lines.append(f"{prefix}_{name}{_labels(sample_labels)} {value}")
+
+    for name, kind, help_text, field in _COUNTERS:
+        family(
+            name,
+            kind,
+            help_text,
+            [
+                (sample_labels, getattr(stats, field))
+                for sample_labels, stats in samples
+            ],
+        )
+    family(
+        "tokens_per_second",
+        "gauge",
+        "Generated tokens per second of generation time.",
+        [(sample_labels, tokens_per_second(stats)) for sample_labels, stats in samples],
+    )
+    timed = [
+        (sample_labels, stats.time_to_first_token / stats.streamed_requests)
+        for sample_labels, stats in samples
+        if stats.time_to_first_token is not None and stats.streamed_requests
+    ]
+    if timed:
+        family(
+            "time_to_first_token_seconds",
+            "gauge",
+            "Mean time from sending a streamed request to its first token.",
+            timed,
+        )
+    return "\n".join(lines) + "\n"
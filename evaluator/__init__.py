@@ -1,3 +1,4 @@
+from evaluator.batch import BatchValidate
 from evaluator.main import Validate
 
-__all__ = ["Validate"]
+__all__ = ["BatchValidate", "Validate"]
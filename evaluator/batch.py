@@ -0,0 +1,247 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from evaluator.main import Validate
+from models import DocumentScores, Regression, TransformData
+from readers import PDFParser, XMLParser
+
+
+def _evaluate_document(
+    validate: Validate, name: str, gt_path: Path, json_path: Path
+) -> DocumentScores:
+    """
+    Reads one (ground truth, converted JSON) pair and scores it.
+
+    Runs inside a worker process; failures are reported in the result instead of stopping the batch.
+
+    Args:
+        validate (Validate): The evaluator to use.
+        name (str): Document name.
+        gt_path (Path): The pdftohtml XML or the PDF of the document.
+        json_path (Path): The converted JSON, a serialized `TransformData`.
+
+    Returns:
+        DocumentScores: The scores of the document for each metric.
+    """
+    try:
+        if gt_path.suffix.lower() == ".xml":
+            gt_data = XMLParser().process(gt_path, with_fragments=True)
+        else:
+            gt_data = PDFParser().process(gt_path, with_fragments=True)
+        data = TransformData.model_validate_json(json_path.read_text(encoding="utf-8"))
+
+        scores = validate.process(gt_data=gt_data, data=data)
+        if not isinstance(scores, dict):
+            scores = {Validate.metric_name(validate.metrics): scores}
+        return DocumentScores(document=name, scores=scores)
+    except Exception as e:
+        return DocumentScores(document=name, error=str(e))
+
+
+class BatchValidate:
+    """
+    Evaluates a whole corpus of converted documents and compares the results with a stored baseline.
+
+    Documents are scored in a process pool with a bounded number of documents in flight, and each result is
+    written to a JSON lines file as soon as it is ready, so memory stays flat regardless of corpus size.
+    """
+
+    def __init__(self, validate: Validate, max_workers: int = 4):
+        """
+        Args:
+            validate (Validate): The evaluator applied to every document.
+            max_workers (int): Number of worker processes. Default: 4.
+        """
+        self.validate = validate
+        self.max_workers = max_workers
+
+    def find_documents(
+        self, directory: Union[Path, str]
+    ) -> Iterator[Tuple[str, Path, Path]]:
+        """
+        Finds the (ground truth, converted JSON) pairs of a directory.
+
+        Every `<name>.json` is paired with `<name>.xml`, `<name>/<name>.xml` (pdftohtml output of `PDFParser`)
+        or `<name>.pdf`, in this order of preference. JSON files without ground truth are skipped.
+
+        Args:
+            directory (Union[Path, str]): The corpus directory.
+
+        Yields:
+            Tuple[str, Path, Path]: Document name, ground truth path and converted JSON path.
+
+        Raises:
+            FileNotFoundError:
+                If the directory does not exist.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"The directory {directory} does not exist.")
+
+        for json_path in sorted(directory.glob("*.json")):
+            name = json_path.stem
+            for gt_path in (
+                directory / f"{name}.xml",
+                directory / name / f"{name}.xml",
+                directory / f"{name}.pdf",
+            ):
+                if gt_path.exists():
+                    yield name, gt_path, json_path
+                    break
+
+    def process(
+        self, directory: Union[Path, str], results_path: Union[Path, str]
+    ) -> int:
+        """
+        Evaluates every document of a directory and streams the scores to a JSON lines file.
+
+        Each line is a serialized `DocumentScores`, in completion order.
+
+        Args:
+            directory (Union[Path, str]): The corpus directory, see `find_documents`.
+            results_path (Union[Path, str]): Where to write the results.
+
+        Returns:
+            int: Number of evaluated documents.
+
+        Raises:
+            Exception:
+                An error occurred while evaluating the corpus.
+        """
+        try:
+            count = 0
+            max_in_flight = self.max_workers * 2
+            with (
+                open(results_path, "w", encoding="utf-8") as f,
+                ProcessPoolExecutor(max_workers=self.max_workers) as executor,
+            ):
+                pending = set()
+                documents = self.find_documents(directory)
+                while True:
+                    for name, gt_path, json_path in documents:
+                        pending.add(
+                            executor.submit(
+                                _evaluate_document,
+                                self.validate,
+                                name,
+                                gt_path,
+                                json_path,
+                            )
+                        )
+                        if len(pending) >= max_in_flight:
+                            break
+                    if not pending:
+                        break
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        f.write(future.result().model_dump_json() + "\n")
+                        count += 1
+            return count
+        except Exception as e:
+            raise Exception(
+                f"An error occurred while evaluating the corpus: {e}"
+            ) from e
+
+    def _read_results(self, path: Union[Path, str]) -> Iterator[DocumentScores]:
+        """
+        Streams the documents of a results file.
+
+        Args:
+            path (Union[Path, str]): A results file written by `process`.
+
+        Yields:
+            DocumentScores: One document per line.
+        """
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield DocumentScores.model_validate_json(line)
+
+    def compare(
+        self,
+        results_path: Union[Path, str],
+        baseline_path: Union[Path, str],
+        tolerance: float = 0.01,
+    ) -> List[Regression]:
+        """
+        Flags every page and document mean whose score dropped by more than `tolerance` against the baseline.
+
+        Only the baseline scores are held in memory; the results file is streamed. Documents that failed or
+        are missing from the results are reported with `current=None`.
+
+        Args:
+            results_path (Union[Path, str]): The new results.
+            baseline_path (Union[Path, str]): The results to compare against.
+            tolerance (float): Allowed score drop. Default: 0.01.
+
+        Returns:
+            List[Regression]: The regressions, in results file order.
+        """
+        baseline: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for doc in self._read_results(baseline_path):
+            if not doc.error:
+                baseline[doc.document] = {
+                    metric: {str(page): score for page, score in scores.pages.items()}
+                    for metric, scores in doc.scores.items()
+                }
+
+        regressions = []
+        for doc in self._read_results(results_path):
+            for metric, pages in baseline.pop(doc.document, {}).items():
+                current = doc.scores.get(metric)
+                current_pages = (
+                    {str(page): score for page, score in current.pages.items()}
+                    if current
+                    else {}
+                )
+                for page, score in pages.items():
+                    new_score = current_pages.get(page)
+                    if new_score is None or score - new_score > tolerance:
+                        regressions.append(
+                            Regression(
+                                document=doc.document,
+                                metric=metric,
+                                page=page,
+                                baseline=score,
+                                current=new_score,
+                            )
+                        )
+
+        for document, metrics in baseline.items():
+            for metric, pages in metrics.items():
+                if "mean" in pages:
+                    regressions.append(
+                        Regression(
+                            document=document,
+                            metric=metric,
+                            page="mean",
+                            baseline=pages["mean"],
+                        )
+                    )
+        return regressions
+
+    def run(
+        self,
+        directory: Union[Path, str],
+        results_path: Union[Path, str],
+        baseline_path: Optional[Union[Path, str]] = None,
+        tolerance: float = 0.01,
+    ) -> List[Regression]:
+        """
+        Evaluates the corpus and, if a baseline is given, compares the results with it.
+
+        Args:
+            directory (Union[Path, str]): The corpus directory, see `find_documents`.
+            results_path (Union[Path, str]): Where to write the results.
+            baseline_path (Optional[Union[Path, str]]): Results of a previous run. Default: None.
+            tolerance (float): Allowed score drop. Default: 0.01.
+
+        Returns:
+            List[Regression]: The regressions; empty without a baseline.
+        """
+        self.process(directory, results_path)
+        if not baseline_path:
+            return []
+        return self.compare(results_path, baseline_path, tolerance)
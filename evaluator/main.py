@@ -1,23 +1,88 @@
+import math
+import random
+import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, List, Union
+from statistics import NormalDist
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from metrics.functions.core import BaseMetric
-from models import PageData, PageGenerate, Scores
+from metrics import SimilarityMetrics
+from metrics.functions.core import BaseMetric, MatchContext
+from models import (
+    GateResult,
+    MatchStats,
+    PageBreakdown,
+    PageData,
+    PageGenerate,
+    ParserData,
+    ScoreEstimate,
+    Scores,
+)
+from readers.sidecar import SidecarIndex
+from utils import TextNormalizer, tracer
+
+# Section and key of GT fragments without any matching JSON string in a `PageBreakdown`.
+UNMATCHED = "<unmatched>"
 
 
 class Validate:
     def __init__(
         self,
-        metrics: BaseMetric,
+        metrics: Union[BaseMetric, List[BaseMetric]],
+        setting: Optional[dict] = None,
+        normalizer: Optional[TextNormalizer] = None,
+        merge_sections: bool = True,
+        breakdown: bool = False,
         *args,
         **kwargs,
     ):
+        """
+        Args:
+            metrics (Union[BaseMetric, List[BaseMetric]]): The metric used to score each page, or a list of metrics
+                computed in one pass over shared flattened data.
+            setting (Optional[dict]): Keyword arguments forwarded to the metric. With a list of metrics, a dict of
+                metric name (see `metric_name`) to its keyword arguments.
+            normalizer (Optional[TextNormalizer]): If given, every GT fragment and JSON string is normalized
+                before matching, e.g. `−` (U+2212) and `-` compare equal.
+            merge_sections (bool): Deep-merge the sections of a page before flattening, colliding keys keep the
+                last section's value. If False, every section is flattened independently. Default: True.
+            breakdown (bool): Collect a `PageBreakdown` of every page into `Scores.breakdown` during `process`:
+                matches per converter section and top-level JSON key, exact vs fuzzy counts and timings.
+                Needs a single metric with `iter_scores`. Default: False.
+
+        Raises:
+            ValueError:
+                If `breakdown` is set and the metric has no `iter_scores`.
+        """
+        if breakdown and not hasattr(metrics, "iter_scores"):
+            raise ValueError("breakdown needs a single metric with iter_scores.")
         self.metrics = metrics
+        self.setting = setting or {}
+        self.normalizer = normalizer
+        self.merge_sections = merge_sections
+        self.breakdown = breakdown
+
+    @staticmethod
+    def metric_name(metric: BaseMetric) -> str:
+        """
+        Gets the name of a metric: its `SimilarityMetrics` name if registered, else its class name.
+
+        Args:
+            metric (BaseMetric): The metric class.
+
+        Returns:
+            str: The metric name.
+        """
+        try:
+            return SimilarityMetrics(metric).name
+        except ValueError:
+            return metric.__name__
 
     def _read_and_flatten_xml(
         self,
         xml_data: Union[Path, dict, str] = None,
+        normalize: bool = True,
     ) -> List[str]:
         """
         Extracts and flattens all text content from <text> tags under <pdf2xml>,
@@ -25,6 +90,7 @@ class Validate:
 
         Args:
             xml_data (Union[Path, List[str], str]): Either path to XML file or list of XML lines.
+            normalize (bool): Apply the normalizer, if one is set. Default: True.
 
         Returns:
             List[str]: Sorted flat list of all text content found within <text> tags.
@@ -53,11 +119,115 @@ class Validate:
                 for frag in elem.itertext()
                 if frag.strip()
             ]
+            fragments = sorted(fragments, key=len, reverse=True)
 
-            return sorted(fragments, key=len, reverse=True)
+            return self._normalize_fragments(fragments) if normalize else fragments
         except Exception as e:
             raise e
 
+    def _normalize_fragments(self, fragments: List[str]) -> List[str]:
+        """
+        Applies the normalizer to sorted GT fragments, dropping fragments that become empty.
+
+        Args:
+            fragments (List[str]): Fragments sorted by length descending.
+
+        Returns:
+            List[str]: The normalized fragments, sorted by length descending.
+        """
+        if not self.normalizer:
+            return fragments
+        normalized = [s for frag in fragments if (s := self.normalizer.normalize(frag))]
+        return sorted(normalized, key=len, reverse=True)
+
+    def _gt_fragments(self, page: PageData) -> List[str]:
+        """
+        Returns the GT fragments of a page, reusing `PageData.fragments` from the reader when present.
+
+        Pages without fragments are flattened once and the result is cached on the page, so evaluating
+        several outputs against the same `ParserData` prepares the ground truth only once.
+
+        Args:
+            page (PageData): One page of ground truth.
+
+        Returns:
+            List[str]: The (normalized) fragments, sorted by length descending.
+        """
+        if page.fragments is None:
+            page.fragments = self._read_and_flatten_xml(page.data, normalize=False)
+        if self.normalizer and page.normalized_fragments:
+            normalized = page.normalized_fragments.get(self.normalizer.signature)
+            if normalized is not None:
+                return sorted([s for s in normalized if s], key=len, reverse=True)
+        return self._normalize_fragments(list(page.fragments))
+
+    def _load_sidecar(self, gt_data: ParserData) -> None:
+        """
+        Fills the fragments of pages that have none from the sidecar index of `gt_data.source`, if there is a
+        valid one, so the pages do not have to be parsed and normalized again. A page is only filled if the
+        sidecar holds the same elements, e.g. not from a sidecar written with another `only_text`.
+
+        Args:
+            gt_data (ParserData): Ground truth. (from Parser.)
+        """
+        if not gt_data.source or all(
+            page.fragments is not None for page in gt_data.pages.values()
+        ):
+            return
+        index = SidecarIndex.open(gt_data.source)
+        if index is None:
+            return
+        try:
+            for page_num, page in gt_data.pages.items():
+                if (
+                    page.fragments is None
+                    and page_num in index
+                    and index.data(page_num) == page.data
+                ):
+                    page.fragments = index.fragments(page_num)
+                    page.normalized_fragments = {
+                        index.normalizer: index.normalized(page_num)
+                    }
+        finally:
+            index.close()
+
+    def _flatten_into(
+        self,
+        flattened_json: List[str],
+        data: dict,
+        marks: Optional[List[Tuple[int, str]]] = None,
+    ) -> None:
+        """
+        Appends the keys and values of `data` to `flattened_json` in depth-first order.
+
+        Nested dicts are walked with an explicit stack, so deep JSON does not hit the recursion limit.
+        List items are not descended into; each item is added as its string form.
+
+        Args:
+            flattened_json (List[str]): The list to append to.
+            data (dict): The JSON object to flatten.
+            marks (Optional[List[Tuple[int, str]]]): If given, receives the index in `flattened_json` where each
+                top-level key starts, with the key.
+        """
+        append = flattened_json.append
+        stack = [iter(data.items())]
+        while stack:
+            for key, value in stack[-1]:
+                if marks is not None and len(stack) == 1:
+                    marks.append((len(flattened_json), str(key).strip()))
+                append(str(key).strip())
+                if isinstance(value, dict):
+                    stack.append(iter(value.items()))
+                    break
+                elif isinstance(value, list):
+                    for item in value:
+                        if s := str(item):
+                            append(s.strip())
+                elif s := str(value):
+                    append(s.strip())
+            else:
+                stack.pop()
+
     def _read_and_flatten_json(self, data: dict) -> List[str]:
         """
         Reads a JSON file and flattens its contents into a list of strings.
@@ -75,24 +245,10 @@ class Validate:
         """
         try:
             flattened_json = []
+            self._flatten_into(flattened_json, data)
 
-            def _flatten(value: Any) -> None:
-                if isinstance(value, dict):
-                    for inner_k, inner_v in value.items():
-                        flattened_json.append(str(inner_k).strip())
-                        _flatten(inner_v)
-                elif isinstance(value, list):
-                    for item in value:
-                        if s := str(item):
-                            flattened_json.append(s.strip())
-                else:
-                    if s := str(value):
-                        flattened_json.append(s.strip())
-
-            for k, v in data.items():
-                flattened_json.append(str(k).strip())
-                _flatten(v)
-
+            if self.normalizer:
+                return [self.normalizer.normalize(s) for s in flattened_json]
             return flattened_json
         except Exception as e:
             raise e
@@ -123,11 +279,194 @@ class Validate:
         except Exception as e:
             return e
 
+    def _merge_sections(self, sections: Dict[int, dict]) -> dict:
+        """
+        Deep-merges the section dicts in order; later values win on conflicting keys.
+
+        Only dicts reached by a conflicting key are copied, once each, instead of copying every level for
+        every section. Non-dict sections are ignored.
+
+        Args:
+            sections (Dict[int, dict]): Generated JSON of each section.
+
+        Returns:
+            dict: The merged JSON object.
+        """
+        merged = {}
+        owned = {id(merged)}
+        for section_data in sections.values():
+            if not isinstance(section_data, dict):
+                continue
+            stack = [(merged, section_data)]
+            while stack:
+                target, source = stack.pop()
+                for key, val in source.items():
+                    current = target.get(key)
+                    if isinstance(current, dict) and isinstance(val, dict):
+                        if id(current) not in owned:
+                            current = target[key] = dict(current)
+                            owned.add(id(current))
+                        stack.append((current, val))
+                    else:
+                        target[key] = val
+        return merged
+
+    def _flatten_sections(self, sections: Dict[int, dict]) -> List[str]:
+        """
+        Flattens the generated sections of one page into a single list.
+
+        With `merge_sections` the sections are deep-merged first, as colliding keys used to be. Otherwise
+        each section is flattened on its own into the same list, so nothing is copied or overwritten.
+
+        Args:
+            sections (Dict[int, dict]): Generated JSON of each section.
+
+        Returns:
+            List[str]: The flattened strings of all sections.
+        """
+        if self.merge_sections:
+            return self._read_and_flatten_json(self._merge_sections(sections))
+
+        flattened_json = []
+        for section_data in sections.values():
+            if isinstance(section_data, dict):
+                self._flatten_into(flattened_json, section_data)
+        if self.normalizer:
+            return [self.normalizer.normalize(s) for s in flattened_json]
+        return flattened_json
+
+    def _flatten_with_origins(
+        self, sections: Dict[int, dict]
+    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Flattens the sections like `_flatten_sections` and records where each string comes from.
+
+        When sections are merged, a top-level key is attributed to the last section defining it, which is
+        the one whose value wins.
+
+        Args:
+            sections (Dict[int, dict]): Generated JSON of each section.
+
+        Returns:
+            Tuple[List[str], List[Tuple[str, str]]]: The flattened strings, and the (section, top-level key)
+            of each string.
+        """
+        flattened_json = []
+        origins = []
+        if self.merge_sections:
+            owner = {}
+            for section, section_data in sections.items():
+                if isinstance(section_data, dict):
+                    owner.update(
+                        {str(key).strip(): str(section) for key in section_data}
+                    )
+            groups = [(None, self._merge_sections(sections))]
+        else:
+            groups = [
+                (str(section), section_data)
+                for section, section_data in sections.items()
+                if isinstance(section_data, dict)
+            ]
+
+        for section, section_data in groups:
+            marks = []
+            self._flatten_into(flattened_json, section_data, marks)
+            marks.append((len(flattened_json), None))
+            for (start, key), (stop, _) in zip(marks, marks[1:]):
+                origin = (section if section is not None else owner[key], key)
+                origins.extend([origin] * (stop - start))
+
+        if self.normalizer:
+            flattened_json = [self.normalizer.normalize(s) for s in flattened_json]
+        return flattened_json, origins
+
+    def _score_page_breakdown(
+        self, page: PageData, sections: Dict[int, dict]
+    ) -> Tuple[float, PageBreakdown]:
+        """
+        Scores one page with the metric's `iter_scores` and attributes every GT fragment to the section and
+        top-level key of its best matching JSON string. Fragments without any candidate go to `UNMATCHED`.
+
+        Args:
+            page (PageData): One page of ground truth.
+            sections (Dict[int, dict]): Generated JSON of each section. (PageGenerate.data)
+
+        Returns:
+            Tuple[float, PageBreakdown]: The similarity score of the page, equal to the metric's `calculate`,
+            and its breakdown.
+        """
+        start_t = time.perf_counter()
+        xml_list = self._gt_fragments(page)
+        json_list, origins = self._flatten_with_origins(sections)
+        breakdown = PageBreakdown(flatten_time=time.perf_counter() - start_t)
+
+        scores = []
+        fragments = self.metrics.iter_scores(xml_list, json_list)
+        start_t = time.perf_counter()
+        for fragment in fragments:
+            now = time.perf_counter()
+            elapsed, start_t = now - start_t, now
+            section, key = (
+                origins[fragment.json_idx]
+                if fragment.json_idx >= 0
+                else (UNMATCHED, UNMATCHED)
+            )
+            for stats in (
+                breakdown.sections.setdefault(section, MatchStats()),
+                breakdown.keys.setdefault(key, MatchStats()),
+            ):
+                stats.fragments += 1
+                stats.exact += fragment.exact
+                stats.fuzzy += not fragment.exact
+                stats.score_sum += fragment.score
+                stats.time += elapsed
+            breakdown.exact += fragment.exact
+            breakdown.fuzzy += not fragment.exact
+            breakdown.match_time += elapsed
+            scores.append(fragment.score)
+        return round(sum(scores) / len(scores), 2), breakdown
+
+    def _score_page(
+        self, page: PageData, sections: Dict[int, dict]
+    ) -> Union[float, Dict[str, float]]:
+        """
+        Flattens one page of ground truth and generated sections and scores it with the metric.
+
+        With a list of metrics the page is flattened once and every metric gets its own copy of the lists
+        (metrics may consume matched strings) plus a shared `MatchContext` with the page indexes.
+
+        Args:
+            page (PageData): One page of ground truth.
+            sections (Dict[int, dict]): Generated JSON of each section. (PageGenerate.data)
+
+        Returns:
+            Union[float, Dict[str, float]]: The similarity score of the page, or the score of each metric by name.
+        """
+        xml_list = self._gt_fragments(page)
+        json_list = self._flatten_sections(sections)
+        if not isinstance(self.metrics, (list, tuple)):
+            return self.metrics.calculate(
+                xml_list=xml_list, json_list=json_list, **self.setting
+            )
+
+        context = MatchContext(xml_list, json_list)
+        page_scores = {}
+        for metric in self.metrics:
+            name = self.metric_name(metric)
+            page_scores[name] = metric.calculate(
+                xml_list=list(xml_list),
+                json_list=list(json_list),
+                context=context,
+                **self.setting.get(name, {}),
+            )
+        return page_scores
+
     def process(
         self,
         gt_data: PageData,
         data: PageGenerate,
-    ) -> Scores:
+        max_workers: Optional[int] = None,
+    ) -> Union[Scores, Dict[str, Scores]]:
         """
         Evaluates the similarity between the ground truth data and the generated data.
         This function uses the specified metric to calculate the similarity score.
@@ -135,9 +474,12 @@ class Validate:
         Args:
             gt_data (PageData): Ground truth. (from Parser.)
             data (PageGenerate): Validate data. (from Transform.)
+            max_workers (Optional[int]): If greater than 1, pages are scored in a pool of this many processes.
+                Each worker flattens its own page; scores are collected in page order. Default: None (sequential).
 
         Returns:
-            Scores:  The similarity score between the ground truth and generated data.
+            Union[Scores, Dict[str, Scores]]:  The similarity score between the ground truth and generated data.
+                With a list of metrics, the Scores of each metric by name.
 
         Raises:
             ValueError:
@@ -146,38 +488,360 @@ class Validate:
                 An error occurred while calculate score
         """
         try:
-            scores = Scores(pages={})
-            sum = 0.0
-
-            def deep_merge(a: dict, b: dict) -> dict:
-                result = a.copy()
-                if not isinstance(b, dict):
-                    return result
-                for key, val in b.items():
-                    if (
-                        key in result
-                        and isinstance(result[key], dict)
-                        and isinstance(val, dict)
-                    ):
-                        result[key] = deep_merge(result[key], val)
-                    else:
-                        result[key] = val
-                return result
+            self._load_sidecar(gt_data)
+            page_nums = list(gt_data.pages)
+            pages = [gt_data.pages[page_num] for page_num in page_nums]
+            sections = [data.pages[page_num].data for page_num in page_nums]
 
-            for page_num, page in gt_data.pages.items():
-                merged = {}
-                for section_id, section_data in data.pages[page_num].data.items():
-                    merged = deep_merge(merged, section_data)
+            if max_workers and max_workers > 1 and len(page_nums) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    page_scores = list(
+                        executor.map(self.score_page, pages, sections, page_nums)
+                    )
+            else:
+                page_scores = map(self.score_page, pages, sections, page_nums)
 
-                score = self.metrics.calculate(
-                    xml_list=self._read_and_flatten_xml(page.data),
-                    json_list=self._read_and_flatten_json(merged),
-                )
+            return self.aggregate(zip(page_nums, page_scores))
+        except Exception as e:
+            raise Exception(f"An error occurred while calculate score: {e}") from e
+
+    def score_page(
+        self,
+        page: PageData,
+        sections: Dict[int, dict],
+        page_num: Optional[int] = None,
+    ) -> Union[float, Dict[str, float], Tuple[float, PageBreakdown]]:
+        """
+        Scores one page, for callers that stream pages (see `pipeline.Pipeline`). Collect the results with
+        `aggregate`.
+
+        Args:
+            page (PageData): One page of ground truth.
+            sections (Dict[int, dict]): Generated JSON of each section. (PageGenerate.data)
+            page_num (Optional[int]): The page number, only used to label the tracing span.
+
+        Returns:
+            Union[float, Dict[str, float], Tuple[float, PageBreakdown]]: The similarity score of the page, the
+            score of each metric by name with a list of metrics, or the score and its breakdown with `breakdown`.
+        """
+        with tracer.span("evaluator", "page", page=page_num):
+            if self.breakdown:
+                return self._score_page_breakdown(page, sections)
+            return self._score_page(page, sections)
+
+    def aggregate(
+        self,
+        page_scores: Iterable[
+            Tuple[int, Union[float, Dict[str, float], Tuple[float, PageBreakdown]]]
+        ],
+    ) -> Union[Scores, Dict[str, Scores]]:
+        """
+        Collects the results of `score_page` and adds the mean score.
+
+        Args:
+            page_scores (Iterable[Tuple[int, ...]]): (page number, `score_page` result) pairs in page order.
+
+        Returns:
+            Union[Scores, Dict[str, Scores]]: The scores as returned by `process`.
+        """
+        if self.breakdown:
+            scores = Scores(pages={}, breakdown={})
+            for page_num, (score, breakdown) in page_scores:
+                scores.pages[page_num] = score
+                scores.breakdown[page_num] = breakdown
+            scores.pages["mean"] = self.get_mean_score(scores)
+            return scores
 
+        if not isinstance(self.metrics, (list, tuple)):
+            scores = Scores(pages={})
+            for page_num, score in page_scores:
                 scores.pages[page_num] = score
-                sum += score
-            mean = self.get_mean_score(scores)
-            scores.pages["mean"] = mean
+            scores.pages["mean"] = self.get_mean_score(scores)
             return scores
+
+        scores = {self.metric_name(metric): Scores(pages={}) for metric in self.metrics}
+        for page_num, page_score in page_scores:
+            for name, score in page_score.items():
+                scores[name].pages[page_num] = score
+        for metric_scores in scores.values():
+            metric_scores.pages["mean"] = self.get_mean_score(metric_scores)
+        return scores
+
+    def _iter_page_scores(
+        self, xml_list: List[str], json_list: List[str]
+    ) -> Iterator[float]:
+        """
+        Scores one page incrementally: one score per GT fragment if the metric has `iter_scores`, otherwise the
+        page score once for all fragments.
+
+        Args:
+            xml_list (List[str]): The GT fragments of the page.
+            json_list (List[str]): The flattened generated strings of the page.
+
+        Yields:
+            float: The score of the next fragment, or the page score.
+        """
+        if hasattr(self.metrics, "iter_scores"):
+            for fragment in self.metrics.iter_scores(xml_list, json_list):
+                yield fragment.score
+        else:
+            yield self.metrics.calculate(
+                xml_list=xml_list, json_list=json_list, **self.setting
+            )
+
+    def gate(
+        self, gt_data: PageData, data: PageGenerate, threshold: float
+    ) -> GateResult:
+        """
+        Decides whether the mean score of `process` reaches `threshold`, stopping as soon as the outcome is known.
+
+        Pages are scored round-robin one GT fragment at a time. Unscored fragments count as 0 for the lower
+        bound and 1 for the upper bound of the mean; once both bounds lie on the same side of the threshold,
+        with a margin for the rounding of page scores, the remaining fragments are skipped. A full run gives
+        the same decision as `get_mean_score(process(...)) >= threshold`. Metrics without `iter_scores`
+        (e.g. `token_f1`) are gated page by page instead.
+
+        Args:
+            gt_data (PageData): Ground truth. (from Parser.)
+            data (PageGenerate): Validate data. (from Transform.)
+            threshold (float): The required mean score.
+
+        Returns:
+            GateResult: The decision, the bounds of the mean when it was taken and the number of scored units
+            (fragments, or pages for metrics without `iter_scores`).
+
+        Raises:
+            ValueError:
+                If several metrics are set.
+            Exception:
+                An error occurred while gating score, e.g. a page has no GT fragments.
+        """
+        if isinstance(self.metrics, (list, tuple)):
+            raise ValueError("gate needs a single metric.")
+        try:
+            self._load_sidecar(gt_data)
+            incremental = hasattr(self.metrics, "iter_scores")
+            pages = []
+            for page_num in gt_data.pages:
+                xml_list = self._gt_fragments(gt_data.pages[page_num])
+                if not xml_list:
+                    raise ValueError(f"Page {page_num} has no GT fragments.")
+                json_list = self._flatten_sections(data.pages[page_num].data)
+                size = len(xml_list) if incremental else 1
+                pages.append(
+                    [self._iter_page_scores(xml_list, json_list), size, 0, 0.0]
+                )
+
+            n_pages = len(pages)
+            total = sum(page[1] for page in pages)
+            # Sums over pages of the lowest and highest possible page averages.
+            lower, upper = 0.0, float(n_pages)
+            # A page score is rounded to two decimals, which moves the mean by at most this much.
+            margin = 0.005 + 1e-9
+            scored = 0
+
+            active = pages
+            while active:
+                for page in active:
+                    score = next(page[0])
+                    page[2] += 1
+                    page[3] += score
+                    lower += score / page[1]
+                    upper -= (1.0 - score) / page[1]
+                    scored += 1
+                    if lower / n_pages - margin >= threshold:
+                        return GateResult(
+                            passed=True,
+                            threshold=threshold,
+                            lower=lower / n_pages,
+                            upper=max(lower, upper) / n_pages,
+                            scored=scored,
+                            total=total,
+                        )
+                    if upper / n_pages + margin < threshold:
+                        return GateResult(
+                            passed=False,
+                            threshold=threshold,
+                            lower=lower / n_pages,
+                            upper=max(lower, upper) / n_pages,
+                            scored=scored,
+                            total=total,
+                        )
+                active = [page for page in active if page[2] < page[1]]
+
+            # Every fragment is scored: decide on the mean exactly as `process` computes it.
+            page_scores = [
+                page[3] if not incremental else round(page[3] / page[1], 2)
+                for page in pages
+            ]
+            mean = sum(page_scores) / n_pages
+            return GateResult(
+                passed=mean >= threshold,
+                threshold=threshold,
+                lower=mean,
+                upper=mean,
+                scored=scored,
+                total=total,
+            )
         except Exception as e:
-            raise Exception(f"An error occurred while calculate score: {e}") from e
+            raise Exception(f"An error occurred while gating score: {e}") from e
+
+    @staticmethod
+    def _stratified_sample(
+        n_fragments: int, sample_size: int, strata: int, rng: random.Random
+    ) -> List[List[int]]:
+        """
+        Draws a stratified random sample of fragment indexes.
+
+        The fragments are sorted by length, so the strata are contiguous index ranges of (nearly) equal size.
+        The sample is allocated proportionally to stratum size, with at least two fragments per stratum so
+        that its variance can be estimated.
+
+        Args:
+            n_fragments (int): Number of fragments of the page.
+            sample_size (int): Number of fragments to draw.
+            strata (int): Number of length strata.
+            rng (random.Random): The random generator.
+
+        Returns:
+            List[List[int]]: The sorted sampled indexes of each stratum, covering the whole stratum for
+            strata of one or two fragments.
+        """
+        strata = max(1, min(strata, n_fragments // 2))
+        bounds = [n_fragments * h // strata for h in range(strata + 1)]
+        sample = []
+        for start, stop in zip(bounds, bounds[1:]):
+            size = stop - start
+            n_h = min(size, max(2, round(sample_size * size / n_fragments)))
+            sample.append(sorted(rng.sample(range(start, stop), n_h)))
+        return sample
+
+    def _estimate_page(
+        self,
+        xml_list: List[str],
+        json_list: List[str],
+        sample_size: int,
+        strata: int,
+        rng: random.Random,
+    ) -> Tuple[float, float, int]:
+        """
+        Estimates the page score from a stratified sample of its GT fragments.
+
+        Sampled fragments are scored in their original order against one copy of the JSON strings, so only
+        sampled fragments consume matched substrings. Pages not larger than `sample_size` are scored fully.
+        Either way the page score is rounded to 2 decimals, like the page scores of `process`; the variance
+        is computed from the unrounded scores.
+
+        Args:
+            xml_list (List[str]): The GT fragments of the page, sorted by length descending.
+            json_list (List[str]): The flattened generated strings of the page.
+            sample_size (int): Number of fragments to score.
+            strata (int): Number of length strata.
+            rng (random.Random): The random generator.
+
+        Returns:
+            Tuple[float, float, int]: The estimated page score (rounded to 2 decimals), the variance of the
+            estimate and the number of scored fragments.
+        """
+        n_fragments = len(xml_list)
+        if n_fragments <= sample_size:
+            scores = [
+                fragment.score
+                for fragment in self.metrics.iter_scores(xml_list, list(json_list))
+            ]
+            return round(sum(scores) / n_fragments, 2), 0.0, n_fragments
+
+        sample = self._stratified_sample(n_fragments, sample_size, strata, rng)
+        scores = iter(
+            self.metrics.iter_scores(
+                [xml_list[i] for stratum in sample for i in stratum], list(json_list)
+            )
+        )
+
+        mean, variance, sampled = 0.0, 0.0, 0
+        for h, stratum in enumerate(sample):
+            size = (n_fragments * (h + 1)) // len(sample) - (n_fragments * h) // len(
+                sample
+            )
+            values = [next(scores).score for _ in stratum]
+            n_h = len(values)
+            weight = size / n_fragments
+            mean_h = sum(values) / n_h
+            mean += weight * mean_h
+            if n_h < size:
+                var_h = sum((v - mean_h) ** 2 for v in values) / (n_h - 1)
+                variance += weight**2 * (1 - n_h / size) * var_h / n_h
+            sampled += n_h
+        return round(mean, 2), variance, sampled
+
+    def estimate(
+        self,
+        gt_data: PageData,
+        data: PageGenerate,
+        sample_size: int = 50,
+        strata: int = 4,
+        confidence: float = 0.95,
+        seed: int = 0,
+    ) -> ScoreEstimate:
+        """
+        Estimates the scores of `process` from a stratified random sample of GT fragments on every page.
+
+        Fragments are stratified by length and each page scores at most about `sample_size` of them, so the
+        evaluation time is bounded regardless of document size. The interval is the normal approximation of
+        the stratified mean, with finite population correction, clipped to [0, 1]. Sampled fragments only
+        compete with each other for matched substrings, which makes the estimate slightly optimistic for
+        metrics that consume matches.
+
+        Args:
+            gt_data (PageData): Ground truth. (from Parser.)
+            data (PageGenerate): Validate data. (from Transform.)
+            sample_size (int): Number of fragments scored per page. Default: 50.
+            strata (int): Number of length strata per page. Default: 4.
+            confidence (float): Confidence level of the interval. Default: 0.95.
+            seed (int): Seed of the sampling, the same seed gives the same estimate. Default: 0.
+
+        Returns:
+            ScoreEstimate: The estimated score of each page, the estimated mean with its confidence interval and
+            the number of scored fragments.
+
+        Raises:
+            ValueError:
+                If the metric has no `iter_scores` or several metrics are set.
+            Exception:
+                An error occurred while estimating score
+        """
+        if not hasattr(self.metrics, "iter_scores"):
+            raise ValueError("estimate needs a single metric with iter_scores.")
+        try:
+            self._load_sidecar(gt_data)
+            pages = {}
+            variance, sampled, total = 0.0, 0, 0
+            for page_num in gt_data.pages:
+                xml_list = self._gt_fragments(gt_data.pages[page_num])
+                json_list = self._flatten_sections(data.pages[page_num].data)
+                rng = random.Random(f"{seed}:{page_num}")
+                page_mean, page_variance, page_sampled = self._estimate_page(
+                    xml_list, json_list, sample_size, strata, rng
+                )
+                pages[page_num] = page_mean
+                variance += page_variance
+                sampled += page_sampled
+                total += len(xml_list)
+
+            mean = sum(pages.values()) / len(pages)
+            half_width = (
+                NormalDist().inv_cdf((1 + confidence) / 2)
+                * math.sqrt(variance)
+                / len(pages)
+            )
+            return ScoreEstimate(
+                pages=pages,
+                mean=mean,
+                lower=max(0.0, mean - half_width),
+                upper=min(1.0, mean + half_width),
+                confidence=confidence,
+                sampled=sampled,
+                total=total,
+            )
+        except Exception as e:
+            raise Exception(f"An error occurred while estimating score: {e}") from e
@@ -0,0 +1,37 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from evaluator import BatchValidate, Validate
+from metrics import SimilarityMetrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Evaluate a corpus of converted documents against their ground truth."
+    )
+    parser.add_argument(
+        "directory", help="Directory of <name>.json and <name>.xml/.pdf files."
+    )
+    parser.add_argument("--results", default="results.jsonl")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    parser.add_argument("--metrics", nargs="+", default=["str_similarity"])
+    parser.add_argument("--max-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    metrics = [SimilarityMetrics.get(name)[0] for name in args.metrics]
+    settings = {name: SimilarityMetrics.get(name)[1] for name in args.metrics}
+    batch = BatchValidate(
+        Validate(metrics=metrics, setting=settings), max_workers=args.max_workers
+    )
+
+    regressions = batch.run(
+        args.directory, args.results, args.baseline, tolerance=args.tolerance
+    )
+    for regression in regressions:
+        print(
+            f"{regression.document} [{regression.metric}] page {regression.page}: "
+            f"{regression.baseline:.2f} -> {regression.current}"
+        )
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from converter import Transform
+from evaluator import Validate
+from GenAIServices import CassetteHandler, OllamaHandler
+from metrics import SimilarityMetrics
+from preprocessor import XMLPreProcessor
+from readers import XMLParser
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Record the model answers of a document once, then rerun the pipeline from them."
+    )
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument(
+        "--xml", default="./data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+    )
+    parser.add_argument("--cassette", default="./data/EMPU_3401.cassette.jsonl.gz")
+    parser.add_argument("--model", default="mistral-small3.1:24b")
+    parser.add_argument("--url", default="http://127.0.0.1:6589/model_server/")
+    args = parser.parse_args()
+
+    start_t = time.time()
+    inner = OllamaHandler(url=args.url) if args.mode == "record" else None
+    gen_ai = CassetteHandler(args.cassette, mode=args.mode, inner=inner)
+
+    gt_data = XMLParser().process(args.xml, with_fragments=True)
+    preproc_data = XMLPreProcessor().process(gt_data)
+    data = Transform(model_name=args.model, gen_ai=gen_ai).process(preproc_data)
+
+    metric, settings = SimilarityMetrics.get("str_similarity")
+    scores = Validate(metrics=metric, setting=settings).process(gt_data, data)
+    print(f"Similarity score: {scores}")
+    print(f"all : {time.time() - start_t}")
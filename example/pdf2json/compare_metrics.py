@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from evaluator import Validate
+from metrics import SimilarityMetrics
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+if __name__ == "__main__":
+    sys.path.append(DATA_DIR)
+    from gt import gt
+
+    with open(os.path.join(DATA_DIR, "summary_data.json"), encoding="utf-8") as f:
+        converted_data = json.load(f)
+
+    json_list = Validate(metrics=None)._read_and_flatten_json(converted_data)
+
+    results = []
+    for member in SimilarityMetrics:
+        metric, settings = SimilarityMetrics.get(member.name)
+        start_t = time.perf_counter()
+        # Metrics may consume matched substrings, so each one gets its own copy.
+        score = metric.calculate(
+            xml_list=list(gt), json_list=list(json_list), **settings
+        )
+        results.append((member.name, score, time.perf_counter() - start_t))
+
+    print(f"\n{'metric':<20}{'score':>8}{'time (ms)':>12}")
+    for name, score, elapsed in results:
+        print(f"{name:<20}{score:>8.2f}{elapsed * 1000:>12.2f}")
@@ -0,0 +1,29 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from converter import Transform
+from evaluator import Validate
+from metrics import SimilarityMetrics
+from pipeline import Pipeline
+from preprocessor import XMLPreProcessor
+from readers import PDFParser
+
+if __name__ == "__main__":
+    start_t = time.time()
+    path = "./data/EMPU_3401_Datasheet.pdf"
+
+    metric, settings = SimilarityMetrics.get("str_similarity")
+    pipeline = Pipeline(
+        reader=PDFParser(),
+        preprocessor=XMLPreProcessor(),
+        converter=Transform(model_name="mistral-small3.1:24b"),
+        evaluator=Validate(metrics=metric, setting=settings),
+        queue_size=2,
+        reader_kwargs={"with_fragments": True},
+    )
+    result = pipeline.process(path)
+
+    print(f"Similarity score: {result.scores}")
+    print(f"all : {time.time() - start_t}")
@@ -0,0 +1,171 @@
+import heapq
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+from metrics.functions.core import BaseMetric, MatchContext
+from metrics.functions.ngram_index import NGramIndex
+
+
+def pair_similarity(xml_str: str, json_str: str, min_similarity: float) -> float:
+    """
+    Scores one candidate pair, pruning pairs that cannot reach `min_similarity`.
+
+    Args:
+        xml_str (str): The ground truth fragment.
+        json_str (str): The generated string.
+        min_similarity (float): Pairs scoring below this value are dropped.
+
+    Returns:
+        float: 1.0 if `xml_str` is contained in `json_str`, otherwise the `SequenceMatcher` ratio rounded
+        to two decimals; 0.0 for pruned pairs.
+    """
+    if xml_str in json_str:
+        return 1.0
+    total = len(xml_str) + len(json_str)
+    if 2 * min(len(xml_str), len(json_str)) < min_similarity * total:
+        return 0.0
+    matcher = SequenceMatcher(None, xml_str, json_str)
+    if matcher.quick_ratio() < min_similarity:
+        return 0.0
+    score = round(matcher.ratio(), 2)
+    return score if score >= min_similarity else 0.0
+
+
+def max_weight_assignment(
+    n_cols: int, edges: List[List[Tuple[int, float]]]
+) -> Dict[int, int]:
+    """
+    Solves the one-to-one assignment that maximises the total weight on a sparse bipartite graph.
+
+    This is the Hungarian algorithm in its shortest augmenting path form: rows are added one at a time and
+    Dijkstra with vertex potentials finds the cheapest augmenting path from the new row. Only the listed edges
+    are visited, so each step costs O(E log V) over the surviving pairs instead of O(rows x cols). Every row
+    owns a private zero-weight dummy column, which lets it stay unassigned.
+
+    Args:
+        n_cols (int): Number of columns.
+        edges (List[List[Tuple[int, float]]]): For each row, its (column, weight) pairs with weight in [0, 1].
+
+    Returns:
+        Dict[int, int]: Mapping of row to assigned column for rows matched to a real column.
+    """
+    n_rows = len(edges)
+    inf = float("inf")
+    # Costs are 1 - weight; column n_cols + i is the dummy column of row i.
+    adjacency = [
+        [(col, 1.0 - weight) for col, weight in row_edges] + [(n_cols + row, 1.0)]
+        for row, row_edges in enumerate(edges)
+    ]
+    u = [0.0] * n_rows
+    v = [0.0] * (n_cols + n_rows)
+    row_of_col = [-1] * (n_cols + n_rows)
+    col_of_row = [-1] * n_rows
+
+    for source in range(n_rows):
+        u[source] = min(cost - v[col] for col, cost in adjacency[source])
+        dist_row = {source: 0.0}
+        dist_col = {}
+        prev_row = {}
+        done_rows = set()
+        done_cols = {}
+        heap = [(0.0, 0, source)]
+        target, target_dist = -1, 0.0
+
+        while heap:
+            dist, is_col, node = heapq.heappop(heap)
+            if is_col:
+                if node in done_cols:
+                    continue
+                done_cols[node] = dist
+                matched_row = row_of_col[node]
+                if matched_row == -1:
+                    target, target_dist = node, dist
+                    break
+                if dist < dist_row.get(matched_row, inf):
+                    dist_row[matched_row] = dist
+                    heapq.heappush(heap, (dist, 0, matched_row))
+            else:
+                if node in done_rows:
+                    continue
+                done_rows.add(node)
+                for col, cost in adjacency[node]:
+                    if col in done_cols:
+                        continue
+                    new_dist = dist + cost - u[node] - v[col]
+                    if new_dist < dist_col.get(col, inf):
+                        dist_col[col] = new_dist
+                        prev_row[col] = node
+                        heapq.heappush(heap, (new_dist, 1, col))
+
+        # Keep reduced costs non-negative and make the augmenting path tight.
+        for row in done_rows:
+            u[row] += target_dist - dist_row[row]
+        for col, dist in done_cols.items():
+            v[col] -= target_dist - dist
+
+        col = target
+        while True:
+            row = prev_row[col]
+            next_col = col_of_row[row]
+            col_of_row[row] = col
+            row_of_col[col] = row
+            if row == source:
+                break
+            col = next_col
+
+    return {row: col for row, col in enumerate(col_of_row) if col < n_cols}
+
+
+class AssignmentSimilarity(BaseMetric):
+    """
+    Order-independent similarity from an optimal one-to-one matching of GT fragments to JSON strings.
+
+    Unlike the greedy `StrSimilarity`, a long fragment cannot take the only good match of a later one. Pairs
+    are only scored when they share character trigrams, and each JSON string is used at most once, so
+    fragments merged into a single JSON string by the model only match one of them.
+    """
+
+    @staticmethod
+    def calculate(
+        xml_list: List[str],
+        json_list: List[str],
+        min_similarity: float = 0.3,
+        top_k: int = 20,
+        context: MatchContext = None,
+        **kwargs,
+    ) -> float:
+        """Calculates the average similarity of the optimal assignment between two lists of strings.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content.
+            min_similarity (float): Pairs below this similarity are not considered. Default: 0.3.
+            top_k (int): Number of prefiltered candidates kept per GT fragment. Default: 20.
+            context (MatchContext): Shared page data; its trigram index is reused when given.
+
+        Returns:
+            float: The average similarity score of the assignment, rounded to two decimals.
+
+        Raises:
+            Exception:
+                An error occurred while calculate similarity score with AssignmentSimilarity.
+        """
+        try:
+            index = context.ngram_index if context else NGramIndex(json_list)
+            edges = []
+            for xml_str in xml_list:
+                row_edges = []
+                for idx, _ in index.candidates(xml_str, top_k=top_k):
+                    score = pair_similarity(xml_str, json_list[idx], min_similarity)
+                    if score > 0:
+                        row_edges.append((idx, score))
+                edges.append(row_edges)
+
+            assignment = max_weight_assignment(len(json_list), edges)
+            weights = [dict(row_edges) for row_edges in edges]
+            total = sum(weights[row][col] for row, col in assignment.items())
+            return round(total / len(xml_list), 2)
+        except Exception as e:
+            raise Exception(
+                f"An error occurred while calculate similarity score with AssignmentSimilarity: {e}"
+            ) from e
@@ -1,4 +1,8 @@
 import abc
+from functools import cached_property
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Set
+
+from metrics.functions.ngram_index import NGramIndex
 
 
 class BaseMetric(abc.ABC):
@@ -22,3 +26,67 @@ class BaseMetric(abc.ABC):
             float: The calculated metric value.
         """
         pass
+
+
+class FragmentScore(NamedTuple):
+    """
+    Score of one GT fragment, as yielded by the `iter_scores` method of incremental metrics.
+
+    Attributes:
+        score (float): Similarity of the fragment, rounded to two decimals.
+        json_idx (int): Index of the best matching JSON string, -1 if there was none.
+        exact (bool): Whether the fragment was found verbatim in the JSON string.
+    """
+
+    score: float
+    json_idx: int
+    exact: bool
+
+
+class MatchContext:
+    """
+    Shared, read-only data of one page, built once and reused by every metric that scores the page.
+
+    Metrics receive it as the `context` keyword of `calculate`. It must describe the same strings as the
+    `xml_list` and `json_list` passed alongside it, and metrics must not modify anything it holds.
+    """
+
+    def __init__(self, xml_list: List[str], json_list: List[str]):
+        """
+        Args:
+            xml_list (List[str]): The flattened (and normalized) GT fragments of the page.
+            json_list (List[str]): The flattened (and normalized) generated strings of the page.
+        """
+        self.xml_list = xml_list
+        self.json_list = json_list
+        self._cache: Dict[Hashable, Any] = {}
+
+    @cached_property
+    def ngram_index(self) -> NGramIndex:
+        """
+        NGramIndex: Trigram index over `json_list`.
+        """
+        return NGramIndex(self.json_list)
+
+    @cached_property
+    def exact(self) -> Set[str]:
+        """
+        Set[str]: The JSON strings, for whole-string lookups of GT fragments. The containment matching of
+        `StrSimilarity`-like metrics consumes matched substrings and cannot use it.
+        """
+        return set(self.json_list)
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Returns a metric-specific artifact, building it with `factory` the first time `key` is requested.
+
+        Args:
+            key (Hashable): Identifies the artifact, including any parameters it depends on.
+            factory (Callable[[], Any]): Builds the artifact.
+
+        Returns:
+            Any: The cached artifact.
+        """
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
@@ -0,0 +1,299 @@
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from metrics.functions.core import BaseMetric, FragmentScore
+
+# Patterns up to this length fit into one uint64 lane of the batched kernel.
+WORD_SIZE = 64
+
+
+def _pattern_masks(pattern: str) -> Dict[str, int]:
+    """
+    Builds the match bit-vectors (Peq) of a pattern.
+
+    Args:
+        pattern (str): The pattern string.
+
+    Returns:
+        Dict[str, int]: Mapping of each character to the bit positions where it appears in the pattern.
+    """
+    peq = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    return peq
+
+
+def levenshtein_distance(pattern: str, text: str) -> int:
+    """
+    Computes the Levenshtein distance with the bit-parallel algorithm of Myers/Hyyrö.
+
+    Python integers are used as bit-vectors, so the pattern length is not limited to the machine word.
+
+    Args:
+        pattern (str): The first string.
+        text (str): The second string.
+
+    Returns:
+        int: The edit distance between `pattern` and `text`.
+    """
+    if len(pattern) < len(text):
+        pattern, text = text, pattern
+    m = len(pattern)
+    if not text:
+        return m
+
+    peq = _pattern_masks(pattern)
+    mask = (1 << m) - 1
+    high_bit = 1 << (m - 1)
+    pv = mask
+    mv = 0
+    score = m
+
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high_bit:
+            score += 1
+        elif mh & high_bit:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def normalized_similarity(pattern: str, text: str) -> float:
+    """
+    Computes the normalized Levenshtein similarity, `1 - distance / max(len)`.
+
+    Args:
+        pattern (str): The first string.
+        text (str): The second string.
+
+    Returns:
+        float: Similarity in [0, 1]; 1.0 means both strings are identical.
+    """
+    longest = max(len(pattern), len(text))
+    if longest == 0:
+        return 1.0
+    return 1.0 - levenshtein_distance(pattern, text) / longest
+
+
+def _code_points(text: str) -> np.ndarray:
+    """
+    Converts a string into its code points.
+
+    Args:
+        text (str): The string to convert.
+
+    Returns:
+        np.ndarray: A uint32 array with one code point per character.
+    """
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def encode_candidates(candidates: List[str]) -> np.ndarray:
+    """
+    Encodes candidate strings as a zero-padded matrix of code points.
+
+    Args:
+        candidates (List[str]): The candidate strings.
+
+    Returns:
+        np.ndarray: An int64 array of shape (len(candidates), longest candidate length).
+    """
+    width = max((len(s) for s in candidates), default=0)
+    codes = np.zeros((len(candidates), width), dtype=np.int64)
+    for row, text in enumerate(candidates):
+        if text:
+            codes[row, : len(text)] = _code_points(text)
+    return codes
+
+
+def batch_similarity(
+    pattern: str, candidates: List[str], codes: np.ndarray = None
+) -> np.ndarray:
+    """
+    Scores one pattern against many candidates at once.
+
+    Every candidate is a lane of a uint64 bit-vector and all lanes advance together, one text column per step.
+    Lanes are ordered by length so the lanes still running always form a prefix of the arrays.
+    Patterns longer than `WORD_SIZE` fall back to the scalar `normalized_similarity`.
+
+    Args:
+        pattern (str): The ground truth fragment.
+        candidates (List[str]): The strings to compare against.
+        codes (np.ndarray): Optional output of `encode_candidates(candidates)` to reuse across patterns.
+
+    Returns:
+        np.ndarray: float64 similarities, one per candidate.
+    """
+    m = len(pattern)
+    if not candidates:
+        return np.zeros(0, dtype=np.float64)
+    if m == 0 or m > WORD_SIZE:
+        return np.array(
+            [normalized_similarity(pattern, text) for text in candidates],
+            dtype=np.float64,
+        )
+
+    if codes is None:
+        codes = encode_candidates(candidates)
+    lengths = np.fromiter((len(s) for s in candidates), dtype=np.int64)
+    order = np.argsort(-lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    width = int(sorted_lengths[0])
+
+    peq = _pattern_masks(pattern)
+    alphabet = np.array(sorted(ord(c) for c in peq), dtype=np.int64)
+    alphabet_masks = np.array([peq[chr(c)] for c in alphabet.tolist()], dtype=np.uint64)
+
+    # Look up Peq[text[j]] for every candidate cell in one vectorised pass.
+    sorted_codes = codes[order, :width]
+    positions = np.searchsorted(alphabet, sorted_codes)
+    positions = np.minimum(positions, len(alphabet) - 1)
+    eq_table = np.where(
+        alphabet[positions] == sorted_codes, alphabet_masks[positions], np.uint64(0)
+    )
+
+    one = np.uint64(1)
+    mask = np.uint64((1 << m) - 1)
+    high_bit = np.uint64(1 << (m - 1))
+    pv = np.full(len(candidates), mask, dtype=np.uint64)
+    mv = np.zeros(len(candidates), dtype=np.uint64)
+    score = np.full(len(candidates), m, dtype=np.int64)
+    # active[j] is the number of candidates longer than j.
+    active = np.searchsorted(-sorted_lengths, -np.arange(width), side="left")
+
+    for j in range(width):
+        n = active[j]
+        eq = eq_table[:n, j]
+        p, v = pv[:n], mv[:n]
+        xv = eq | v
+        xh = (((eq & p) + p) ^ p) | eq
+        ph = v | (~(xh | p) & mask)
+        mh = p & xh
+        score[:n] += (ph & high_bit) != 0
+        score[:n] -= (mh & high_bit) != 0
+        ph = ((ph << one) | one) & mask
+        mh = (mh << one) & mask
+        pv[:n] = mh | (~(xv | ph) & mask)
+        mv[:n] = ph & xv
+
+    similarities = np.empty(len(candidates), dtype=np.float64)
+    similarities[order] = 1.0 - score / np.maximum(sorted_lengths, m)
+    return similarities
+
+
+def best_similarity(
+    pattern: str, candidates: List[str], codes: np.ndarray
+) -> Tuple[float, int]:
+    """
+    Finds the highest similarity of a pattern over the candidates.
+
+    `min(len) / max(len)` bounds the similarity of a pair, so candidates whose length alone rules them out
+    are skipped once a good enough match has been found among the ones of similar length.
+
+    Args:
+        pattern (str): The ground truth fragment.
+        candidates (List[str]): The strings to compare against.
+        codes (np.ndarray): Output of `encode_candidates(candidates)`.
+
+    Returns:
+        Tuple[float, int]: The best similarity and the index of its candidate; (0.0, -1) when there are no
+        candidates.
+    """
+    if not candidates:
+        return 0.0, -1
+    m = len(pattern)
+    lengths = np.fromiter((len(s) for s in candidates), dtype=np.int64)
+    longest = np.maximum(np.maximum(lengths, m), 1)
+    bounds = np.minimum(lengths, m) / longest
+
+    best, best_idx = 0.0, -1
+    for selected in (bounds >= 0.5, bounds < 0.5):
+        selected &= bounds > best
+        idx = np.flatnonzero(selected)
+        if not len(idx):
+            continue
+        scores = batch_similarity(
+            pattern, [candidates[i] for i in idx], codes[idx, : lengths[idx].max()]
+        )
+        top = int(scores.argmax())
+        if scores[top] > best:
+            best, best_idx = float(scores[top]), int(idx[top])
+    return best, best_idx
+
+
+class EditDistanceSimilarity(BaseMetric):
+    """
+    Normalized Levenshtein similarity computed with a bit-parallel algorithm.
+
+    Matching follows `StrSimilarity`: fragments that are contained in a JSON string score 1.0 and consume the
+    matched substring, all others take their best similarity over the JSON strings.
+    """
+
+    @staticmethod
+    def iter_scores(
+        xml_list: List[str], json_list: List[str]
+    ) -> Iterator[FragmentScore]:
+        """
+        Scores the GT fragments one at a time, in order.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content, not modified.
+
+        Yields:
+            FragmentScore: The score of each fragment.
+        """
+        json_list = list(json_list)
+        codes = encode_candidates(json_list)
+
+        for xml_str in xml_list:
+            matched_idx = next(
+                (idx for idx, s in enumerate(json_list) if xml_str in s), -1
+            )
+            if matched_idx >= 0:
+                json_list[matched_idx] = (
+                    json_list[matched_idx].replace(xml_str, "", 1).strip()
+                )
+                codes[matched_idx] = 0
+                if remaining := json_list[matched_idx]:
+                    codes[matched_idx, : len(remaining)] = _code_points(remaining)
+                yield FragmentScore(1.0, matched_idx, True)
+                continue
+
+            best, best_idx = best_similarity(xml_str, json_list, codes)
+            yield FragmentScore(round(best, 2), best_idx, False)
+
+    @staticmethod
+    def calculate(xml_list: List[str], json_list: List[str], **kwargs) -> float:
+        """Calculates the average edit distance similarity between two lists of strings.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content.
+
+        Returns:
+            float: The average similarity score between the XML and JSON strings, rounded to two decimals.
+
+        Raises:
+            Exception:
+                An error occurred while calculate similarity score with EditDistanceSimilarity.
+        """
+        try:
+            xml_json_scores = [
+                fragment.score
+                for fragment in EditDistanceSimilarity.iter_scores(xml_list, json_list)
+            ]
+            return round(sum(xml_json_scores) / len(xml_json_scores), 2)
+        except Exception as e:
+            raise Exception(
+                f"An error occurred while calculate similarity score with EditDistanceSimilarity: {e}"
+            ) from e
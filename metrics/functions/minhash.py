@@ -0,0 +1,187 @@
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from metrics.functions.core import BaseMetric, MatchContext
+from metrics.functions.ngram_index import ngrams
+
+# Mersenne prime 2^31 - 1: products of two residues still fit into uint64.
+PRIME = (1 << 31) - 1
+# Approximate number of shingles hashed in one vectorised step.
+CHUNK_SIZE = 1 << 16
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draws the coefficients of the universal hash functions `(a * x + b) mod PRIME`.
+
+    Args:
+        num_perm (int): Number of hash functions.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The `a` and `b` coefficients as uint64 column vectors.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=(num_perm, 1), dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(
+    strings: List[str], num_perm: int = 64, k: int = 3, seed: int = 1
+) -> np.ndarray:
+    """
+    Computes MinHash signatures of the character k-shingles of each string.
+
+    All shingles are hashed into one flat array and every hash function is applied to it at once, the
+    per-string minimum is then taken with `np.minimum.reduceat`.
+
+    Args:
+        strings (List[str]): The strings to sign.
+        num_perm (int): Signature length. Default: 64.
+        k (int): Shingle length. Default: 3.
+        seed (int): Seed of the hash functions. Default: 1.
+
+    Returns:
+        np.ndarray: uint64 array of shape (len(strings), num_perm); empty strings get `PRIME` everywhere.
+    """
+    a, b = _permutations(num_perm, seed)
+    signatures = np.full((len(strings), num_perm), PRIME, dtype=np.uint64)
+
+    start = 0
+    while start < len(strings):
+        rows, offsets, hashes = [], [], []
+        stop = start
+        while stop < len(strings) and (not hashes or len(hashes) < CHUNK_SIZE):
+            shingles = ngrams(strings[stop], k)
+            if shingles:
+                rows.append(stop)
+                offsets.append(len(hashes))
+                hashes.extend(zlib.crc32(s.encode("utf-8")) % PRIME for s in shingles)
+            stop += 1
+        if hashes:
+            values = (a * np.array(hashes, dtype=np.uint64) + b) % PRIME
+            signatures[rows] = np.minimum.reduceat(values, offsets, axis=1).T
+        start = stop
+    return signatures
+
+
+class MinHashSimilarity(BaseMetric):
+    """
+    Approximate similarity for corpus-scale evaluation based on MinHash and locality-sensitive hashing.
+
+    Each GT fragment is only compared with the JSON strings sharing at least one LSH band with it. The
+    reported score estimates how much of the fragment's shingles are covered by the best candidate, so it is
+    an approximation of `StrSimilarity` rather than the same number. More permutations give a more accurate
+    estimate, more bands find more candidates; both cost time.
+    """
+
+    @staticmethod
+    def _index(
+        json_list: List[str], num_perm: int, bands: int, k: int, seed: int
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[Tuple[int, bytes], List[int]]]:
+        """
+        Signs the JSON strings and groups them into LSH buckets.
+
+        Args:
+            json_list (List[str]): A list of strings extracted from JSON content.
+            num_perm (int): Signature length.
+            bands (int): Number of LSH bands.
+            k (int): Shingle length.
+            seed (int): Seed of the hash functions.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, Dict[Tuple[int, bytes], List[int]]]:
+                - The signatures of the JSON strings.
+                - The number of shingles of each JSON string.
+                - The JSON string indexes of each (band, band signature) bucket.
+        """
+        rows = num_perm // bands
+        json_sig = minhash_signatures(json_list, num_perm, k, seed)
+        json_sizes = np.array([len(ngrams(s, k)) for s in json_list])
+
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        for idx, text in enumerate(json_list):
+            if not text:
+                continue
+            for band in range(bands):
+                key = json_sig[idx, band * rows : (band + 1) * rows].tobytes()
+                buckets.setdefault((band, key), []).append(idx)
+        return json_sig, json_sizes, buckets
+
+    @staticmethod
+    def calculate(
+        xml_list: List[str],
+        json_list: List[str],
+        num_perm: int = 64,
+        bands: int = 32,
+        k: int = 3,
+        seed: int = 1,
+        context: MatchContext = None,
+        **kwargs,
+    ) -> float:
+        """Calculates the estimated average similarity between two lists of strings.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content.
+            num_perm (int): Signature length. Default: 64.
+            bands (int): Number of LSH bands, must divide `num_perm`. Default: 32.
+            k (int): Shingle length. Default: 3.
+            seed (int): Seed of the hash functions. Default: 1.
+            context (MatchContext): Shared page data; the JSON signatures and LSH buckets are cached in it.
+
+        Returns:
+            float: The estimated average similarity score, rounded to two decimals.
+
+        Raises:
+            ValueError:
+                `bands` must divide `num_perm`.
+            Exception:
+                An error occurred while calculate similarity score with MinHashSimilarity.
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm.")
+        try:
+            rows = num_perm // bands
+            exact = context.exact if context else set(json_list)
+            if context:
+                json_sig, json_sizes, buckets = context.get(
+                    ("minhash", num_perm, bands, k, seed),
+                    lambda: MinHashSimilarity._index(
+                        json_list, num_perm, bands, k, seed
+                    ),
+                )
+            else:
+                json_sig, json_sizes, buckets = MinHashSimilarity._index(
+                    json_list, num_perm, bands, k, seed
+                )
+            xml_sig = minhash_signatures(xml_list, num_perm, k, seed)
+
+            xml_json_scores = []
+            for idx, xml_str in enumerate(xml_list):
+                if xml_str in exact:
+                    xml_json_scores.append(1.0)
+                    continue
+                candidates = set()
+                for band in range(bands):
+                    key = xml_sig[idx, band * rows : (band + 1) * rows].tobytes()
+                    candidates.update(buckets.get((band, key), ()))
+                if not candidates:
+                    xml_json_scores.append(0.0)
+                    continue
+
+                candidates = np.fromiter(candidates, dtype=np.int64)
+                jaccard = (json_sig[candidates] == xml_sig[idx]).mean(axis=1)
+                # |A n B| = J * (|A| + |B|) / (1 + J), reported as a share of the fragment |A|.
+                xml_size = len(ngrams(xml_str, k))
+                covered = jaccard * (xml_size + json_sizes[candidates]) / (1 + jaccard)
+                xml_json_scores.append(round(min(1.0, covered.max() / xml_size), 2))
+
+            return round(sum(xml_json_scores) / len(xml_json_scores), 2)
+        except Exception as e:
+            raise Exception(
+                f"An error occurred while calculate similarity score with MinHashSimilarity: {e}"
+            ) from e
@@ -0,0 +1,67 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+
+
+def ngrams(text: str, n: int = 3) -> set:
+    """
+    Collects the distinct character n-grams of a string.
+
+    Args:
+        text (str): The string to split.
+        n (int): The n-gram length. Default: 3.
+
+    Returns:
+        set: The n-grams; strings shorter than `n` yield themselves as a single gram.
+    """
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class NGramIndex:
+    """
+    Inverted index from character n-grams to the strings that contain them.
+    """
+
+    def __init__(self, strings: List[str], n: int = 3):
+        """
+        Builds the postings of all strings.
+
+        Args:
+            strings (List[str]): The strings to index, referenced by their position.
+            n (int): The n-gram length. Default: 3.
+        """
+        self.n = n
+        self.strings = strings
+        self.postings: Dict[str, List[int]] = {}
+        for idx, text in enumerate(strings):
+            for gram in ngrams(text, n):
+                self.postings.setdefault(gram, []).append(idx)
+
+    def candidates(self, query: str, top_k: int = None) -> List[Tuple[int, int]]:
+        """
+        Finds indexed strings that share n-grams with the query.
+
+        Queries shorter than `n` have no n-grams of their own, so the indexed strings containing them are
+        returned instead, shortest first.
+
+        Args:
+            query (str): The string to look up.
+            top_k (int): Keep only the best `top_k` candidates. Default: keep all.
+
+        Returns:
+            List[Tuple[int, int]]: (string index, shared n-gram count), most shared first.
+        """
+        if len(query) < self.n:
+            found = [
+                (idx, 1)
+                for idx, text in enumerate(self.strings)
+                if query and query in text
+            ]
+            found.sort(key=lambda item: len(self.strings[item[0]]))
+            return found[:top_k] if top_k else found
+
+        shared = Counter()
+        for gram in ngrams(query, self.n):
+            shared.update(self.postings.get(gram, ()))
+        return shared.most_common(top_k)
@@ -1,29 +1,77 @@
 from difflib import SequenceMatcher
-from typing import List
+from functools import lru_cache
+from typing import Iterator, List
 
-from metrics.functions.core import BaseMetric
+from metrics.functions.core import BaseMetric, FragmentScore
+
+# Maximum number of (xml_str, json_str) ratios kept by `pair_ratio`.
+PAIR_CACHE_SIZE = 1 << 14
+# Pairs with a longer string are not cached: they rarely repeat and would keep large strings alive.
+PAIR_CACHE_MAX_LEN = 64
+
+
+@lru_cache(maxsize=PAIR_CACHE_SIZE)
+def pair_ratio(xml_str: str, json_str: str) -> float:
+    """
+    Memoized `SequenceMatcher` ratio of a pair, rounded to two decimals.
+
+    Datasheets repeat short strings (`GND`, `Pin`, `°`, ...) on every page, so the same pairs are compared
+    over and over; the cache is shared across pages and documents and bounded to `PAIR_CACHE_SIZE` pairs.
+    Use `similarity_ratio`, which only caches pairs of short strings.
+
+    Args:
+        xml_str (str): The ground truth fragment.
+        json_str (str): The generated string.
+
+    Returns:
+        float: The similarity ratio, rounded to two decimals.
+    """
+    return round(SequenceMatcher(None, xml_str, json_str).ratio(), 2)
+
+
+def similarity_ratio(xml_str: str, json_str: str) -> float:
+    """
+    `SequenceMatcher` ratio of a pair, rounded to two decimals, cached by `pair_ratio` when both strings are
+    at most `PAIR_CACHE_MAX_LEN` characters long.
+
+    Args:
+        xml_str (str): The ground truth fragment.
+        json_str (str): The generated string.
+
+    Returns:
+        float: The similarity ratio, rounded to two decimals.
+    """
+    if len(xml_str) <= PAIR_CACHE_MAX_LEN and len(json_str) <= PAIR_CACHE_MAX_LEN:
+        return pair_ratio(xml_str, json_str)
+    return round(SequenceMatcher(None, xml_str, json_str).ratio(), 2)
 
 
 class StrSimilarity(BaseMetric):
-    def calculate(xml_list: List[str], json_list: List[str]) -> float:
-        """Calculates the average similarity between two lists of strings.
+    @staticmethod
+    def iter_scores(
+        xml_list: List[str], json_list: List[str]
+    ) -> Iterator[FragmentScore]:
+        """Scores the XML strings one at a time, in order.
+
+        Matched substrings are removed from `json_list` in place, as in `calculate`.
 
         Args:
             xml_list (List[str]): A list of strings extracted from XML content.
             json_list (List[str]): A list of strings extracted from JSON content.
 
-        Returns:
-            float: The average similarity score between the XML and JSON strings, rounded to two decimals.
-
-        Raises:
-            Exception:
-                An error occurred while calculate similarity score with StrSimilarity.
+        Yields:
+            FragmentScore: The score of each XML string.
         """
-
-        try:
-            xml_json_scores = []
-
-            for xml_str in xml_list:
+        # Fuzzy results by fragment, with the number of consumed matches when they were computed: an
+        # identical fragment reuses the result as long as `json_list` has not changed since.
+        fuzzy = {}
+        version = 0
+        for xml_str in xml_list:
+            reused = fuzzy.get(xml_str)
+            if reused is not None and reused[1] == version:
+                fragment = reused[0]
+                print_json_str = json_list[fragment.json_idx]
+            else:
                 each_json_score = []
                 print_json_str = ""
 
@@ -34,28 +82,49 @@ class StrSimilarity(BaseMetric):
                             (1.0, -1)
                         )  # assign the similarity score as 1 directly
                         print_json_str = json_list[idx]
+                        matched_idx = idx
                         json_list[idx] = json_str.replace(
                             xml_str, "", 1
                         ).strip()  # remove the matched substring
+                        version += 1
                         break
                     else:
                         each_json_score.append(
-                            (
-                                round(
-                                    SequenceMatcher(None, xml_str, json_str).ratio(), 2
-                                ),
-                                idx,
-                            )
+                            (similarity_ratio(xml_str, json_str), idx)
                         )  # use `difflib.SequenceMatcher` for approximate matching
 
                 # Find out the maximum similarity score
-                max_score_val = max(each_json_score, key=lambda x: x[0])[0]
-                max_score_idx = max(each_json_score, key=lambda x: x[0])[1]
-                xml_json_scores.append(max_score_val)
-                print(
-                    f"({xml_str}, {json_list[max_score_idx] if max_score_idx >= 0 else print_json_str}, {xml_json_scores[-1]})"
-                )
+                max_score_val, max_score_idx = max(each_json_score, key=lambda x: x[0])
+                if max_score_idx < 0:
+                    fragment = FragmentScore(max_score_val, matched_idx, True)
+                else:
+                    fragment = FragmentScore(max_score_val, max_score_idx, False)
+                    print_json_str = json_list[max_score_idx]
+                    fuzzy[xml_str] = (fragment, version)
+            print(f"({xml_str}, {print_json_str}, {fragment.score})")
+            yield fragment
+
+    def calculate(xml_list: List[str], json_list: List[str], **kwargs) -> float:
+        """Calculates the average similarity between two lists of strings.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content.
+            kwargs (dict): Metric settings, unused by this metric.
 
+        Returns:
+            float: The average similarity score between the XML and JSON strings, rounded to two decimals.
+
+        Raises:
+            Exception:
+                An error occurred while calculate similarity score with StrSimilarity.
+        """
+
+        try:
+            xml_json_scores = [
+                fragment.score
+                for fragment in StrSimilarity.iter_scores(xml_list, json_list)
+            ]
             return round(sum(xml_json_scores) / len(xml_json_scores), 2)
         except Exception as e:
             raise Exception(
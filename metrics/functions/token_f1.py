@@ -0,0 +1,80 @@
+import re
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+from metrics.functions.core import BaseMetric
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize(strings: Iterable[str]) -> Counter:
+    """
+    Splits strings into case-folded word and punctuation tokens.
+
+    Args:
+        strings (Iterable[str]): The strings to tokenize.
+
+    Returns:
+        Counter: Multiset of all tokens found in the strings.
+    """
+    tokens = Counter()
+    for s in strings:
+        tokens.update(TOKEN_PATTERN.findall(s.casefold()))
+    return tokens
+
+
+class TokenF1(BaseMetric):
+    """
+    Token coverage between ground truth and generated strings, linear in the total number of tokens.
+
+    Precision is the share of generated tokens found in the ground truth, recall the share of ground truth
+    tokens found in the generated data, both counted with multiplicity.
+    """
+
+    @staticmethod
+    def precision_recall_f1(
+        xml_list: List[str], json_list: List[str]
+    ) -> Tuple[float, float, float]:
+        """Calculates token precision, recall and F1 between two lists of strings.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content.
+
+        Returns:
+            Tuple[float, float, float]: precision, recall and F1, rounded to two decimals.
+        """
+        gt_tokens = tokenize(xml_list)
+        gen_tokens = tokenize(json_list)
+        overlap = sum((gt_tokens & gen_tokens).values())
+
+        gen_total = sum(gen_tokens.values())
+        gt_total = sum(gt_tokens.values())
+        precision = overlap / gen_total if gen_total else 0.0
+        recall = overlap / gt_total if gt_total else 0.0
+        if precision + recall == 0:
+            return 0.0, 0.0, 0.0
+        f1 = 2 * precision * recall / (precision + recall)
+        return round(precision, 2), round(recall, 2), round(f1, 2)
+
+    @staticmethod
+    def calculate(xml_list: List[str], json_list: List[str], **kwargs) -> float:
+        """Calculates the token F1 score between two lists of strings.
+
+        Args:
+            xml_list (List[str]): A list of strings extracted from XML content.
+            json_list (List[str]): A list of strings extracted from JSON content.
+
+        Returns:
+            float: The token F1 score, rounded to two decimals.
+
+        Raises:
+            Exception:
+                An error occurred while calculate similarity score with TokenF1.
+        """
+        try:
+            return TokenF1.precision_recall_f1(xml_list, json_list)[2]
+        except Exception as e:
+            raise Exception(
+                f"An error occurred while calculate similarity score with TokenF1: {e}"
+            ) from e
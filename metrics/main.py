@@ -1,7 +1,11 @@
 import enum
 from typing import Tuple
 
+from metrics.functions.assignment import AssignmentSimilarity
+from metrics.functions.edit_distance import EditDistanceSimilarity
+from metrics.functions.minhash import MinHashSimilarity
 from metrics.functions.str_similarity import BaseMetric, StrSimilarity
+from metrics.functions.token_f1 import TokenF1
 
 
 class SimilarityMetrics(enum.Enum):
@@ -10,6 +14,10 @@ class SimilarityMetrics(enum.Enum):
     """
 
     str_similarity = StrSimilarity
+    edit_distance = EditDistanceSimilarity
+    token_f1 = TokenF1
+    assignment = AssignmentSimilarity
+    minhash = MinHashSimilarity
 
     @classmethod
     def get(cls, method: str) -> Tuple[BaseMetric, dict]:
@@ -42,7 +50,13 @@ class SimilarityMetrics(enum.Enum):
         Returns:
             dict: A dictionary containing the settings for the metric class.
         """
-        mapping = {"str_similarity": {"k1": "v1"}}
+        mapping = {
+            "str_similarity": {},
+            "edit_distance": {},
+            "token_f1": {},
+            "assignment": {"min_similarity": 0.3, "top_k": 20},
+            "minhash": {"num_perm": 64, "bands": 32, "k": 3, "seed": 1},
+        }
         return mapping[method]
 
 
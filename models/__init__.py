@@ -1,4 +1,13 @@
 from models.parser import PageData, PageSize, ParserData
+from models.pipeline import PipelineData
 from models.preproc import PageContent, PreProcData
-from models.score import Scores
-from models.transform import PageGenerate, TransformData
+from models.score import (
+    DocumentScores,
+    GateResult,
+    MatchStats,
+    PageBreakdown,
+    Regression,
+    ScoreEstimate,
+    Scores,
+)
+from models.transform import GenerationStats, PageGenerate, TransformData
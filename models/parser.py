@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -13,7 +13,10 @@ class PageSize(BaseModel):
 class PageData(BaseModel):
     size: PageSize
     data: List[str]
+    fragments: Optional[List[str]] = None
+    normalized_fragments: Optional[Dict[str, List[str]]] = None
 
 
 class ParserData(BaseModel):
     pages: Dict[int, PageData]
+    source: Optional[str] = None
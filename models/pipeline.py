@@ -0,0 +1,15 @@
+from typing import Dict, Optional, Union
+
+from pydantic import BaseModel
+
+from models.parser import ParserData
+from models.preproc import PreProcData
+from models.score import Scores
+from models.transform import TransformData
+
+
+class PipelineData(BaseModel):
+    gt_data: ParserData
+    preproc_data: PreProcData
+    data: TransformData
+    scores: Optional[Union[Scores, Dict[str, Scores]]] = None
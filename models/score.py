@@ -1,7 +1,58 @@
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 
 from pydantic import BaseModel
 
 
+class MatchStats(BaseModel):
+    fragments: int = 0
+    exact: int = 0
+    fuzzy: int = 0
+    score_sum: float = 0.0
+    time: float = 0.0
+
+
+class PageBreakdown(BaseModel):
+    sections: Dict[str, MatchStats] = {}
+    keys: Dict[str, MatchStats] = {}
+    exact: int = 0
+    fuzzy: int = 0
+    flatten_time: float = 0.0
+    match_time: float = 0.0
+
+
 class Scores(BaseModel):
     pages: Dict[Union[int, str], float]
+    breakdown: Optional[Dict[Union[int, str], PageBreakdown]] = None
+
+
+class DocumentScores(BaseModel):
+    document: str
+    scores: Dict[str, Scores] = {}
+    error: Optional[str] = None
+
+
+class Regression(BaseModel):
+    document: str
+    metric: str
+    page: Union[int, str]
+    baseline: float
+    current: Optional[float] = None
+
+
+class GateResult(BaseModel):
+    passed: bool
+    threshold: float
+    lower: float
+    upper: float
+    scored: int
+    total: int
+
+
+class ScoreEstimate(BaseModel):
+    pages: Dict[Union[int, str], float]
+    mean: float
+    lower: float
+    upper: float
+    confidence: float
+    sampled: int
+    total: int
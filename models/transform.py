@@ -1,11 +1,27 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from pydantic import BaseModel
 
 
+class GenerationStats(BaseModel):
+    # Durations in seconds; every field is a sum over `requests`.
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prompt_eval_duration: float = 0.0
+    eval_duration: float = 0.0
+    load_duration: float = 0.0
+    total_duration: float = 0.0
+    # Only measured on streamed requests, counted in `streamed_requests`; None if there were none.
+    streamed_requests: int = 0
+    time_to_first_token: Optional[float] = None
+
+
 class PageGenerate(BaseModel):
     data: Dict[int, Dict]
+    stats: Optional[GenerationStats] = None
 
 
 class TransformData(BaseModel):
     pages: Dict[int, PageGenerate]
+    stats: Optional[GenerationStats] = None
@@ -12,6 +12,7 @@ MODULE_LIST = [
     "GenAIServices",
     "metrics",
     "models",
+    "pipeline",
     "preprocessor",
     "readers",
     "utils",
@@ -0,0 +1,210 @@
+import threading
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import Any, Callable, List, Optional, Union
+
+from converter import Transform
+from converter.stats import merge_stats
+from evaluator import Validate
+from models import ParserData, PipelineData, PreProcData, TransformData
+from preprocessor.core import BasePreprocessor
+from readers.core import BaseReader
+
+# Marks the end of a stage's output.
+_END = object()
+# How often blocked stages check whether the pipeline was stopped, in seconds.
+_POLL_INTERVAL = 0.1
+
+
+class Pipeline:
+    """
+    Runs reader → preprocessor → converter → evaluator with the stages overlapped.
+
+    Each stage runs in its own thread and hands pages to the next one through a bounded queue, so page 1 can
+    be generated while later pages are still preprocessed and earlier ones are already scored. A full queue
+    blocks the stage feeding it, which bounds the number of pages in flight to about `queue_size` per stage.
+    Pages keep their order, and the outputs are the same as running the stages one after the other.
+    """
+
+    def __init__(
+        self,
+        reader: BaseReader,
+        preprocessor: BasePreprocessor,
+        converter: Transform,
+        evaluator: Optional[Validate] = None,
+        queue_size: int = 2,
+        reader_kwargs: Optional[dict] = None,
+    ):
+        """
+        Args:
+            reader (BaseReader): Parses the input file, e.g. `PDFParser`.
+            preprocessor (BasePreprocessor): Splits each page into sections, must have `process_page`.
+            converter (Transform): Generates the JSON of each page.
+            evaluator (Optional[Validate]): Scores each page against the ground truth; skipped if None.
+            queue_size (int): Capacity of the queue between two stages. Default: 2.
+            reader_kwargs (Optional[dict]): Keyword arguments of `reader.process`, e.g. `with_fragments`.
+
+        Raises:
+            ValueError:
+                queue_size must be a positive integer.
+        """
+        if not isinstance(queue_size, int) or queue_size <= 0:
+            raise ValueError("queue_size must be a positive integer.")
+        self.reader = reader
+        self.preprocessor = preprocessor
+        self.converter = converter
+        self.evaluator = evaluator
+        self.queue_size = queue_size
+        self.reader_kwargs = reader_kwargs or {}
+
+    @staticmethod
+    def _put(queue: Queue, item: Any, stop: threading.Event) -> None:
+        """
+        Puts an item, giving up when the pipeline is stopped so a failed consumer cannot block the producer.
+        """
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=_POLL_INTERVAL)
+                return
+            except Full:
+                continue
+
+    @staticmethod
+    def _get(queue: Queue, stop: threading.Event) -> Any:
+        """
+        Gets an item, or `_END` when the pipeline is stopped.
+        """
+        while not stop.is_set():
+            try:
+                return queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                continue
+        return _END
+
+    def _stage(
+        self,
+        func: Callable[[tuple], tuple],
+        inbox: Queue,
+        outbox: Queue,
+        stop: threading.Event,
+        errors: List[BaseException],
+    ) -> None:
+        """
+        Applies `func` to every item of `inbox` and forwards the results, then forwards the end marker.
+
+        An exception stops the whole pipeline and is recorded in `errors`.
+        """
+        try:
+            while (item := self._get(inbox, stop)) is not _END:
+                self._put(outbox, func(item), stop)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            self._put(outbox, _END, stop)
+
+    def _read(
+        self,
+        path: Union[Path, str],
+        gt_data: ParserData,
+        outbox: Queue,
+        stop: threading.Event,
+        errors: List[BaseException],
+    ) -> None:
+        """
+        Parses the input file and feeds its pages to the first stage, collecting them into `gt_data`.
+        """
+        try:
+            parsed = self.reader.process(path, **self.reader_kwargs)
+            gt_data.source = parsed.source
+            for page_num, page in parsed.pages.items():
+                if stop.is_set():
+                    break
+                gt_data.pages[page_num] = page
+                self._put(outbox, (page_num, page), stop)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            self._put(outbox, _END, stop)
+
+    def process(self, path: Union[Path, str], **kwargs) -> PipelineData:
+        """
+        Runs the pipeline on one document.
+
+        Args:
+            path (Union[Path, str]): The input file of the reader.
+            kwargs (dict): Keyword arguments of `Transform.process_page`, e.g. `template` or `max_retries`.
+
+        Returns:
+            PipelineData: The output of every stage; `scores` is None without an evaluator.
+
+        Raises:
+            Exception:
+                An error occurred while running the pipeline.
+        """
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        gt_data = ParserData(pages={})
+
+        def preprocess(item):
+            page_num, page = item
+            return item + (self.preprocessor.process_page(page, page_num),)
+
+        def convert(item):
+            return item + (
+                self.converter.process_page(item[2], page_num=item[0], **kwargs),
+            )
+
+        def evaluate(item):
+            page_num, page, _, generated = item
+            return item + (self.evaluator.score_page(page, generated.data, page_num),)
+
+        stages = [preprocess, convert] + ([evaluate] if self.evaluator else [])
+        queues = [Queue(maxsize=self.queue_size) for _ in range(len(stages) + 1)]
+        threads = [
+            threading.Thread(
+                target=self._read,
+                args=(path, gt_data, queues[0], stop, errors),
+                daemon=True,
+            )
+        ]
+        for func, inbox, outbox in zip(stages, queues, queues[1:]):
+            threads.append(
+                threading.Thread(
+                    target=self._stage,
+                    args=(func, inbox, outbox, stop, errors),
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+
+        preproc_data = PreProcData(pages={})
+        data = TransformData(pages={})
+        page_scores = []
+        try:
+            while (item := self._get(queues[-1], stop)) is not _END:
+                page_num, _, content, generated = item[:4]
+                preproc_data.pages[page_num] = content
+                data.pages[page_num] = generated
+                if self.evaluator:
+                    page_scores.append((page_num, item[4]))
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+        data.stats = merge_stats(page.stats for page in data.pages.values())
+        if errors:
+            raise Exception(
+                f"An error occurred while running the pipeline: {errors[0]}"
+            ) from errors[0]
+        return PipelineData(
+            gt_data=gt_data,
+            preproc_data=preproc_data,
+            data=data,
+            scores=self.evaluator.aggregate(page_scores) if self.evaluator else None,
+        )
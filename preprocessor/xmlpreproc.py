@@ -1,8 +1,9 @@
 import xml.etree.ElementTree as ET
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-from models import PageContent, PageSize, ParserData, PreProcData
+from models import PageContent, PageData, PageSize, ParserData, PreProcData
 from preprocessor.core import BasePreprocessor
+from utils import tracer
 
 
 class XMLPreProcessor(BasePreprocessor):
@@ -162,6 +163,35 @@ class XMLPreProcessor(BasePreprocessor):
                 f"An error occurred while split texts by center segment: {e}"
             ) from e
 
+    def process_page(
+        self, page: PageData, page_num: Optional[int] = None
+    ) -> PageContent:
+        """
+        Sorts, deduplicates and splits the text elements of one page into two segments.
+
+        Args:
+            page (PageData): One page of parsed XML.
+            page_num (Optional[int]): The page number, only used to label the tracing span.
+
+        Returns:
+            PageContent: The upper (1) and lower (2) segments of the page.
+        """
+        with tracer.span(
+            "preprocessor", "page", page=page_num, elements_in=len(page.data)
+        ) as span:
+            split_data = PageContent(data={})
+            sorted_elements = self.sort_text_elements(page.data)
+            unique_elements = self.deduplicate_text_elements_from_strings(
+                sorted_elements
+            )
+            upper_data, lower_data = self.split_texts_into_segments(
+                page.size, unique_elements
+            )
+            split_data.data[1] = upper_data
+            split_data.data[2] = lower_data
+            span.set(elements_out=len(upper_data) + len(lower_data))
+        return split_data
+
     # TODO : In future work, we plan to support options for users to: (1) deduplicate text elements, and (2) split text by center into two segments per page.
     # TODO : need a reader to the output data.
     def process(self, data: ParserData) -> PreProcData:
@@ -179,17 +209,7 @@ class XMLPreProcessor(BasePreprocessor):
         pages_data = PreProcData(pages={})
         try:
             for page_num, page in data.pages.items():
-                split_data = PageContent(data={})
-                sorted_elements = self.sort_text_elements(page.data)
-                unique_elements = self.deduplicate_text_elements_from_strings(
-                    sorted_elements
-                )
-                upper_data, lower_data = self.split_texts_into_segments(
-                    page.size, unique_elements
-                )
-                split_data.data[1] = upper_data
-                split_data.data[2] = lower_data
-                pages_data.pages[page_num] = split_data
+                pages_data.pages[page_num] = self.process_page(page, page_num)
             return pages_data
         except Exception as e:
             raise Exception(f"An error occurred while processing the file: {e}")
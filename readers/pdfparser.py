@@ -5,7 +5,7 @@ from typing import Optional, Union
 from models import ParserData
 from readers.core import BaseReader
 from readers.xmlparser import XMLParser
-from utils import commandline_executor
+from utils import commandline_executor, tracer
 
 
 class PDFParser(BaseReader):
@@ -14,7 +14,11 @@ class PDFParser(BaseReader):
     """
 
     def process(
-        self, path: Union[Path, str], save_path: Optional[Union[Path, str]] = None
+        self,
+        path: Union[Path, str],
+        save_path: Optional[Union[Path, str]] = None,
+        with_fragments: bool = False,
+        sidecar: bool = False,
     ) -> ParserData:
         """
         Read data from the given PDF file and convert it to XML using pdftohtml.
@@ -22,6 +26,8 @@ class PDFParser(BaseReader):
         Args:
             path (Union[Path, str]): The path to the PDF file.
             save_path (Optional[Union[Path, str]]): Optional path to save the XML file.
+            with_fragments (bool): If True, also store the sorted text fragments of each page. See `XMLParser.process`.
+            sidecar (bool): If True, write a sidecar index next to the XML file. See `XMLParser.process`.
 
         Returns:
             ParserData: A dict contain 'page size' and 'page data' for one page.
@@ -62,9 +68,15 @@ class PDFParser(BaseReader):
             self.save_path = save_path
             command = f"pdftohtml -xml {path} {save_path}"
 
-            commandline_executor.run(command)
+            with tracer.span(
+                "reader", "pdftohtml", bytes_in=path.stat().st_size
+            ) as span:
+                commandline_executor.run(command)
+                span.set(bytes_out=Path(save_path).stat().st_size)
             xml_parser = XMLParser()
-            return xml_parser.process(save_path)
+            return xml_parser.process(
+                save_path, with_fragments=with_fragments, sidecar=sidecar
+            )
 
         except Exception as e:
             raise Exception(f"An error occurred while processing the file: {e}") from e
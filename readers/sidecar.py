@@ -0,0 +1,319 @@
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from models import PageData, PageSize
+from utils import TextNormalizer
+
+MAGIC = b"AIXGTIDX"
+VERSION = 2
+SUFFIX = ".gtidx"
+# magic, version, sha256 of the XML, flags, length of the normalizer signature, number of pages
+HEADER = struct.Struct("<8sI32sIII")
+# page number, offset of the page block, size of the page block
+TOC_ENTRY = struct.Struct("<IQQ")
+# top, left, height and width of a page
+PAGE_SIZE = struct.Struct("<4d")
+# Set in the flags when the pages were read with `only_text`, i.e. only their `<text>` elements were kept.
+ONLY_TEXT = 1
+
+
+def sidecar_path(xml_path: Union[Path, str]) -> Path:
+    """
+    Gets the path of the sidecar index of a pdftohtml XML file: `<name>.xml.gtidx` next to it.
+
+    Args:
+        xml_path (Union[Path, str]): The XML file.
+
+    Returns:
+        Path: The sidecar path.
+    """
+    xml_path = Path(xml_path)
+    return xml_path.with_name(xml_path.name + SUFFIX)
+
+
+def file_sha256(path: Union[Path, str]) -> bytes:
+    """
+    Hashes the content of a file.
+
+    Args:
+        path (Union[Path, str]): The file.
+
+    Returns:
+        bytes: The SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _pack_strings(strings: List[str]) -> bytes:
+    """
+    Packs strings as a count, `count + 1` end offsets and the concatenated UTF-8 bytes.
+
+    Args:
+        strings (List[str]): The strings to pack.
+
+    Returns:
+        bytes: The packed table.
+    """
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return struct.pack(f"<I{len(offsets)}I", len(strings), *offsets) + b"".join(encoded)
+
+
+def _table_size(buffer: mmap.mmap, offset: int) -> int:
+    """
+    Gets the size of a table written by `_pack_strings`.
+
+    Args:
+        buffer (mmap.mmap): The mapped sidecar.
+        offset (int): Start of the table.
+
+    Returns:
+        int: The number of bytes of the table.
+    """
+    (count,) = struct.unpack_from("<I", buffer, offset)
+    (size,) = struct.unpack_from("<I", buffer, offset + 4 * (count + 1))
+    return 4 * (count + 2) + size
+
+
+def _unpack_strings(buffer: mmap.mmap, offset: int) -> List[str]:
+    """
+    Reads a table written by `_pack_strings`.
+
+    Args:
+        buffer (mmap.mmap): The mapped sidecar.
+        offset (int): Start of the table.
+
+    Returns:
+        List[str]: The strings.
+    """
+    (count,) = struct.unpack_from("<I", buffer, offset)
+    offsets = struct.unpack_from(f"<{count + 1}I", buffer, offset + 4)
+    start = offset + 4 * (count + 2)
+    blob = buffer[start : start + offsets[-1]]
+    return [blob[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+
+class SidecarIndex:
+    """
+    Precomputed ground truth of a pdftohtml XML file, stored in a compact binary file next to it.
+
+    For every page the sidecar holds its size, its serialized elements, the sorted text fragments and their
+    normalized forms (one per fragment, for one normalizer), so a reader can rebuild the parsed pages without
+    parsing the XML. It is memory-mapped and pages are decoded on demand; opening it costs a hash of the XML,
+    which is used to reject a sidecar written for another version of the file.
+
+    Layout (little-endian): header (`MAGIC`, `VERSION`, XML SHA-256, flags, normalizer signature length,
+    page count), the normalizer signature, a table of contents of (page number, offset, size), then for each
+    page its size followed by the element, fragment and normalized tables. The `ONLY_TEXT` flag records
+    which elements of the pages were kept.
+    """
+
+    def __init__(
+        self, buffer: mmap.mmap, normalizer: str, only_text: bool, toc: Dict[int, int]
+    ):
+        """
+        Args:
+            buffer (mmap.mmap): The mapped sidecar.
+            normalizer (str): Signature of the normalizer of the normalized forms.
+            only_text (bool): Whether the pages were read with `only_text`.
+            toc (Dict[int, int]): Offset of the block of each page, in page order.
+        """
+        self._buffer = buffer
+        self.normalizer = normalizer
+        self.only_text = only_text
+        self._toc = toc
+
+    def __contains__(self, page_num: int) -> bool:
+        return page_num in self._toc
+
+    def __iter__(self):
+        return iter(self._toc)
+
+    @staticmethod
+    def write(
+        xml_path: Union[Path, str],
+        pages: Dict[int, PageData],
+        only_text: bool = True,
+        normalizer: Optional[TextNormalizer] = None,
+    ) -> Path:
+        """
+        Writes the sidecar of an XML file.
+
+        The file is written to a temporary name and renamed, so readers never see a partial sidecar.
+
+        Args:
+            xml_path (Union[Path, str]): The XML file the pages were read from.
+            pages (Dict[int, PageData]): The parsed pages, with their sorted fragments.
+            only_text (bool): Whether the pages were read with `only_text`. Default: True.
+            normalizer (Optional[TextNormalizer]): Normalizer of the stored normalized forms.
+                Default: `TextNormalizer()`.
+
+        Returns:
+            Path: The sidecar path.
+        """
+        normalizer = normalizer or TextNormalizer()
+        signature = normalizer.signature.encode("utf-8")
+
+        blocks = []
+        for page_num, page in pages.items():
+            size = page.size
+            normalized = [normalizer.normalize(s) for s in page.fragments]
+            blocks.append(
+                (
+                    page_num,
+                    PAGE_SIZE.pack(size.top, size.left, size.height, size.width)
+                    + _pack_strings(page.data)
+                    + _pack_strings(page.fragments)
+                    + _pack_strings(normalized),
+                )
+            )
+
+        offset = HEADER.size + len(signature) + TOC_ENTRY.size * len(blocks)
+        toc = []
+        for page_num, block in blocks:
+            toc.append(TOC_ENTRY.pack(page_num, offset, len(block)))
+            offset += len(block)
+
+        path = sidecar_path(xml_path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    file_sha256(xml_path),
+                    ONLY_TEXT if only_text else 0,
+                    len(signature),
+                    len(blocks),
+                )
+            )
+            f.write(signature)
+            f.writelines(toc)
+            f.writelines(block for _, block in blocks)
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def open(
+        xml_path: Union[Path, str], only_text: Optional[bool] = None
+    ) -> Optional["SidecarIndex"]:
+        """
+        Maps the sidecar of an XML file.
+
+        Args:
+            xml_path (Union[Path, str]): The XML file.
+            only_text (Optional[bool]): If set, only accept a sidecar whose pages were read with the same
+                `only_text`. Default: None (any).
+
+        Returns:
+            Optional[SidecarIndex]: The index, or None if there is no sidecar, it has another format version,
+            was written for different XML content or with another `only_text`.
+        """
+        path = sidecar_path(xml_path)
+        if not path.exists() or not Path(xml_path).exists():
+            return None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, sha256, flags, signature_size, n_pages = HEADER.unpack_from(
+            buffer
+        )
+        stored_only_text = bool(flags & ONLY_TEXT)
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or (only_text is not None and stored_only_text != only_text)
+            or sha256 != file_sha256(xml_path)
+        ):
+            buffer.close()
+            return None
+
+        offset = HEADER.size
+        signature = buffer[offset : offset + signature_size].decode("utf-8")
+        offset += signature_size
+        toc = {}
+        for _ in range(n_pages):
+            page_num, page_offset, _ = TOC_ENTRY.unpack_from(buffer, offset)
+            toc[page_num] = page_offset
+            offset += TOC_ENTRY.size
+        return SidecarIndex(buffer, signature, stored_only_text, toc)
+
+    def size(self, page_num: int) -> PageSize:
+        """
+        Args:
+            page_num (int): The page number.
+
+        Returns:
+            PageSize: The size of the page.
+        """
+        top, left, height, width = PAGE_SIZE.unpack_from(
+            self._buffer, self._toc[page_num]
+        )
+        return PageSize(top=top, left=left, height=height, width=width)
+
+    def data(self, page_num: int) -> List[str]:
+        """
+        Args:
+            page_num (int): The page number.
+
+        Returns:
+            List[str]: The serialized elements of the page.
+        """
+        return _unpack_strings(self._buffer, self._toc[page_num] + PAGE_SIZE.size)
+
+    def fragments(self, page_num: int) -> List[str]:
+        """
+        Args:
+            page_num (int): The page number.
+
+        Returns:
+            List[str]: The fragments of the page, sorted by length descending.
+        """
+        offset = self._toc[page_num] + PAGE_SIZE.size
+        return _unpack_strings(self._buffer, offset + _table_size(self._buffer, offset))
+
+    def normalized(self, page_num: int) -> List[str]:
+        """
+        Args:
+            page_num (int): The page number.
+
+        Returns:
+            List[str]: The normalized form of each fragment of the page, in the order of `fragments`.
+        """
+        offset = self._toc[page_num] + PAGE_SIZE.size
+        offset += _table_size(self._buffer, offset)
+        offset += _table_size(self._buffer, offset)
+        return _unpack_strings(self._buffer, offset)
+
+    def page(self, page_num: int) -> PageData:
+        """
+        Args:
+            page_num (int): The page number.
+
+        Returns:
+            PageData: The page as parsed, with its fragments and normalized forms.
+        """
+        return PageData(
+            size=self.size(page_num),
+            data=self.data(page_num),
+            fragments=self.fragments(page_num),
+            normalized_fragments={self.normalizer: self.normalized(page_num)},
+        )
+
+    def close(self) -> None:
+        """
+        Unmaps the sidecar.
+        """
+        self._buffer.close()
@@ -1,9 +1,11 @@
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Union
+from typing import List, Optional, Union
 
 from models import PageData, PageSize, ParserData
 from readers.core import BaseReader
+from readers.sidecar import SidecarIndex
+from utils import TextNormalizer, tracer
 
 
 class XMLParser(BaseReader):
@@ -11,7 +13,36 @@ class XMLParser(BaseReader):
     XMLParser class for parsing XML files.
     """
 
-    def process(self, path: Union[Path, str], only_text: bool = True) -> ParserData:
+    def flatten_fragments(self, elements: List[ET.Element]) -> List[str]:
+        """
+        Collects the stripped text fragments of all `<text>` tags in the given elements, sorted by length descending.
+
+        The result is identical to what `Validate` extracts from the serialized elements, so it can be used
+        as pre-flattened ground truth.
+
+        Args:
+            elements (List[ET.Element]): The elements kept for one page.
+
+        Returns:
+            List[str]: Sorted flat list of all text content found within `<text>` tags.
+        """
+        fragments = [
+            frag.strip()
+            for elem in elements
+            for text_elem in elem.iter("text")
+            for frag in text_elem.itertext()
+            if frag.strip()
+        ]
+        return sorted(fragments, key=len, reverse=True)
+
+    def process(
+        self,
+        path: Union[Path, str],
+        only_text: bool = True,
+        with_fragments: bool = False,
+        sidecar: bool = False,
+        normalizer: Optional[TextNormalizer] = None,
+    ) -> ParserData:
         """
         Extracts and flattens all text content from `<text>` tags under each `<page>` in the XML file,
         including any nested tags like `<b>`, `<i>`, etc.
@@ -19,6 +50,15 @@ class XMLParser(BaseReader):
         Args:
             path (Union[Path, str]): Path to the XML file.
             only_text (bool): If True, only extract text content. Defaults to True.
+            with_fragments (bool): If True, also store the sorted text fragments of each page in
+                `PageData.fragments`, so `Validate` does not have to parse the page again. Defaults to False.
+            sidecar (bool): If True, read the pages from the sidecar index next to the XML (see
+                `SidecarIndex`) instead of parsing it, writing the sidecar first if it is missing, stale or was
+                written with another `only_text`. Implies `with_fragments`. Reading a valid sidecar costs a
+                hash of the XML instead of parsing, serializing, flattening and normalizing its pages.
+                Defaults to False.
+            normalizer (Optional[TextNormalizer]): Normalizer of the normalized forms written to a new sidecar.
+                Defaults to None (`TextNormalizer()`).
 
         Returns:
             ParserData: A dict contain 'page size' and 'page data' for one page.
@@ -42,34 +82,66 @@ class XMLParser(BaseReader):
             raise ValueError(f"Expected an XML file, but got {path}")
 
         try:
-            tree = ET.parse(path)
-            root = tree.getroot()
-
-            if root.tag != "pdf2xml":
-                raise ValueError(f"Expected root tag <pdf2xml>, but got <{root.tag}>")
-
-            pages_data = ParserData(pages={})
-
-            for page in root.findall("page"):
-                page_num = int(page.attrib["number"])
-                page_size = PageSize(
-                    top=float(page.attrib.get("top", 0)),
-                    left=float(page.attrib.get("left", 0)),
-                    height=float(page.attrib.get("height", 0)),
-                    width=float(page.attrib.get("width", 0)),
+            with tracer.span(
+                "reader", "parse_xml", bytes_in=path.stat().st_size
+            ) as span:
+                index = (
+                    SidecarIndex.open(path, only_text=only_text) if sidecar else None
                 )
-
-                page_texts = []
-                if only_text:
-                    for elem in page.findall("text"):
-                        xml_str = ET.tostring(elem, encoding="unicode")
-                        page_texts.append(xml_str)
-                else:
-                    for elem in page.iter():
-                        xml_str = ET.tostring(elem, encoding="unicode")
-                        page_texts.append(xml_str)
-
-                pages_data.pages[page_num] = PageData(size=page_size, data=page_texts)
+                if index is not None:
+                    try:
+                        pages_data = ParserData(
+                            pages={
+                                page_num: index.page(page_num) for page_num in index
+                            },
+                            source=str(path.resolve()),
+                        )
+                    finally:
+                        index.close()
+                    span.set(pages=len(pages_data.pages), sidecar=True)
+                    return pages_data
+
+                tree = ET.parse(path)
+                root = tree.getroot()
+
+                if root.tag != "pdf2xml":
+                    raise ValueError(
+                        f"Expected root tag <pdf2xml>, but got <{root.tag}>"
+                    )
+
+                pages_data = ParserData(pages={}, source=str(path.resolve()))
+
+                for page in root.findall("page"):
+                    page_num = int(page.attrib["number"])
+                    page_size = PageSize(
+                        top=float(page.attrib.get("top", 0)),
+                        left=float(page.attrib.get("left", 0)),
+                        height=float(page.attrib.get("height", 0)),
+                        width=float(page.attrib.get("width", 0)),
+                    )
+
+                    elements = page.findall("text") if only_text else list(page.iter())
+                    page_texts = [
+                        ET.tostring(elem, encoding="unicode") for elem in elements
+                    ]
+                    fragments = None
+                    if with_fragments or sidecar:
+                        fragments = self.flatten_fragments(elements)
+
+                    pages_data.pages[page_num] = PageData(
+                        size=page_size,
+                        data=page_texts,
+                        fragments=fragments,
+                    )
+
+                if sidecar:
+                    SidecarIndex.write(
+                        path,
+                        pages_data.pages,
+                        only_text=only_text,
+                        normalizer=normalizer,
+                    )
+                span.set(pages=len(pages_data.pages))
             return pages_data
 
         except Exception as e:
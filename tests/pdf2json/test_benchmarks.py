@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from benchmarks import compare, generate_document, run_benchmarks
+from benchmarks.runner import percentile
+from readers import XMLParser
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generate_document(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = generate_document(os.path.join(tmp, "doc.xml"), 3, 20)
+            content = path.read_text(encoding="utf-8")
+            self.assertEqual(
+                generate_document(os.path.join(tmp, "again.xml"), 3, 20).read_text(
+                    encoding="utf-8"
+                ),
+                content,
+            )
+            gt_data = XMLParser().process(path)
+        self.assertEqual(list(gt_data.pages), [1, 2, 3])
+        self.assertTrue(all(len(page.data) == 20 for page in gt_data.pages.values()))
+
+    def test_percentile(self):
+        values = [float(v) for v in range(1, 21)]
+        self.assertEqual(percentile(values, 0.5), 10.0)
+        self.assertEqual(percentile(values, 0.95), 19.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_benchmarks([(2, 10)], tmp, metric="token_f1", memory=False)
+        stages = result.sizes[0].stages
+        self.assertEqual(
+            list(stages), ["reader", "preprocessor", "converter", "evaluator"]
+        )
+        self.assertEqual(stages["reader"].calls, 1)
+        self.assertEqual(stages["converter"].calls, 2)
+        self.assertTrue(all(stage.p95 >= stage.p50 > 0 for stage in stages.values()))
+        self.assertIsNone(stages["reader"].peak_memory)
+
+        self.assertEqual(compare(result, result), [])
+        slower = result.model_copy(deep=True)
+        slower.sizes[0].stages["evaluator"].p95 *= 2
+        changes = compare(slower, result)
+        self.assertEqual(
+            [(c.size, c.stage, c.field) for c in changes],
+            [("2x10", "evaluator", "p95")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
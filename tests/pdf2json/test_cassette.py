@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from benchmarks.standin import OllamaStandIn
+from converter import Transform
+from GenAIServices import CassetteHandler, CassetteMissError, OllamaHandler
+from preprocessor import XMLPreProcessor
+from readers import XMLParser
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        gt_data = XMLParser().process(
+            "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+        )
+        self.preproc_data = XMLPreProcessor().process(gt_data)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "sample.cassette.jsonl.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_and_replay(self):
+        with OllamaStandIn(truncated_rate=0.3, seed=1) as standin:
+            gen_ai = CassetteHandler(
+                self.path, mode="record", inner=OllamaHandler(url=standin.url)
+            )
+            recorded = Transform(model_name="standin", gen_ai=gen_ai).process(
+                self.preproc_data, max_retries=10
+            )
+            requests = len(standin.requests)
+        self.assertGreater(standin.counters["truncated"], 0)
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), requests)
+
+        # No server: every answer, retries included, comes from the cassette.
+        replayed = Transform(
+            model_name="standin", gen_ai=CassetteHandler(self.path)
+        ).process(self.preproc_data, max_retries=10)
+        self.assertEqual(replayed, recorded)
+
+    def test_replay_miss(self):
+        with self.assertRaises(FileNotFoundError):
+            CassetteHandler(self.path)
+        with OllamaStandIn() as standin:
+            gen_ai = CassetteHandler(
+                self.path, mode="record", inner=OllamaHandler(url=standin.url)
+            )
+            list(gen_ai.chat({"model": "standin", "messages": [{"content": "a"}]}))
+
+        gen_ai = CassetteHandler(self.path)
+        self.assertEqual(
+            list(
+                gen_ai.chat(
+                    {"model": "standin", "messages": [{"content": "a"}], "stream": True}
+                )
+            )[0],
+            '{"content": {}}',
+        )
+        with self.assertRaises(CassetteMissError):
+            list(gen_ai.chat({"model": "standin", "messages": [{"content": "b"}]}))
+        with self.assertRaises(ValueError):
+            CassetteHandler(self.path, mode="record")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,15 @@
+import json
 import os
 import sys
+import time
 import unittest
 from typing import Generator
 from unittest.mock import patch
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
-from converter import Transform
-from models import PageContent, PreProcData, TransformData
+from converter import Transform, merge_stats, to_prometheus
+from GenAIServices import OllamaHandler
+from models import GenerationStats, PageContent, PreProcData, TransformData
 
 
 def mock_chat(*args, **kwargs) -> Generator[str, None, None]:
@@ -58,6 +61,22 @@ def mock_chat(*args, **kwargs) -> Generator[str, None, None]:
 ```"""
 
 
+def mock_chat_with_stats(*args, **kwargs) -> Generator[object, None, None]:
+    yield '{"Text": "IntA_P2_D+"}'
+    yield OllamaHandler._stats(
+        {
+            "done": True,
+            "prompt_eval_count": 100,
+            "eval_count": 20,
+            "prompt_eval_duration": 500_000_000,
+            "eval_duration": 2_000_000_000,
+            "load_duration": 100_000_000,
+            "total_duration": 2_700_000_000,
+        },
+        0.25,
+    )
+
+
 class TestConverter(unittest.TestCase):
     def setUp(self):
         self.preprocessed_data = PreProcData(
@@ -252,9 +271,144 @@ class TestConverter(unittest.TestCase):
         self.assertIsInstance(gen_data, TransformData)
         self.assertGreater(len(gen_data.pages), 0, "Data should not be empty")
 
+    @patch("GenAIServices.OllamaHandler.chat", side_effect=mock_chat_with_stats)
+    def test_generation_stats(self, mock_post):
+        gen_data = self.converter.process(data=self.preprocessed_data)
+
+        sections = sum(len(page.data) for page in gen_data.pages.values())
+        self.assertEqual(gen_data.pages[1].stats.requests, 2)
+        self.assertEqual(gen_data.pages[1].stats.completion_tokens, 40)
+        self.assertEqual(
+            gen_data.stats,
+            GenerationStats(
+                requests=sections,
+                prompt_tokens=100 * sections,
+                completion_tokens=20 * sections,
+                prompt_eval_duration=0.5 * sections,
+                eval_duration=2.0 * sections,
+                load_duration=0.1 * sections,
+                total_duration=2.7 * sections,
+                streamed_requests=sections,
+                time_to_first_token=0.25 * sections,
+            ),
+        )
+
+        text = to_prometheus(gen_data, labels={"document": 'EMPU "3401"'})
+        self.assertIn(
+            f'aixtract_generation_requests_total{{document="EMPU \\"3401\\""}} {sections}',
+            text,
+        )
+        self.assertIn("# TYPE aixtract_generation_tokens_per_second gauge", text)
+        self.assertIn(
+            'aixtract_generation_tokens_per_second{document="EMPU \\"3401\\""} 10.0',
+            text,
+        )
+        self.assertIn(
+            'aixtract_generation_time_to_first_token_seconds{document="EMPU \\"3401\\""} 0.25',
+            text,
+        )
+        per_page = to_prometheus(gen_data, per_page=True)
+        self.assertIn(
+            'aixtract_generation_completion_tokens_total{page="2"} 40', per_page
+        )
+
+    def test_unmeasured_first_token(self):
+        # Non-streamed requests have no time to first token and do not lower the mean.
+        stats = merge_stats(
+            [
+                GenerationStats(requests=1),
+                GenerationStats(
+                    requests=1, streamed_requests=1, time_to_first_token=0.5
+                ),
+                GenerationStats(requests=1),
+            ]
+        )
+        self.assertEqual(stats.requests, 3)
+        self.assertEqual(stats.time_to_first_token, 0.5)
+        text = to_prometheus(TransformData(pages={}, stats=stats))
+        self.assertIn("aixtract_generation_time_to_first_token_seconds 0.5", text)
+
+        stats = merge_stats([GenerationStats(requests=1), GenerationStats(requests=1)])
+        self.assertIsNone(stats.time_to_first_token)
+        text = to_prometheus(TransformData(pages={}, stats=stats))
+        self.assertIn("aixtract_generation_requests_total 2", text)
+        self.assertNotIn("time_to_first_token", text)
+
+    @patch("GenAIServices.OllamaHandler.chat", side_effect=mock_chat)
+    def test_no_generation_stats(self, mock_post):
+        gen_data = self.converter.process(data=self.preprocessed_data)
+        self.assertIsNone(gen_data.stats)
+        self.assertEqual(to_prometheus(gen_data), "")
+
     def tearDown(self):
         self.patcher.stop()
 
 
+def delayed_chat(
+    self, request_data: dict, cancel_event=None
+) -> Generator[str, None, None]:
+    # The prompt ends with the delay of the section, so later pages can finish first.
+    content = request_data["messages"][0]["content"]
+    delay = float(content.rsplit("delay=", 1)[1].split("'")[0])
+    time.sleep(delay)
+    yield json.dumps({"delay": delay})
+
+
+class TestIterProcess(unittest.TestCase):
+    def setUp(self):
+        self.delays = [0.2, 0.05, 0.1, 0.0, 0.15, 0.0]
+        self.data = PreProcData(
+            pages={
+                page_num: PageContent(data={1: [f"delay={delay}"]})
+                for page_num, delay in enumerate(self.delays, start=1)
+            }
+        )
+        self.patcher = patch(
+            "GenAIServices.OllamaHandler._connect",
+            return_value="http://127.0.0.1:6589/model_server/",
+        )
+        self.patcher.start()
+        self.converter = Transform(
+            model_name="llama3.2:1b", model_url="http://127.0.0.1:6589/model_server/"
+        )
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    @patch("GenAIServices.OllamaHandler.chat", delayed_chat)
+    def test_ordered(self):
+        expected = self.converter.process(self.data)
+        results = list(self.converter.iter_process(self.data, max_workers=3))
+        self.assertEqual([page_num for page_num, _ in results], list(range(1, 7)))
+        self.assertEqual(dict(results), expected.pages)
+
+    @patch("GenAIServices.OllamaHandler.chat", delayed_chat)
+    def test_unordered(self):
+        start = time.perf_counter()
+        stream = self.converter.iter_process(self.data, max_workers=3, ordered=False)
+        seq, page_num, page = next(stream)
+        first_result = time.perf_counter() - start
+        results = [(seq, page_num, page)] + list(stream)
+
+        self.assertEqual(page_num, 2)
+        self.assertLess(first_result, 0.15)
+        self.assertEqual([seq for seq, _, _ in results], list(range(6)))
+        self.assertEqual(
+            sorted(page_num for _, page_num, _ in results), [1, 2, 3, 4, 5, 6]
+        )
+        for _, page_num, page in results:
+            self.assertEqual(page.data[1], {"delay": self.delays[page_num - 1]})
+
+    @patch("GenAIServices.OllamaHandler.chat", delayed_chat)
+    def test_early_close(self):
+        stream = self.converter.iter_process(self.data, max_workers=2)
+        self.assertEqual(next(stream)[0], 1)
+        stream.close()
+        with self.assertRaises(ValueError):
+            next(self.converter.iter_process(self.data, max_workers=0))
+        with self.assertRaises(ValueError):
+            self.converter.process_page(self.data.pages[1], max_retries=0)
+
+
 if __name__ == "__main__":
     unittest.main()
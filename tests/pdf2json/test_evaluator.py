@@ -1,11 +1,22 @@
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
-from evaluator import Validate
+from evaluator import BatchValidate, Validate
 from metrics import SimilarityMetrics
-from models import PageData, PageGenerate, PageSize, ParserData, Scores, TransformData
+from models import (
+    DocumentScores,
+    PageData,
+    PageGenerate,
+    PageSize,
+    ParserData,
+    Scores,
+    TransformData,
+)
+from utils import TextNormalizer
 
 
 class TestMetrics(unittest.TestCase):
@@ -654,6 +665,233 @@ class TestMetrics(unittest.TestCase):
         self.assertIsInstance(score, Scores)
         self.assertEqual(len(score.pages), 4, "Data should not be empty")
 
+    def test_evaluator_parallel(self):
+        metric, setting = SimilarityMetrics.get("str_similarity")
+        eval = Validate(metrics=metric, setting=setting)
+
+        score = eval.process(gt_data=self.gt_data, data=self.converted_data)
+        parallel_score = eval.process(
+            gt_data=self.gt_data, data=self.converted_data, max_workers=2
+        )
+        self.assertEqual(list(parallel_score.pages), list(score.pages))
+        self.assertEqual(parallel_score, score)
+
+    def test_evaluator_reuses_fragments(self):
+        metric, setting = SimilarityMetrics.get("str_similarity")
+        eval = Validate(metrics=metric, setting=setting)
+
+        score = eval.process(gt_data=self.gt_data, data=self.converted_data)
+        for page in self.gt_data.pages.values():
+            self.assertIsNotNone(page.fragments)
+        self.assertEqual(
+            eval.process(gt_data=self.gt_data, data=self.converted_data), score
+        )
+
+    def test_evaluator_multi_metric(self):
+        names = ["str_similarity", "token_f1", "assignment"]
+        metrics = [SimilarityMetrics.get(name)[0] for name in names]
+        settings = {name: SimilarityMetrics.get(name)[1] for name in names}
+
+        eval = Validate(metrics=metrics, setting=settings)
+        scores = eval.process(gt_data=self.gt_data, data=self.converted_data)
+
+        self.assertEqual(list(scores), names)
+        for name in names:
+            self.assertIsInstance(scores[name], Scores)
+            single = Validate(
+                metrics=SimilarityMetrics.get(name)[0], setting=settings[name]
+            )
+            self.assertEqual(
+                scores[name],
+                single.process(gt_data=self.gt_data, data=self.converted_data),
+            )
+
+    def test_flatten_sections(self):
+        sections = {
+            1: {"header": {"model": "EMPU-3401"}, "Notes": "xHCI 1.0."},
+            2: {"header": {"title": "Performance Reference"}, "Notes": "port."},
+        }
+        eval = Validate(metrics=None)
+        self.assertEqual(
+            eval._flatten_sections(sections),
+            ["header", "model", "EMPU-3401", "title", "Performance Reference"]
+            + ["Notes", "port."],
+        )
+        self.assertEqual(sections[1]["header"], {"model": "EMPU-3401"})
+
+        eval = Validate(metrics=None, merge_sections=False)
+        self.assertEqual(
+            eval._flatten_sections(sections),
+            ["header", "model", "EMPU-3401", "Notes", "xHCI 1.0."]
+            + ["header", "title", "Performance Reference", "Notes", "port."],
+        )
+
+        # Deeper than the default recursion limit.
+        deep = value = {}
+        for _ in range(5000):
+            value["k"] = {}
+            value = value["k"]
+        self.assertEqual(len(eval._flatten_sections({1: deep})), 5000)
+
+    def test_normalizer(self):
+        normalizer = TextNormalizer()
+        self.assertEqual(
+            normalizer.normalize("  −Optional  Industrial\u00a0Temperature (-40 "),
+            "-Optional Industrial Temperature (-40",
+        )
+        self.assertEqual(normalizer.normalize("“5V”"), '"5V"')
+
+        eval = Validate(metrics=SimilarityMetrics.str_similarity.value)
+        xml_list = eval._read_and_flatten_xml(self.gt_data.pages[1].data)
+        normalized_eval = Validate(
+            metrics=SimilarityMetrics.str_similarity.value, normalizer=normalizer
+        )
+        normalized_xml_list = normalized_eval._read_and_flatten_xml(
+            self.gt_data.pages[1].data
+        )
+        self.assertIn("−Compliant with xHCI 1.0, USB 3.0 Rev 1.0.", xml_list)
+        self.assertIn("-Compliant with xHCI 1.0, USB 3.0 Rev 1.0.", normalized_xml_list)
+
+        score = normalized_eval.process(gt_data=self.gt_data, data=self.converted_data)
+        self.assertIsInstance(score, Scores)
+
+    def test_gate(self):
+        for name in ("str_similarity", "edit_distance", "token_f1"):
+            metric, setting = SimilarityMetrics.get(name)
+            eval = Validate(metrics=metric, setting=setting)
+            mean = eval.process(gt_data=self.gt_data, data=self.converted_data).pages[
+                "mean"
+            ]
+            for threshold in (0.1, mean - 0.02, mean, mean + 0.02, 0.99):
+                result = eval.gate(
+                    gt_data=self.gt_data, data=self.converted_data, threshold=threshold
+                )
+                self.assertEqual(result.passed, mean >= threshold, (name, threshold))
+                self.assertLessEqual(result.lower, result.upper)
+                self.assertLessEqual(result.scored, result.total)
+
+            # A clear outcome is decided before every fragment is scored.
+            result = eval.gate(
+                gt_data=self.gt_data, data=self.converted_data, threshold=0.1
+            )
+            if name != "token_f1":
+                self.assertLess(result.scored, result.total)
+
+        with self.assertRaises(ValueError):
+            Validate(metrics=[metric]).gate(self.gt_data, self.converted_data, 0.5)
+
+    def test_estimate(self):
+        metric, setting = SimilarityMetrics.get("str_similarity")
+        eval = Validate(metrics=metric, setting=setting)
+        scores = eval.process(gt_data=self.gt_data, data=self.converted_data)
+
+        # Pages not larger than the sample are scored exactly.
+        exact = eval.estimate(self.gt_data, self.converted_data, sample_size=1000)
+        self.assertEqual(exact.sampled, exact.total)
+        self.assertAlmostEqual(exact.mean, scores.pages["mean"])
+        self.assertEqual(exact.lower, exact.upper)
+
+        estimate = eval.estimate(self.gt_data, self.converted_data, sample_size=8)
+        self.assertLess(estimate.sampled, estimate.total)
+        self.assertLessEqual(estimate.lower, estimate.mean)
+        self.assertLessEqual(estimate.mean, estimate.upper)
+        self.assertEqual(list(estimate.pages), list(self.gt_data.pages))
+        # Sampled and fully scored pages report the same precision.
+        for page_score in estimate.pages.values():
+            self.assertEqual(page_score, round(page_score, 2))
+        self.assertEqual(
+            eval.estimate(self.gt_data, self.converted_data, sample_size=8), estimate
+        )
+
+        with self.assertRaises(ValueError):
+            Validate(metrics=SimilarityMetrics.token_f1.value).estimate(
+                self.gt_data, self.converted_data
+            )
+
+    def test_breakdown(self):
+        metric, setting = SimilarityMetrics.get("str_similarity")
+        score = Validate(metrics=metric, setting=setting).process(
+            gt_data=self.gt_data, data=self.converted_data
+        )
+
+        for merge_sections in (True, False):
+            eval = Validate(
+                metrics=metric,
+                setting=setting,
+                merge_sections=merge_sections,
+                breakdown=True,
+            )
+            detailed = eval.process(gt_data=self.gt_data, data=self.converted_data)
+            self.assertEqual(detailed.pages, score.pages)
+            self.assertEqual(list(detailed.breakdown), list(self.gt_data.pages))
+            for page_num, breakdown in detailed.breakdown.items():
+                n_fragments = len(self.gt_data.pages[page_num].fragments)
+                self.assertEqual(breakdown.exact + breakdown.fuzzy, n_fragments)
+                self.assertEqual(
+                    sum(s.fragments for s in breakdown.sections.values()), n_fragments
+                )
+                self.assertEqual(
+                    sum(s.fragments for s in breakdown.keys.values()), n_fragments
+                )
+                self.assertAlmostEqual(
+                    round(
+                        sum(s.score_sum for s in breakdown.keys.values()) / n_fragments,
+                        2,
+                    ),
+                    detailed.pages[page_num],
+                )
+
+        with self.assertRaises(ValueError):
+            Validate(metrics=SimilarityMetrics.token_f1.value, breakdown=True)
+
+    def test_batch_evaluator(self):
+        metric, setting = SimilarityMetrics.get("token_f1")
+        batch = BatchValidate(Validate(metrics=metric, setting=setting), max_workers=2)
+
+        with tempfile.TemporaryDirectory() as corpus:
+            xml_path = "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+            for name in ("a", "b"):
+                shutil.copy(xml_path, os.path.join(corpus, f"{name}.xml"))
+            with open(os.path.join(corpus, "a.json"), "w", encoding="utf-8") as f:
+                f.write(self.converted_data.model_dump_json())
+            with open(os.path.join(corpus, "b.json"), "w", encoding="utf-8") as f:
+                f.write("not json")
+
+            baseline_path = os.path.join(corpus, "baseline.jsonl")
+            results_path = os.path.join(corpus, "results.jsonl")
+            self.assertEqual(batch.process(corpus, baseline_path), 2)
+            with open(baseline_path, encoding="utf-8") as f:
+                documents = {
+                    doc.document: doc
+                    for doc in map(DocumentScores.model_validate_json, f)
+                }
+            self.assertIsNone(documents["a"].error)
+            self.assertIsNotNone(documents["b"].error)
+            self.assertIn("token_f1", documents["a"].scores)
+
+            self.assertEqual(batch.run(corpus, results_path, baseline_path), [])
+
+            # Lower the stored scores of the baseline: nothing regresses. Raise them: every page does.
+            for delta, expected in (
+                (-0.5, 0),
+                (0.5, len(documents["a"].scores["token_f1"].pages)),
+            ):
+                pages = documents["a"].scores["token_f1"].pages
+                shifted = documents["a"].model_copy(deep=True)
+                shifted.scores["token_f1"].pages = {
+                    page: score + delta for page, score in pages.items()
+                }
+                with open(baseline_path, "w", encoding="utf-8") as f:
+                    f.write(shifted.model_dump_json() + "\n")
+                regressions = batch.compare(results_path, baseline_path)
+                self.assertEqual(len(regressions), expected)
+
+            # A document missing from the new results is reported.
+            os.remove(os.path.join(corpus, "a.json"))
+            regressions = batch.run(corpus, results_path, baseline_path)
+            self.assertEqual([r.page for r in regressions], ["mean"])
+            self.assertIsNone(regressions[0].current)
+
 
 if __name__ == "__main__":
     unittest.main()
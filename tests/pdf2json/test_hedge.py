@@ -0,0 +1,255 @@
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from typing import Generator, List, Optional
+
+from jinja2 import Template
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from benchmarks.standin import OllamaStandIn
+from converter import Transform
+from converter.main import DEFAULT_PROMPT
+from GenAIServices import (
+    GenAICancelledError,
+    GenAIOperator,
+    GenAIServerError,
+    GenAITimeoutError,
+    HedgedHandler,
+    HedgePolicy,
+    OllamaHandler,
+)
+from GenAIServices.hedge import prompt_size
+from models import PageContent
+
+
+class DelayedService(GenAIOperator):
+    """
+    Answers after the next delay of `delays`, or fails with `error`, watching its cancel event.
+    """
+
+    def __init__(
+        self, name: str, delays: List[float], error: Optional[Exception] = None
+    ):
+        self.name = name
+        self.delays = list(delays)
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.requests = []
+
+    def _connect(self, *args, **kwargs):
+        return None
+
+    def chat(
+        self, request_data: dict, deadline=None, cancel_event=None
+    ) -> Generator[str, None, None]:
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        self.requests.append(request_data)
+        if cancel_event is not None and cancel_event.wait(delay):
+            self.cancelled += 1
+            raise GenAICancelledError("The request was cancelled.")
+        if cancel_event is None:
+            time.sleep(delay)
+        if self.error is not None:
+            raise self.error
+        yield json.dumps({"by": self.name})
+
+
+class HungService(DelayedService):
+    """
+    Never answers and ignores its cancel event, like a request blocked on a server that stopped sending.
+    """
+
+    def chat(
+        self, request_data: dict, deadline=None, cancel_event=None
+    ) -> Generator[str, None, None]:
+        self.calls += 1
+        time.sleep(5.0)
+        yield json.dumps({"by": self.name})
+
+
+def chat_request(prompt: str = "x" * 100) -> dict:
+    return {"model": "standin", "messages": [{"role": "user", "content": prompt}]}
+
+
+def warm(policy: HedgePolicy, latency: float, prompt: str = "x" * 100) -> None:
+    for _ in range(policy.min_samples):
+        policy.record(prompt_size(chat_request(prompt)), latency)
+
+
+def answer(handler: HedgedHandler, request_data: dict) -> dict:
+    return json.loads(
+        "".join(res for res in handler.chat(request_data) if isinstance(res, str))
+    )
+
+
+class TestHedgePolicy(unittest.TestCase):
+    def test_threshold(self):
+        policy = HedgePolicy(quantile=0.9, min_samples=10)
+        for i in range(9):
+            policy.record(100, (i + 1) / 10)
+        self.assertIsNone(policy.threshold(100))
+        policy.record(100, 1.0)
+        self.assertAlmostEqual(policy.threshold(100), 0.9)
+        # Other prompt sizes have their own history.
+        self.assertIsNone(policy.threshold(1000))
+        policy = HedgePolicy(min_samples=1, min_delay=2.0)
+        policy.record(100, 0.1)
+        self.assertEqual(policy.threshold(100), 2.0)
+
+    def test_budget(self):
+        policy = HedgePolicy(max_extra_load=0.1)
+        for _ in range(10):
+            policy.count("requests")
+        self.assertTrue(policy.allow_hedge())
+        self.assertFalse(policy.allow_hedge())
+        self.assertEqual(policy.counters["budget_denied"], 1)
+        self.assertAlmostEqual(policy.extra_load, 0.1)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            HedgePolicy(quantile=1.0)
+        with self.assertRaises(ValueError):
+            HedgePolicy(max_extra_load=2.0)
+
+
+class TestHedgedHandler(unittest.TestCase):
+    def test_learns_before_hedging(self):
+        policy = HedgePolicy(min_samples=3, max_extra_load=1.0)
+        primary = DelayedService("primary", [0.0])
+        backup = DelayedService("backup", [0.0])
+        handler = HedgedHandler(primary, backups=[backup], policy=policy)
+        for _ in range(3):
+            self.assertEqual(answer(handler, chat_request()), {"by": "primary"})
+        self.assertEqual(backup.calls, 0)
+        self.assertIsNotNone(policy.threshold(prompt_size(chat_request())))
+        # Passed through requests are streamed like hedged ones, so their latencies are comparable.
+        self.assertEqual(answer(handler, chat_request()), {"by": "primary"})
+        self.assertTrue(all(request["stream"] for request in primary.requests))
+        self.assertEqual(len(primary.requests), 4)
+
+    def test_slow_request_is_hedged(self):
+        policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+        warm(policy, 0.05)
+        primary = DelayedService("primary", [5.0])
+        backup = DelayedService("backup", [0.0])
+        handler = HedgedHandler(primary, backups=[backup], policy=policy)
+        start = time.perf_counter()
+        self.assertEqual(answer(handler, chat_request()), {"by": "backup"})
+        self.assertLess(time.perf_counter() - start, 1.0)
+        deadline = time.monotonic() + 2.0
+        while not primary.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(primary.cancelled, 1)
+        self.assertEqual(policy.counters["hedged"], 1)
+        self.assertEqual(policy.counters["hedge_wins"], 1)
+        self.assertEqual(policy.counters["cancelled"], 1)
+
+    def test_fast_primary_wins(self):
+        policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+        warm(policy, 0.05)
+        primary = DelayedService("primary", [0.2])
+        backup = DelayedService("backup", [5.0])
+        handler = HedgedHandler(primary, backups=[backup], policy=policy)
+        self.assertEqual(answer(handler, chat_request()), {"by": "primary"})
+        self.assertEqual(policy.counters["hedged"], 1)
+        self.assertEqual(policy.counters["hedge_wins"], 0)
+
+    def test_budget_exhausted(self):
+        policy = HedgePolicy(min_samples=5, max_extra_load=0.0)
+        warm(policy, 0.01)
+        primary = DelayedService("primary", [0.2])
+        backup = DelayedService("backup", [0.0])
+        handler = HedgedHandler(primary, backups=[backup], policy=policy)
+        self.assertEqual(answer(handler, chat_request()), {"by": "primary"})
+        self.assertEqual(backup.calls, 0)
+        self.assertEqual(policy.counters["budget_denied"], 1)
+
+    def test_errors_are_not_hedged(self):
+        policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+        warm(policy, 1.0)
+        primary = DelayedService("primary", [0.0], error=GenAIServerError(500))
+        backup = DelayedService("backup", [0.0])
+        handler = HedgedHandler(primary, backups=[backup], policy=policy)
+        with self.assertRaises(GenAIServerError):
+            answer(handler, chat_request())
+        self.assertEqual(backup.calls, 0)
+
+    def test_caller_cancellation(self):
+        policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+        warm(policy, 5.0)
+        primary = DelayedService("primary", [5.0])
+        handler = HedgedHandler(primary, policy=policy)
+        cancel_event = threading.Event()
+        threading.Timer(0.1, cancel_event.set).start()
+        with self.assertRaises(GenAICancelledError):
+            list(handler.chat(chat_request(), cancel_event=cancel_event))
+        # The primary request is cancelled too, without the caller waiting for it.
+        deadline = time.monotonic() + 2.0
+        while not primary.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(primary.cancelled, 1)
+
+    def test_hung_primary(self):
+        policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+        warm(policy, 5.0)
+        handler = HedgedHandler(HungService("primary", [0.0]), policy=policy)
+        # Cancellation and the deadline do not wait for a request that does not stop.
+        cancel_event = threading.Event()
+        threading.Timer(0.1, cancel_event.set).start()
+        start = time.perf_counter()
+        with self.assertRaises(GenAICancelledError):
+            list(handler.chat(chat_request(), cancel_event=cancel_event))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        start = time.perf_counter()
+        with self.assertRaises(GenAITimeoutError):
+            list(handler.chat(chat_request(), deadline=0.2))
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class TestHedgedOllama(unittest.TestCase):
+    def test_streamed_loser_is_cancelled(self):
+        prompt = " ".join(f"<text top='{i}'>{i}</text>" for i in range(40))
+        with (
+            OllamaStandIn(token_latency=0.05) as slow,
+            OllamaStandIn() as fast,
+        ):
+            policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+            warm(policy, 0.1, prompt)
+            handler = HedgedHandler(
+                OllamaHandler(url=slow.url),
+                backups=[OllamaHandler(url=fast.url)],
+                policy=policy,
+            )
+            start = time.perf_counter()
+            content = answer(handler, chat_request(prompt))
+            self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(len(content["content"]), 40)
+        self.assertEqual(policy.counters["hedge_wins"], 1)
+        self.assertTrue(fast.requests[0]["stream"])
+
+    def test_transform(self):
+        with OllamaStandIn(latency=2.0) as slow, OllamaStandIn() as fast:
+            policy = HedgePolicy(min_samples=5, max_extra_load=1.0)
+            transform = Transform(
+                model_name="standin",
+                model_url=slow.url,
+                hedge=policy,
+                hedge_backups=[fast.url],
+            )
+            page = PageContent(data={1: ["<text top='1'>5V</text>"]})
+            prompt = Template(DEFAULT_PROMPT).render(xml_content=str(page.data[1]))
+            warm(policy, 0.05, prompt)
+            start = time.perf_counter()
+            result = transform.process_page(page)
+            self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(result.data[1], {"content": {"line_0": "5V"}})
+        self.assertEqual(policy.counters["hedge_wins"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from typing import Generator
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from converter import ConversionJournal, Transform
+from models import GenerationStats
+from preprocessor import XMLPreProcessor
+from readers import XMLParser
+
+calls = []
+# Number of the chat call raising a network error, if any.
+fail_at = {"call": None}
+
+
+def counting_chat(self, request_data: dict) -> Generator[object, None, None]:
+    content = request_data["messages"][0]["content"]
+    calls.append(content)
+    if fail_at["call"] == len(calls):
+        raise RuntimeError("network blip")
+    yield json.dumps({"content": content[-100:]})
+    yield GenerationStats(requests=1, completion_tokens=len(calls))
+
+
+class TestConversionJournal(unittest.TestCase):
+    def setUp(self):
+        gt_data = XMLParser().process(
+            "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+        )
+        self.preproc_data = XMLPreProcessor().process(gt_data)
+        self.n_sections = sum(
+            len(page.data) for page in self.preproc_data.pages.values()
+        )
+        self.patcher = patch(
+            "GenAIServices.OllamaHandler._connect",
+            return_value="http://127.0.0.1:6589/model_server/",
+        )
+        self.patcher.start()
+        self.converter = Transform(model_name="llama3.2:1b")
+        self.tmp = tempfile.TemporaryDirectory()
+        calls.clear()
+
+    def tearDown(self):
+        fail_at["call"] = None
+        self.tmp.cleanup()
+        self.patcher.stop()
+
+    @patch("GenAIServices.OllamaHandler.chat", counting_chat)
+    def test_resume(self):
+        expected = self.converter.process(self.preproc_data)
+        self.assertEqual(len(calls), self.n_sections)
+        calls.clear()
+
+        # The run fails on the last section; only that one is generated again.
+        fail_at["call"] = self.n_sections
+        with self.assertRaises(Exception) as ctx:
+            self.converter.process(self.preproc_data, journal_dir=self.tmp.name)
+        self.assertIsInstance(ctx.exception.__cause__, RuntimeError)
+        self.assertIn("network blip", str(ctx.exception))
+        fail_at["call"] = None
+        calls.clear()
+
+        resumed = self.converter.process(self.preproc_data, journal_dir=self.tmp.name)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            {p: page.data for p, page in resumed.pages.items()},
+            {p: page.data for p, page in expected.pages.items()},
+        )
+        self.assertEqual(resumed.stats.requests, self.n_sections)
+
+        # A different prompt is another configuration, with its own journal.
+        calls.clear()
+        self.converter.process(
+            self.preproc_data,
+            prompt="{{xml_content}}",
+            journal_dir=self.tmp.name,
+        )
+        self.assertEqual(len(calls), self.n_sections)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+
+    def test_truncated_record(self):
+        with ConversionJournal(self.tmp.name, "doc", "config") as journal:
+            journal.record(1, 1, {"a": 1})
+            path = journal.path
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"page": 1, "section": 2, "da')
+
+        with ConversionJournal(self.tmp.name, "doc", "config") as journal:
+            self.assertEqual(journal.get(1, 1), ({"a": 1}, None))
+            self.assertIsNone(journal.get(1, 2))
+            journal.record(1, 2, {"b": 2}, GenerationStats(requests=1))
+
+        with ConversionJournal(self.tmp.name, "doc", "config") as journal:
+            self.assertEqual(journal.get(1, 2), ({"b": 2}, GenerationStats(requests=1)))
+
+    def test_page_num_required(self):
+        with ConversionJournal(self.tmp.name, "doc", "config") as journal:
+            with self.assertRaises(ValueError):
+                self.converter.process_page(self.preproc_data.pages[1], journal=journal)
+
+
+if __name__ == "__main__":
+    unittest.main()
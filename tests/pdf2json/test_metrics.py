@@ -0,0 +1,143 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from metrics import SimilarityMetrics
+from metrics.functions.assignment import max_weight_assignment
+from metrics.functions.edit_distance import batch_similarity, levenshtein_distance
+from metrics.functions.str_similarity import StrSimilarity, pair_ratio
+from metrics.functions.token_f1 import TokenF1
+
+
+class TestStrSimilarity(unittest.TestCase):
+    def test_repeated_fragments(self):
+        json_list = ["Pin 1 Signal", "Pin 2 GND", "VCC"]
+        xml_list = ["Signal", "GNX", "GNX", "GND", "GND"]
+
+        pair_ratio.cache_clear()
+        fragments = list(StrSimilarity.iter_scores(xml_list, list(json_list)))
+        self.assertEqual(
+            [f.exact for f in fragments], [True, False, False, True, False]
+        )
+        # The second "GNX" reuses the first result, the second "GND" is rescored after the first one
+        # consumed its match.
+        self.assertEqual(fragments[1], fragments[2])
+        self.assertEqual(fragments[4].score, pair_ratio("GND", "VCC"))
+
+        hits = pair_ratio.cache_info().hits
+        StrSimilarity.calculate(xml_list=xml_list, json_list=list(json_list))
+        self.assertGreater(pair_ratio.cache_info().hits, hits)
+
+    def test_long_pairs_are_not_cached(self):
+        pair_ratio.cache_clear()
+        long_str = "Operating temperature " * 4
+        StrSimilarity.calculate(xml_list=[long_str + "x"], json_list=[long_str])
+        self.assertEqual(pair_ratio.cache_info().currsize, 0)
+
+
+class TestEditDistance(unittest.TestCase):
+    def setUp(self):
+        self.gt = [
+            "−Two USB ports from CN2 needs external power.",
+            "Tel: +886-2-7703-3000",
+            "IntA_P1_SSRX-",
+            "GND",
+        ]
+        self.converted_data = [
+            "power_requirements",
+            "-Two USB ports from CN2 needs external power.",
+            "Tel",
+            "+886-2-7703-3000",
+            "signal",
+            "IntA_P1_SSRX-",
+            "GND",
+        ]
+
+    def test_levenshtein_distance(self):
+        self.assertEqual(levenshtein_distance("kitten", "sitting"), 3)
+        self.assertEqual(levenshtein_distance("", "GND"), 3)
+        self.assertEqual(levenshtein_distance("x" * 100, "x" * 99 + "y"), 1)
+
+    def test_batch_matches_scalar(self):
+        scores = batch_similarity("IntA_P1_SSRX-", self.converted_data)
+        for text, score in zip(self.converted_data, scores):
+            expected = 1 - levenshtein_distance("IntA_P1_SSRX-", text) / max(
+                len(text), 13
+            )
+            self.assertAlmostEqual(score, expected)
+
+    def test_calculate(self):
+        metric, setting = SimilarityMetrics.get("edit_distance")
+        self.assertIsInstance(setting, dict, "Setting should be a dictionary")
+
+        score = metric.calculate(xml_list=self.gt, json_list=self.converted_data)
+        self.assertGreater(score, 0.8)
+        self.assertLessEqual(score, 1.0)
+
+
+class TestTokenF1(unittest.TestCase):
+    def test_precision_recall_f1(self):
+        precision, recall, f1 = TokenF1.precision_recall_f1(
+            xml_list=["Tel: +886-2-7703-3000", "GND", "GND"],
+            json_list=["Tel", "+886-2-7703-3000", "GND", "signal"],
+        )
+        # ":" and the second "GND" are missing, "signal" is extra.
+        self.assertEqual(precision, 0.91)
+        self.assertEqual(recall, 0.83)
+        self.assertEqual(f1, 0.87)
+
+    def test_calculate(self):
+        metric, setting = SimilarityMetrics.get("token_f1")
+        self.assertIsInstance(setting, dict, "Setting should be a dictionary")
+        self.assertEqual(metric.calculate(xml_list=["GND"], json_list=["gnd"]), 1.0)
+        self.assertEqual(metric.calculate(xml_list=["GND"], json_list=[]), 0.0)
+
+
+class TestAssignment(unittest.TestCase):
+    def test_max_weight_assignment(self):
+        # Greedy on row 0 would take column 0 and leave row 1 without a match.
+        edges = [[(0, 0.9), (1, 0.8)], [(0, 0.85)]]
+        self.assertEqual(max_weight_assignment(2, edges), {0: 1, 1: 0})
+
+    def test_order_independent(self):
+        metric, setting = SimilarityMetrics.get("assignment")
+        gt = ["USB 3.0 Box header (CN1)", "USB 3.0 Box header", "GND", "Pin"]
+        converted_data = ["USB 3.0 Box header (CN2)", "USB 3.0 Box header", "GND"]
+
+        score = metric.calculate(xml_list=gt, json_list=converted_data, **setting)
+        reversed_score = metric.calculate(
+            xml_list=gt[::-1], json_list=converted_data, **setting
+        )
+        self.assertEqual(score, reversed_score)
+        self.assertEqual(score, round((0.96 + 1.0 + 1.0) / 4, 2))
+
+
+class TestMinHash(unittest.TestCase):
+    def test_calculate(self):
+        metric, setting = SimilarityMetrics.get("minhash")
+        gt = [
+            "−Compliant with xHCI 1.0, USB 3.0 Rev 1.0.",
+            "Headquarters (Taiwan)",
+            "GND",
+        ]
+        converted_data = [
+            "-Compliant with xHCI 1.0, USB 3.0 Rev 1.0.",
+            "Headquarters",
+            "GND",
+        ]
+        score = metric.calculate(xml_list=gt, json_list=converted_data, **setting)
+        self.assertGreater(score, 0.7)
+        self.assertLessEqual(score, 1.0)
+        self.assertEqual(
+            metric.calculate(xml_list=gt, json_list=list(gt), **setting), 1.0
+        )
+
+    def test_invalid_bands(self):
+        metric, _ = SimilarityMetrics.get("minhash")
+        with self.assertRaises(ValueError):
+            metric.calculate(xml_list=["GND"], json_list=["GND"], num_perm=64, bands=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
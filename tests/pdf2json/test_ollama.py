@@ -0,0 +1,259 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from benchmarks.standin import OllamaStandIn, echo_texts
+from converter import Transform
+from GenAIServices import (
+    CircuitBreaker,
+    CircuitOpenError,
+    GenAICancelledError,
+    GenAIConnectionError,
+    GenAIResponseError,
+    GenAIServerError,
+    GenAITimeoutError,
+    OllamaHandler,
+)
+from models import PageContent, PreProcData
+
+
+def chat_request(prompt: str, stream: bool = False) -> dict:
+    return {
+        "model": "standin",
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": stream,
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestOllamaErrors(unittest.TestCase):
+    def test_server_error(self):
+        with OllamaStandIn(error_rate=1.0) as standin:
+            handler = OllamaHandler(url=standin.url)
+            with self.assertRaises(GenAIServerError) as ctx:
+                list(handler.chat(chat_request("x")))
+        self.assertEqual(ctx.exception.status_code, 500)
+        self.assertTrue(ctx.exception.transient)
+        self.assertIn("injected error", str(ctx.exception))
+
+    def test_deadline(self):
+        with OllamaStandIn(latency=2.0) as standin:
+            handler = OllamaHandler(url=standin.url, timeout=0.2)
+            start = time.perf_counter()
+            with self.assertRaises(GenAITimeoutError):
+                list(handler.chat(chat_request("x")))
+            self.assertLess(time.perf_counter() - start, 1.0)
+            # A per-request deadline overrides the one of the handler.
+            with OllamaStandIn() as fast:
+                handler = OllamaHandler(url=fast.url, timeout=0.2)
+                self.assertTrue(list(handler.chat(chat_request("x"), deadline=5.0)))
+
+    def test_cancel_in_flight_stream(self):
+        prompt = " ".join(f"<text top='{i}'>{i}</text>" for i in range(50))
+        with OllamaStandIn(token_latency=0.02) as standin:
+            handler = OllamaHandler(url=standin.url)
+            cancel_event = threading.Event()
+            received = []
+            with self.assertRaises(GenAICancelledError):
+                for res in handler.chat(
+                    chat_request(prompt, stream=True), cancel_event=cancel_event
+                ):
+                    received.append(res)
+                    cancel_event.set()
+            self.assertEqual(len(received), 1)
+            # A request cancelled before it is sent never reaches the server.
+            with self.assertRaises(GenAICancelledError):
+                list(handler.chat(chat_request("x"), cancel_event=cancel_event))
+            self.assertEqual(len(standin.requests), 1)
+
+    def test_protocol_error(self):
+        prompt = " ".join(f"<text top='{i}'>{i}</text>" for i in range(10))
+        with OllamaStandIn(malformed_rate=1.0) as standin:
+            handler = OllamaHandler(url=standin.url)
+            for stream in (True, False):
+                with self.assertRaises(GenAIResponseError) as ctx:
+                    list(handler.chat(chat_request(prompt, stream=stream)))
+                self.assertIn("Failed to decode JSON response", str(ctx.exception))
+                self.assertTrue(ctx.exception.transient)
+
+    def test_hung_stream(self):
+        prompt = " ".join(f"<text top='{i}'>{i}</text>" for i in range(10))
+        with OllamaStandIn(stall=5.0) as standin:
+            handler = OllamaHandler(url=standin.url)
+            for stream in (True, False):
+                # The server stops sending: cancelling interrupts the blocked read.
+                cancel_event = threading.Event()
+                timer = threading.Timer(0.2, cancel_event.set)
+                timer.start()
+                start = time.perf_counter()
+                received = []
+                with self.assertRaises(GenAICancelledError):
+                    for res in handler.chat(
+                        chat_request(prompt, stream=stream), cancel_event=cancel_event
+                    ):
+                        received.append(res)
+                self.assertLess(time.perf_counter() - start, 1.0)
+                self.assertEqual(bool(received), stream)
+
+                # The deadline bounds the whole request, not each read.
+                start = time.perf_counter()
+                with self.assertRaises(GenAITimeoutError):
+                    list(
+                        handler.chat(chat_request(prompt, stream=stream), deadline=0.3)
+                    )
+                self.assertLess(time.perf_counter() - start, 1.0)
+        # Before the headers, too.
+        with OllamaStandIn(latency=5.0) as standin:
+            handler = OllamaHandler(url=standin.url)
+            cancel_event = threading.Event()
+            threading.Timer(0.2, cancel_event.set).start()
+            start = time.perf_counter()
+            with self.assertRaises(GenAICancelledError):
+                list(handler.chat(chat_request("x"), cancel_event=cancel_event))
+            self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_connection_error(self):
+        with OllamaStandIn() as standin:
+            handler = OllamaHandler(url=standin.url)
+        with self.assertRaises(GenAIConnectionError):
+            list(handler.chat(chat_request("x")))
+
+    def test_circuit_breaker_stops_requests(self):
+        with OllamaStandIn(error_rate=1.0) as standin:
+            breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+            handler = OllamaHandler(url=standin.url, breaker=breaker)
+            for _ in range(2):
+                with self.assertRaises(GenAIServerError):
+                    list(handler.chat(chat_request("x")))
+            with self.assertRaises(CircuitOpenError):
+                list(handler.chat(chat_request("x")))
+        self.assertEqual(len(standin.requests), 2)
+        self.assertEqual(breaker.state, "open")
+
+    def test_protocol_errors_do_not_open_the_breaker(self):
+        with OllamaStandIn() as standin:
+            breaker = CircuitBreaker(failure_threshold=1)
+            handler = OllamaHandler(url=standin.url, breaker=breaker)
+            with patch.object(
+                OllamaHandler, "_chat", side_effect=GenAIResponseError("bad chunk")
+            ):
+                with self.assertRaises(GenAIResponseError):
+                    list(handler.chat(chat_request("x")))
+            self.assertEqual(breaker.state, "closed")
+            self.assertTrue(list(handler.chat(chat_request("x"))))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=3, reset_timeout=10.0, clock=self.clock
+        )
+
+    def fail(self, times: int):
+        for _ in range(times):
+            self.breaker.before_request()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.before_request()
+        self.breaker.record_success()
+        self.fail(2)
+        self.assertEqual(self.breaker.state, "closed")
+        self.fail(1)
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+    def test_half_open_trial(self):
+        self.fail(3)
+        self.clock.now = 10.0
+        self.breaker.before_request()
+        self.assertEqual(self.breaker.state, "half_open")
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+        # A failed trial opens the breaker again for a full reset timeout.
+        self.breaker.record_failure()
+        self.clock.now = 19.0
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+        self.clock.now = 20.0
+        self.breaker.before_request()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.before_request()
+
+    def test_released_trial(self):
+        self.fail(3)
+        self.clock.now = 10.0
+        self.breaker.before_request()
+        self.breaker.release()
+        self.breaker.before_request()
+        self.assertEqual(self.breaker.state, "half_open")
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+
+
+class TestTransformRetries(unittest.TestCase):
+    def test_timeouts_are_retried(self):
+        with OllamaStandIn(latency=2.0) as standin:
+            transform = Transform(
+                model_name="standin", model_url=standin.url, request_timeout=0.1
+            )
+            with self.assertRaises(GenAITimeoutError):
+                transform.generate_json(
+                    transform.gen_ai,
+                    chat_request("<text top='1'>x</text>"),
+                    max_retries=2,
+                )
+            self.assertEqual(len(standin.requests), 2)
+
+    def test_closing_iter_process_cancels_hung_requests(self):
+        def respond(prompt: str) -> str:
+            if "slow" in prompt:
+                time.sleep(5.0)
+            return echo_texts(prompt)
+
+        data = PreProcData(
+            pages={
+                1: PageContent(data={1: ["<text top='1'>fast</text>"]}),
+                2: PageContent(data={1: ["<text top='1'>slow</text>"]}),
+            }
+        )
+        with OllamaStandIn(respond=respond) as standin:
+            transform = Transform(model_name="standin", model_url=standin.url)
+            pages = transform.iter_process(data, max_workers=2, ordered=False)
+            self.assertEqual(next(pages)[1], 1)
+            start = time.perf_counter()
+            pages.close()
+            self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_open_circuit_is_not_retried(self):
+        with OllamaStandIn(error_rate=1.0) as standin:
+            gen_ai = OllamaHandler(
+                url=standin.url, breaker=CircuitBreaker(failure_threshold=2)
+            )
+            transform = Transform(model_name="standin", gen_ai=gen_ai)
+            with self.assertRaises(CircuitOpenError):
+                transform.generate_json(
+                    gen_ai, chat_request("<text top='1'>x</text>"), max_retries=5
+                )
+        self.assertEqual(len(standin.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+import unittest
+from typing import Generator
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from converter import Transform
+from evaluator import Validate
+from metrics import SimilarityMetrics
+from pipeline import Pipeline
+from preprocessor import XMLPreProcessor
+from readers import XMLParser
+
+
+def echo_chat(self, request_data: dict) -> Generator[str, None, None]:
+    # Answers with the end of the rendered prompt, so every section gets its own JSON.
+    content = request_data["messages"][0]["content"]
+    yield json.dumps({"content": content[-200:]})
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.xml_path = "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+        self.patcher = patch(
+            "GenAIServices.OllamaHandler._connect",
+            return_value="http://127.0.0.1:6589/model_server/",
+        )
+        self.mock_connect = self.patcher.start()
+        self.converter = Transform(
+            model_name="llama3.2:1b", model_url="http://127.0.0.1:6589/model_server/"
+        )
+        metric, setting = SimilarityMetrics.get("token_f1")
+        self.evaluator = Validate(metrics=metric, setting=setting)
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    @patch("GenAIServices.OllamaHandler.chat", echo_chat)
+    def test_matches_sequential(self):
+        gt_data = XMLParser().process(self.xml_path)
+        preproc_data = XMLPreProcessor().process(gt_data)
+        data = self.converter.process(data=preproc_data)
+        scores = self.evaluator.process(gt_data=gt_data, data=data)
+
+        pipeline = Pipeline(
+            XMLParser(),
+            XMLPreProcessor(),
+            self.converter,
+            self.evaluator,
+            queue_size=1,
+        )
+        result = pipeline.process(self.xml_path)
+        self.assertEqual(result.gt_data, gt_data)
+        self.assertEqual(result.preproc_data, preproc_data)
+        self.assertEqual(result.data, data)
+        self.assertEqual(result.scores, scores)
+        self.assertEqual(list(result.data.pages), list(gt_data.pages))
+
+        result = Pipeline(XMLParser(), XMLPreProcessor(), self.converter).process(
+            self.xml_path
+        )
+        self.assertEqual(result.data, data)
+        self.assertIsNone(result.scores)
+
+    @patch("GenAIServices.OllamaHandler.chat", echo_chat)
+    def test_stage_error(self):
+        pipeline = Pipeline(XMLParser(), XMLPreProcessor(), self.converter)
+        # The error of the failing stage is raised as the cause, with its message.
+        with self.assertRaises(Exception) as ctx:
+            pipeline.process(self.xml_path, max_retries=0)
+        self.assertIsInstance(ctx.exception.__cause__, ValueError)
+        self.assertIn("max_retries must be a positive integer", str(ctx.exception))
+        with self.assertRaises(Exception) as ctx:
+            pipeline.process("./missing.xml")
+        self.assertIsInstance(ctx.exception.__cause__, FileNotFoundError)
+        self.assertIn("The file missing.xml does not exist", str(ctx.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from benchmarks.standin import OllamaStandIn
+from converter import Transform
+from GenAIServices import CassetteHandler, OllamaHandler
+from models import GenerationStats, PageContent
+
+
+def chat_request(prompt: str, stream: bool = False) -> dict:
+    return {
+        "model": "standin",
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": stream,
+    }
+
+
+class TestOllamaStandIn(unittest.TestCase):
+    def test_chat(self):
+        prompt = "<text top='1'><b>Power In</b></text> <text top='2'>5V GND</text>"
+        with OllamaStandIn() as standin:
+            handler = OllamaHandler(url=standin.url)
+            for stream in (True, False):
+                responses = list(handler.chat(chat_request(prompt, stream)))
+                text = "".join(res for res in responses if isinstance(res, str))
+                self.assertEqual(
+                    json.loads(text),
+                    {"content": {"line_0": "Power In", "line_1": "5V GND"}},
+                )
+                self.assertIsInstance(responses[-1], GenerationStats)
+                self.assertEqual(responses[-1].requests, 1)
+            self.assertEqual(len(standin.requests), 2)
+
+    def test_time_to_first_token(self):
+        prompt = " ".join(f"<text top='{i}'>{i}</text>" for i in range(10))
+        with OllamaStandIn(latency=0.05, token_latency=0.02) as standin:
+            handler = OllamaHandler(url=standin.url)
+            start = time.perf_counter()
+            stats = list(handler.chat(chat_request(prompt, stream=True)))[-1]
+            elapsed = time.perf_counter() - start
+            self.assertEqual(stats.streamed_requests, 1)
+            self.assertGreaterEqual(stats.time_to_first_token, 0.05)
+            self.assertLess(stats.time_to_first_token, stats.total_duration)
+            self.assertLess(stats.time_to_first_token, elapsed)
+            # A complete response arrives at once: its first token is not timed.
+            stats = list(handler.chat(chat_request(prompt)))[-1]
+            self.assertEqual(stats.streamed_requests, 0)
+            self.assertIsNone(stats.time_to_first_token)
+
+    def test_forced_stream(self):
+        for stream in (True, False):
+            with OllamaStandIn(stream=stream) as standin:
+                response = httpx.post(
+                    standin.url + "api/chat", json=chat_request("x", not stream)
+                )
+            self.assertEqual(
+                response.headers.get("Transfer-Encoding") == "chunked", stream
+            )
+
+    def test_concurrency_limit(self):
+        with OllamaStandIn(latency=0.2, max_concurrency=1, max_queue=1) as standin:
+            statuses = []
+            threads = [
+                threading.Thread(
+                    target=lambda i=i: statuses.append(
+                        httpx.post(
+                            standin.url + "api/chat", json=chat_request(str(i))
+                        ).status_code
+                    )
+                )
+                for i in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sorted(statuses), [200, 200, 503])
+        self.assertEqual(standin.peak_active, 1)
+        self.assertEqual(standin.counters["busy"], 1)
+
+    def test_fault_injection_is_deterministic(self):
+        def failed(seed):
+            with OllamaStandIn(
+                error_rate=0.2, malformed_rate=0.2, truncated_rate=0.2, seed=seed
+            ) as s:
+                results = []
+                for i in range(30):
+                    response = httpx.post(s.url + "api/chat", json=chat_request(str(i)))
+                    if response.status_code != 200:
+                        results.append((i, "error"))
+                        continue
+                    try:
+                        content = response.json()["message"]["content"]
+                    except json.JSONDecodeError:
+                        results.append((i, "malformed"))
+                        continue
+                    try:
+                        json.loads(content)
+                    except json.JSONDecodeError:
+                        results.append((i, "truncated"))
+                return results, s.counters
+
+        first, counters = failed(0)
+        self.assertEqual(failed(0)[0], first)
+        self.assertNotEqual(failed(1)[0], first)
+        self.assertEqual(
+            len(first),
+            counters["error"] + counters["malformed"] + counters["truncated"],
+            counters,
+        )
+        for fault in ("error", "malformed", "truncated"):
+            self.assertGreater(counters[fault], 0, fault)
+
+    def test_transform_retries(self):
+        page = PageContent(data={1: ['<text top="1">Power In</text>\n']})
+        with OllamaStandIn(error_rate=0.4, malformed_rate=0.4, seed=3) as standin:
+            transform = Transform(model_name="standin", model_url=standin.url)
+            result = transform.process_page(page, max_retries=20)
+        self.assertEqual(result.data[1], {"content": {"line_0": "Power In"}})
+        self.assertGreater(len(standin.requests), 1)
+
+    def test_replay(self):
+        request_data = chat_request('<text top="1">Power In</text>')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sample.cassette.jsonl.gz")
+            with OllamaStandIn(respond=lambda prompt: '{"recorded": 1}') as standin:
+                recorder = CassetteHandler(
+                    path, mode="record", inner=OllamaHandler(url=standin.url)
+                )
+                list(recorder.chat(request_data))
+
+            with OllamaStandIn(replay=path) as standin:
+                recorded = httpx.post(standin.url + "api/chat", json=request_data)
+                generated = httpx.post(
+                    standin.url + "api/chat",
+                    json=chat_request('<text top="1">Other</text>'),
+                )
+        self.assertEqual(recorded.json()["message"]["content"], '{"recorded": 1}')
+        self.assertEqual(
+            json.loads(generated.json()["message"]["content"]),
+            {"content": {"line_0": "Other"}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from typing import Generator
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from converter import Transform
+from evaluator import Validate
+from metrics import SimilarityMetrics
+from pipeline import Pipeline
+from preprocessor import XMLPreProcessor
+from readers import XMLParser
+from utils import Tracer, tracer
+
+
+def echo_chat(self, request_data: dict) -> Generator[str, None, None]:
+    content = request_data["messages"][0]["content"]
+    yield json.dumps({"content": content[-200:]})
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled(self):
+        local = Tracer()
+        with local.span("reader", "parse_xml") as span:
+            span.set(pages=1)
+        self.assertEqual(local.spans, [])
+
+    def test_export(self):
+        local = Tracer(enabled=True)
+        with local.span("converter", "section", page=1, section=2) as span:
+            span.set(bytes_out=10)
+        with self.assertRaises(ValueError):
+            with local.span("evaluator", "page", page=1):
+                raise ValueError("boom")
+
+        spans = local.spans
+        self.assertEqual([s.stage for s in spans], ["converter", "evaluator"])
+        self.assertEqual(spans[0].attrs, {"page": 1, "section": 2, "bytes_out": 10})
+        self.assertEqual(spans[1].attrs["error"], "ValueError")
+        self.assertGreaterEqual(spans[0].duration, 0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_path = os.path.join(tmp, "trace.jsonl")
+            chrome_path = os.path.join(tmp, "trace.json")
+            local.export_jsonl(jsonl_path)
+            local.export_chrome(chrome_path)
+            with open(jsonl_path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            with open(chrome_path, encoding="utf-8") as f:
+                events = json.load(f)["traceEvents"]
+
+        self.assertEqual(records[0]["section"], 2)
+        self.assertEqual([e["cat"] for e in events], ["converter", "evaluator"])
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["ts"], 0)
+
+        local.clear()
+        self.assertEqual(local.spans, [])
+
+
+class TestPipelineTracing(unittest.TestCase):
+    def setUp(self):
+        self.xml_path = "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+        self.patcher = patch(
+            "GenAIServices.OllamaHandler._connect",
+            return_value="http://127.0.0.1:6589/model_server/",
+        )
+        self.patcher.start()
+        self.converter = Transform(
+            model_name="llama3.2:1b", model_url="http://127.0.0.1:6589/model_server/"
+        )
+        metric, setting = SimilarityMetrics.get("token_f1")
+        self.evaluator = Validate(metrics=metric, setting=setting)
+        tracer.clear()
+        tracer.enable()
+
+    def tearDown(self):
+        tracer.disable()
+        tracer.clear()
+        self.patcher.stop()
+
+    @patch("GenAIServices.OllamaHandler.chat", echo_chat)
+    def test_stages(self):
+        result = Pipeline(
+            XMLParser(), XMLPreProcessor(), self.converter, self.evaluator
+        ).process(self.xml_path)
+
+        spans = tracer.spans
+        n_pages = len(result.gt_data.pages)
+        stages = [span.stage for span in spans]
+        self.assertEqual(stages.count("reader"), 1)
+        self.assertEqual(stages.count("preprocessor"), n_pages)
+        self.assertEqual(stages.count("evaluator"), n_pages)
+        self.assertEqual(
+            stages.count("converter"),
+            sum(len(page.data) for page in result.data.pages.values()),
+        )
+
+        sections = [span for span in spans if span.stage == "converter"]
+        self.assertEqual(
+            {span.attrs["page"] for span in sections}, set(result.data.pages)
+        )
+        self.assertTrue(all(span.attrs["bytes_in"] > 0 for span in sections))
+        self.assertGreater(spans[0].attrs["bytes_in"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
 import os
+import shutil
 import sys
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..."))
+from evaluator import Validate
 from models import ParserData
 from readers import XMLParser
+from readers.sidecar import SidecarIndex, sidecar_path
+from utils import TextNormalizer
 
 
 class TestXMLParser(unittest.TestCase):
@@ -19,6 +26,77 @@ class TestXMLParser(unittest.TestCase):
         # Test if the list is not empty
         self.assertEqual(len(xml_data.pages), 3, "Parsed data should not be empty")
 
+    def test_fragments(self):
+        xml_path = "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml"
+        xml_data = self.xml_parser.process(path=xml_path, with_fragments=True)
+        eval = Validate(metrics=None)
+        for page in xml_data.pages.values():
+            # Fragments from the reader match what Validate extracts by reparsing the page.
+            self.assertEqual(page.fragments, eval._read_and_flatten_xml(page.data))
+
+    def test_sidecar(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            xml_path = os.path.join(tmp_dir, "EMPU_3401_Datasheet.xml")
+            shutil.copy(
+                "./example/data/EMPU_3401_Datasheet/EMPU_3401_Datasheet.xml", xml_path
+            )
+            expected = self.xml_parser.process(path=xml_path, with_fragments=True)
+
+            written = self.xml_parser.process(path=xml_path, sidecar=True)
+            self.assertTrue(sidecar_path(xml_path).exists())
+            loaded = self.xml_parser.process(path=xml_path, sidecar=True)
+            signature = TextNormalizer().signature
+            for page_num, page in expected.pages.items():
+                self.assertEqual(written.pages[page_num].fragments, page.fragments)
+                self.assertEqual(loaded.pages[page_num].fragments, page.fragments)
+                self.assertEqual(
+                    loaded.pages[page_num].normalized_fragments[signature],
+                    [TextNormalizer().normalize(s) for s in page.fragments],
+                )
+
+            # Validate fills missing fragments from the sidecar of the source file.
+            xml_data = self.xml_parser.process(path=xml_path)
+            self.assertEqual(xml_data.source, str(Path(xml_path).resolve()))
+            Validate(metrics=None)._load_sidecar(xml_data)
+            for page_num, page in expected.pages.items():
+                self.assertEqual(xml_data.pages[page_num].fragments, page.fragments)
+
+            # Pages are read from a valid sidecar without parsing the XML.
+            with patch("readers.xmlparser.ET.parse") as parse:
+                self.assertEqual(
+                    self.xml_parser.process(path=xml_path, sidecar=True), loaded
+                )
+            parse.assert_not_called()
+            self.assertEqual(
+                {num: page.data for num, page in loaded.pages.items()},
+                {num: page.data for num, page in expected.pages.items()},
+            )
+            self.assertEqual(
+                {num: page.size for num, page in loaded.pages.items()},
+                {num: page.size for num, page in expected.pages.items()},
+            )
+
+            # A sidecar written with another only_text is rebuilt, and Validate does not use it.
+            elements = self.xml_parser.process(
+                path=xml_path, only_text=False, with_fragments=True
+            )
+            self.assertIsNone(SidecarIndex.open(xml_path, only_text=False))
+            xml_data = self.xml_parser.process(path=xml_path, only_text=False)
+            Validate(metrics=None)._load_sidecar(xml_data)
+            for page in xml_data.pages.values():
+                self.assertIsNone(page.fragments)
+            rebuilt = self.xml_parser.process(
+                path=xml_path, only_text=False, sidecar=True
+            )
+            for page_num, page in elements.pages.items():
+                self.assertEqual(rebuilt.pages[page_num].fragments, page.fragments)
+            self.assertFalse(SidecarIndex.open(xml_path).only_text)
+
+            # A sidecar written for other content is ignored.
+            with open(xml_path, "a", encoding="utf-8") as f:
+                f.write("\n")
+            self.assertIsNone(SidecarIndex.open(xml_path))
+
 
 if __name__ == "__main__":
     unittest.main()
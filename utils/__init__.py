@@ -1,5 +1,10 @@
+import os
+
 from utils.run_sh import CommandLineExecutor
+from utils.text_normalizer import TextNormalizer
+from utils.tracing import Tracer
 
 commandline_executor = CommandLineExecutor()
+tracer = Tracer(enabled=os.environ.get("AIXTRACT_TRACE") == "1")
 
-__all__ = ["commandline_executor"]
+__all__ = ["commandline_executor", "TextNormalizer", "Tracer", "tracer"]
@@ -0,0 +1,88 @@
+import hashlib
+import re
+import unicodedata
+
+DASHES = "‐‑‒–—―−﹘﹣－"
+SINGLE_QUOTES = "‘’‚‛′"
+DOUBLE_QUOTES = "“”„‟″"
+WHITESPACE = re.compile(r"\s+")
+
+
+class TextNormalizer:
+    """
+    Normalizes strings before they are matched, so that typographic variants compare equal.
+
+    Results are cached per string, repeated fragments (`GND`, `°`, ...) are normalized once.
+    """
+
+    def __init__(
+        self,
+        nfkc: bool = True,
+        fold_dashes: bool = True,
+        fold_quotes: bool = True,
+        collapse_whitespace: bool = True,
+        cache_size: int = 65536,
+    ):
+        """
+        Args:
+            nfkc (bool): Apply Unicode NFKC normalization. Default: True.
+            fold_dashes (bool): Map dash and minus variants (e.g. U+2212) to `-`. Default: True.
+            fold_quotes (bool): Map curly quotes and primes to `'` and `"`. Default: True.
+            collapse_whitespace (bool): Collapse whitespace runs to one space and strip. Default: True.
+            cache_size (int): Maximum number of cached strings before the cache is reset. Default: 65536.
+        """
+        self.nfkc = nfkc
+        self.collapse_whitespace = collapse_whitespace
+        self.cache_size = cache_size
+
+        table = {}
+        if fold_dashes:
+            table.update({ord(c): "-" for c in DASHES})
+        if fold_quotes:
+            table.update({ord(c): "'" for c in SINGLE_QUOTES})
+            table.update({ord(c): '"' for c in DOUBLE_QUOTES})
+        self.table = table
+        self._cache = {}
+
+    @property
+    def signature(self) -> str:
+        """
+        str: Identifies the normalization settings, two normalizers with the same signature give the same results.
+        """
+        settings = repr(
+            (self.nfkc, sorted(self.table.items()), self.collapse_whitespace)
+        )
+        return hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+    def __getstate__(self) -> dict:
+        # The cache is rebuilt on demand, do not ship it to worker processes.
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
+    def normalize(self, text: str) -> str:
+        """
+        Normalizes one string.
+
+        Args:
+            text (str): The string to normalize.
+
+        Returns:
+            str: The normalized string.
+        """
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        result = text
+        if self.nfkc:
+            result = unicodedata.normalize("NFKC", result)
+        if self.table:
+            result = result.translate(self.table)
+        if self.collapse_whitespace:
+            result = WHITESPACE.sub(" ", result).strip()
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
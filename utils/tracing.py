@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+class Span:
+    """
+    One timed operation of a stage, with free-form attributes such as `page`, `section`, `bytes_in`,
+    `bytes_out`, `tokens_in` or `tokens_out`.
+    """
+
+    __slots__ = ("stage", "name", "attrs", "start_ns", "end_ns", "pid", "tid")
+
+    def __init__(self, stage: str, name: str, attrs: Dict[str, Any]):
+        """
+        Args:
+            stage (str): The module the span belongs to, e.g. `reader` or `converter`.
+            name (str): The operation.
+            attrs (Dict[str, Any]): Attributes known when the span starts.
+        """
+        self.stage = stage
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = 0
+        self.end_ns = 0
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+
+    def set(self, **attrs) -> None:
+        """
+        Adds attributes, e.g. the output size once it is known.
+        """
+        self.attrs.update(attrs)
+
+    @property
+    def duration(self) -> float:
+        """
+        float: Duration in seconds.
+        """
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: The span as one JSON lines record.
+        """
+        return {
+            "stage": self.stage,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration": self.duration,
+            "pid": self.pid,
+            "tid": self.tid,
+            **self.attrs,
+        }
+
+
+class _ActiveSpan:
+    """
+    Context manager recording a span into its tracer on exit.
+    """
+
+    __slots__ = ("tracer", "span")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.span.start_ns = time.perf_counter_ns()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        self.tracer._record(self.span)
+
+
+class _NoopSpan:
+    """
+    Returned while tracing is disabled: entering it and setting attributes do nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def set(self, **attrs) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collects spans emitted by the readers, preprocessor, converter, GenAI services and evaluator.
+
+    Tracing is disabled by default (or enabled with the `AIXTRACT_TRACE=1` environment variable); a disabled
+    tracer hands out a shared no-op span, so instrumented code only pays for one attribute check. Spans are
+    kept in memory until exported with `export_jsonl` or `export_chrome`. Spans emitted in worker processes
+    (e.g. `Validate.process(max_workers=...)`) stay in those processes.
+
+    Example:
+        with tracer.span("converter", "section", page=1, section=2) as span:
+            ...
+            span.set(bytes_out=len(result))
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Args:
+            enabled (bool): Start collecting spans immediately. Default: False.
+        """
+        self.enabled = enabled
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        """
+        Drops the collected spans.
+        """
+        with self._lock:
+            self._spans = []
+
+    @property
+    def spans(self) -> List[Span]:
+        """
+        List[Span]: A copy of the collected spans, in completion order.
+        """
+        with self._lock:
+            return list(self._spans)
+
+    def span(self, stage: str, name: str, **attrs) -> Union[_ActiveSpan, _NoopSpan]:
+        """
+        Starts a span, to be used as a context manager.
+
+        Args:
+            stage (str): The module the span belongs to.
+            name (str): The operation.
+            attrs (dict): Attributes known when the span starts.
+
+        Returns:
+            Union[_ActiveSpan, _NoopSpan]: Yields the `Span` when entered, or a no-op span while disabled.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _ActiveSpan(self, Span(stage, name, attrs))
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def export_jsonl(self, path: Union[Path, str]) -> None:
+        """
+        Writes one JSON object per span.
+
+        Args:
+            path (Union[Path, str]): The output file.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def export_chrome(
+        self, path: Union[Path, str], origin_ns: Optional[int] = None
+    ) -> None:
+        """
+        Writes the spans in the Chrome trace event format, for `chrome://tracing` or Perfetto.
+
+        Args:
+            path (Union[Path, str]): The output file.
+            origin_ns (Optional[int]): `time.perf_counter_ns()` value shown as time 0. Default: start of the
+                first span.
+        """
+        spans = self.spans
+        if origin_ns is None:
+            origin_ns = min((span.start_ns for span in spans), default=0)
+        events = [
+            {
+                "name": span.name,
+                "cat": span.stage,
+                "ph": "X",
+                "ts": (span.start_ns - origin_ns) / 1e3,
+                "dur": (span.end_ns - span.start_ns) / 1e3,
+                "pid": span.pid,
+                "tid": span.tid,
+                "args": span.attrs,
+            }
+            for span in spans
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events}, f, default=str)